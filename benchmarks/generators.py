@@ -0,0 +1,182 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+'''
+Generators of synthetic theories, each returning an (ArgumentationSystem, KnowledgeBase) pair
+whose size is controlled by its parameters
+'''
+
+from pyaspic import ArgumentationSystem, KnowledgeBase, Formula, Rule
+import random
+
+def chain(length=100, strict=False):
+    '''
+    A single chain of rules p0 => p1 => ... => p<length>, with a competing chain
+    ~p0 => ... => ~p<length>, so every link is attacked
+    '''
+
+    system = ArgumentationSystem()
+    kb = KnowledgeBase()
+
+    arrow = "->" if strict else "=>"
+
+    kb.add_premise(Formula("p0"))
+    kb.add_premise(Formula("q0"))
+
+    for i in range(length):
+        system.add_rule(Rule.from_string("[p{i}]".format(i=i), "p{i}{arrow}p{j}".format(i=i, j=i+1, arrow=arrow)))
+        system.add_rule(Rule.from_string("[q{i}]".format(i=i), "q{i}=>~p{j}".format(i=i, j=i+1)))
+        system.add_rule(Rule.from_string("[r{i}]".format(i=i), "~p{j}=>q{j}".format(j=i+1)))
+
+    return system, kb
+
+def fan_in(width=6, support=2):
+    '''
+    A rule with width antecedents, each of which is concluded by support different arguments,
+    so the rule fires support ** width times
+    '''
+
+    system = ArgumentationSystem()
+    kb = KnowledgeBase()
+
+    antecedents = []
+
+    for i in range(width):
+        antecedents.append("a{i}".format(i=i))
+        for j in range(support):
+            kb.add_premise(Formula("s{i}_{j}".format(i=i, j=j)))
+            system.add_rule(Rule.from_string("[s{i}_{j}]".format(i=i, j=j), "s{i}_{j}=>a{i}".format(i=i, j=j)))
+
+    system.add_rule(Rule.from_string("[fan]", ",".join(antecedents) + "=>c"))
+
+    kb.add_premise(Formula("n"))
+    system.add_rule(Rule.from_string("[n]", "n=>~c"))
+
+    return system, kb
+
+def first_order(constants=20, relations=2):
+    '''
+    First-order rules over constants, including a rule joining two unary predicates into a binary one,
+    which has constants ** 2 ground instances, and a chain of rules over it
+    '''
+
+    system = ArgumentationSystem()
+    kb = KnowledgeBase()
+
+    for i in range(constants):
+        kb.add_premise(Formula("p(c{i})".format(i=i)))
+        kb.add_premise(Formula("q(c{i})".format(i=i)))
+
+    system.add_rule(Rule.from_string("[join]", "p(X),q(Y)=>r0(X,Y)"))
+
+    for i in range(relations):
+        system.add_rule(Rule.from_string("[r{i}]".format(i=i), "r{i}(X,Y)=>r{j}(X,Y)".format(i=i, j=i+1)))
+
+    for i in range(0, constants, 2):
+        kb.add_premise(Formula("n(c{i})".format(i=i)))
+
+    system.add_rule(Rule.from_string("[not]", "n(X)=>~p(X)"))
+    system.add_contrary(("~p(X)", "p(X)"), True)
+
+    return system, kb
+
+def dense_contrariness(atoms=40, density=0.3, seed=0):
+    '''
+    A premise and a rule for each of atoms formulas, with each pair of formulas declared contrary with probability density
+    '''
+
+    rnd = random.Random(seed)
+
+    system = ArgumentationSystem()
+    kb = KnowledgeBase()
+
+    for i in range(atoms):
+        kb.add_premise(Formula("a{i}".format(i=i)))
+        system.add_rule(Rule.from_string("[r{i}]".format(i=i), "a{i}=>b{i}".format(i=i)))
+
+    for i in range(atoms):
+        for j in range(atoms):
+            if i != j and rnd.random() < density:
+                system.add_contrary(("b{i}".format(i=i), "b{j}".format(j=j)))
+
+    return system, kb
+
+def undercutters(rules=50, depth=2):
+    '''
+    Defeasible rules, each undercut by a chain of depth undercutters, each of which undercuts the one before
+    '''
+
+    system = ArgumentationSystem()
+    kb = KnowledgeBase()
+
+    for i in range(rules):
+        kb.add_premise(Formula("a{i}".format(i=i)))
+        system.add_rule(Rule.from_string("[r{i}]".format(i=i), "a{i}=>b{i}".format(i=i)))
+
+        target = "[r{i}]".format(i=i)
+        for j in range(depth):
+            kb.add_premise(Formula("u{i}_{j}".format(i=i, j=j)))
+            label = "[u{i}_{j}]".format(i=i, j=j)
+            system.add_rule(Rule.from_string(label, "u{i}_{j}=>~{target}".format(i=i, j=j, target=target)))
+            target = label
+
+    return system, kb
+
+def preference_order(elements=40, seed=0):
+    '''
+    Premises and defeasible rules in pairs with conflicting conclusions, with a total preference order
+    over the premises and over the rules, so most attacks depend on the preferences
+    '''
+
+    rnd = random.Random(seed)
+
+    system = ArgumentationSystem()
+    kb = KnowledgeBase()
+
+    premises = []
+    rules = []
+
+    for i in range(elements):
+        for sign in ["", "~"]:
+            premise = "{sign}p{i}".format(sign="n" if sign else "", i=i)
+            kb.add_premise(Formula(premise))
+            premises.append(premise)
+
+            label = "[{sign}r{i}]".format(sign="n" if sign else "", i=i)
+            system.add_rule(Rule.from_string(label, "{p}=>{sign}x{i}".format(p=premise, sign=sign, i=i)))
+            rules.append(label)
+
+    rnd.shuffle(premises)
+    rnd.shuffle(rules)
+
+    for i in range(len(premises) - 1):
+        kb.add_preference((premises[i], premises[i + 1]))
+
+    for i in range(len(rules) - 1):
+        system.add_rule_preference((rules[i], rules[i + 1]))
+
+    return system, kb
+
+# the generators, with the parameters of a quick and a full run
+GENERATORS = {
+    "chain": (chain, [{"length": 50}], [{"length": 100}, {"length": 200}, {"length": 100, "strict": True}]),
+    "fan_in": (fan_in, [{"width": 4}], [{"width": 6, "support": 2}, {"width": 4, "support": 4}]),
+    "first_order": (first_order, [{"constants": 10}], [{"constants": 20}, {"constants": 40, "relations": 3}]),
+    "dense_contrariness": (dense_contrariness, [{"atoms": 20}], [{"atoms": 40}, {"atoms": 80, "density": 0.2}]),
+    "undercutters": (undercutters, [{"rules": 20}], [{"rules": 50}, {"rules": 100, "depth": 3}]),
+    "preference_order": (preference_order, [{"elements": 20}], [{"elements": 40}, {"elements": 100}])
+}
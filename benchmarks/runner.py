@@ -0,0 +1,162 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+'''
+Runs the benchmarks, timing each stage of the evaluation pipeline separately, e.g.:
+
+    python -m benchmarks.runner --quick -o results.json
+    python -m benchmarks.runner --compare results.json
+'''
+
+from pyaspic import ArgumentationTheory
+from .generators import GENERATORS
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+# the stages of ArgumentationTheory.evaluate, in the order they are computed
+STAGES = ["arguments", "contrariness", "attacks", "preferences", "defeats"]
+
+def run_once(generator, parameters, semantics, ordering):
+    '''
+    Evaluates a generated theory with the local engine, returning the time taken by each stage
+    and the sizes of its arguments, attacks and defeats
+    '''
+
+    system, kb = generator(**parameters)
+    theory = ArgumentationTheory(system, kb, ordering, ArgumentationTheory.LOCAL_ENGINE)
+
+    times = {}
+
+    for stage in STAGES:
+        start = time.perf_counter()
+        theory.update_stage(stage)
+        times[stage] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    theory.evaluate(semantics)
+    times["extensions"] = time.perf_counter() - start
+
+    sizes = {"arguments": len(theory.arguments), "attacks": len(theory.attack), "defeats": len(theory.defeat)}
+
+    return times, sizes
+
+def peak_memory(generator, parameters, semantics, ordering):
+    '''
+    Returns the peak memory allocated (in bytes) while evaluating a generated theory; this is measured
+    in a separate run, as tracing allocations slows down evaluation
+    '''
+
+    tracemalloc.start()
+    try:
+        run_once(generator, parameters, semantics, ordering)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run(names=None, quick=False, repeat=3, semantics="grounded", ordering="weakest", log=None):
+    '''
+    Runs the benchmarks of the given generators (all if None), returning the results;
+    each stage's time is the best of repeat runs
+    '''
+
+    results = []
+
+    for name in sorted(GENERATORS):
+        if names and name not in names:
+            continue
+
+        generator, quick_parameters, full_parameters = GENERATORS[name]
+
+        for parameters in (quick_parameters if quick else full_parameters):
+            runs = [run_once(generator, parameters, semantics, ordering) for i in range(repeat)]
+
+            times = {stage: min(r[0][stage] for r in runs) for stage in runs[0][0]}
+
+            result = {
+                "benchmark": name,
+                "parameters": parameters,
+                "times": times,
+                "total": sum(times.values()),
+                "sizes": runs[0][1],
+                "peak_memory": peak_memory(generator, parameters, semantics, ordering)
+            }
+            results.append(result)
+
+            if log is not None:
+                log.write("{name} {parameters}: {total:.4f}s, {arguments} arguments, {memory:.1f} MiB\n".format(
+                    name=name, parameters=json.dumps(parameters, sort_keys=True), total=result["total"],
+                    arguments=result["sizes"]["arguments"], memory=result["peak_memory"] / 2**20))
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "semantics": semantics,
+        "ordering": ordering,
+        "repeat": repeat,
+        "results": results
+    }
+
+def compare(baseline, current, out):
+    '''
+    Writes the ratio of current to baseline times for the benchmarks in both
+    '''
+
+    def key(result):
+        return (result["benchmark"], json.dumps(result["parameters"], sort_keys=True))
+
+    baseline = {key(r): r for r in baseline["results"]}
+
+    for result in current["results"]:
+        if key(result) not in baseline:
+            continue
+
+        before = baseline[key(result)]
+        ratios = ["{stage} {ratio:.2f}x".format(stage=stage, ratio=result["times"][stage] / before["times"][stage])
+                  for stage in result["times"] if before["times"].get(stage)]
+
+        out.write("{name} {parameters}: total {ratio:.2f}x ({stages})\n".format(
+            name=result["benchmark"], parameters=key(result)[1], ratio=result["total"] / before["total"], stages=", ".join(ratios)))
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the stages of evaluating synthetic ASPIC+ theories")
+    parser.add_argument("benchmarks", nargs="*", help="the generators to run (default: all of {names})".format(names=", ".join(sorted(GENERATORS))))
+    parser.add_argument("--quick", action="store_true", help="run small instances only")
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument("-s", "--semantics", default="grounded")
+    parser.add_argument("--ordering", default="weakest", choices=["weakest", "last"])
+    parser.add_argument("-o", "--output", help="file to write the results to, as JSON")
+    parser.add_argument("--compare", help="results of an earlier run to compare against")
+    args = parser.parse_args(args)
+
+    results = run(args.benchmarks, args.quick, args.repeat, args.semantics, args.ordering, sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    elif not args.compare:
+        json.dump(results, sys.stdout, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results, sys.stdout)
+
+if __name__ == "__main__":
+    main()
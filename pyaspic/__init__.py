@@ -19,3 +19,12 @@ from .argumentation_system import ArgumentationSystem
 from .knowledge_base import *
 from .formula import Formula
 from .rule import Rule
+from .semantics import ArgumentationFramework
+from .batch import BatchEvaluator
+from .engine_client import EngineClient
+from .evaluation_stats import EvaluationStats
+from .well_formedness import WellFormednessChecker
+from .construction_budget import ConstructionBudget
+from .compiled_framework import CompiledFramework
+from .evaluation_cache import EvaluationCache
+from .theory_loader import TheoryLoader, load_theory
@@ -20,19 +20,147 @@ from .formula import Formula
 from .knowledge_base import KnowledgeBase
 
 class Argument:
+    '''
+    An argument is stored as its conclusion, its top rule and its direct sub-arguments (last_sub_arguments);
+    its premises, rules and sub-arguments are derived from those of its direct sub-arguments the first time
+    they are used, as frozensets that are shared with a sub-argument wherever they are the same
+
+    The labels of the rules it uses are also kept as a bitset (rule_bits) over the bits a RuleBits gives
+    rule labels, so that checking whether it uses a rule does not need the set of its rules
+    '''
+
+    __slots__ = ("label", "conclusion", "top_rule", "last_sub_arguments", "acceptable", "key", "hash", "rule_bits", "depth",
+                 "_premises", "_rules", "_rule_labels", "_sub_arguments", "_defeasible_rules", "_strict_rules")
 
     def __init__(self, label, conclusion):
 
         self.label = label
         self.conclusion = conclusion
-        self.premises = []
-        self.sub_arguments = []
-        self.last_sub_arguments = []
-        self.rules = []
-        self.defeasible_rules = []
-        self.strict_rules = []
+        self.top_rule = None
+        self.last_sub_arguments = ()
         self.acceptable = False
 
+        # canonical structural key, set by subclasses, and its hash (computed once)
+        self.key = None
+        self.hash = None
+
+        self.rule_bits = 0
+
+        # the length of the longest path from this argument to one of its premises
+        self.depth = 0
+
+        self._premises = None
+        self._rules = None
+        self._rule_labels = None
+        self._sub_arguments = None
+        self._defeasible_rules = None
+        self._strict_rules = None
+
+    @property
+    def premises(self):
+        if self._premises is None:
+            self.derive("_premises", lambda a: union([a.premises for a in a.last_sub_arguments]))
+        return self._premises
+
+    @property
+    def rules(self):
+        if self._rules is None:
+            self.derive("_rules", lambda a: union([a.rules for a in a.last_sub_arguments], a.top_rule))
+        return self._rules
+
+    @property
+    def rule_labels(self):
+        if self._rule_labels is None:
+            self.derive("_rule_labels", lambda a: union([a.rule_labels for a in a.last_sub_arguments], a.top_rule.label))
+        return self._rule_labels
+
+    @property
+    def sub_arguments(self):
+        if self._sub_arguments is None:
+            self.derive("_sub_arguments", lambda a: frozenset(a.last_sub_arguments).union(*[a.sub_arguments for a in a.last_sub_arguments]))
+        return self._sub_arguments
+
+    @property
+    def defeasible_rules(self):
+        if self._defeasible_rules is None:
+            self.derive("_defeasible_rules", lambda a: union([a.defeasible_rules for a in a.last_sub_arguments],
+                                                             a.top_rule if a.top_rule.type == Rule.DEFEASIBLE else None))
+        return self._defeasible_rules
+
+    @property
+    def strict_rules(self):
+        if self._strict_rules is None:
+            self.derive("_strict_rules", lambda a: union([a.strict_rules for a in a.last_sub_arguments],
+                                                         a.top_rule if a.top_rule.type == Rule.STRICT else None))
+        return self._strict_rules
+
+    def uses_rule(self, bit):
+        '''
+        Returns whether the argument uses the rule with the given bit (in the RuleBits it was constructed with)
+        '''
+
+        return (self.rule_bits & bit) != 0
+
+    def derive(self, name, compute):
+        '''
+        Sets the derived attribute name of this argument, and of any of its sub-arguments it has not been set for,
+        to compute(argument), working up from the deepest sub-arguments so that deep arguments do not recurse
+        '''
+
+        stack = [self]
+
+        while stack:
+            argument = stack[-1]
+
+            pending = [a for a in argument.last_sub_arguments if getattr(a, name) is None]
+            if pending:
+                stack.extend(pending)
+                continue
+
+            stack.pop()
+            if getattr(argument, name) is None:
+                setattr(argument, name, compute(argument))
+
+    def walk(self):
+        '''
+        Returns the sub-arguments of this argument depth first, each once, in the order of the direct sub-arguments
+        '''
+
+        walk = []
+        seen = set()
+        stack = list(reversed(self.last_sub_arguments))
+
+        while stack:
+            argument = stack.pop()
+            if argument in seen:
+                continue
+
+            seen.add(argument)
+            walk.append(argument)
+            stack.extend(reversed(argument.last_sub_arguments))
+
+        return walk
+
+    def has_sub_argument(self, other):
+        '''
+        Returns True if other is a (transitive) sub-argument of this argument, walking the sub-arguments only until
+        it is found, and not below those too shallow to contain it
+        '''
+
+        seen = set()
+        stack = list(self.last_sub_arguments)
+
+        while stack:
+            argument = stack.pop()
+            if argument.depth < other.depth or argument in seen:
+                continue
+            if argument == other:
+                return True
+
+            seen.add(argument)
+            stack.extend(argument.last_sub_arguments)
+
+        return False
 
     def is_strict(self):
         return (len(self.defeasible_rules) == 0)
@@ -67,39 +195,169 @@ class Argument:
     #         return "{label}: {conclusion}".format(label=self.label,conclusion=str(self.conclusion))
 
     def __str__(self):
-        if self.sub_arguments:
+        if self.last_sub_arguments:
             return self.label + ": " + ",".join([a.label for a in self.last_sub_arguments]) + self.top_rule.type + str(self.conclusion)
         else:
             return "{label}: {conclusion}".format(label=self.label,conclusion=str(self.conclusion))
 
     def __hash__(self):
-        return hash("".join([str(a) for a in self.sub_arguments]) + "".join([str(r) for r in self.rules]))
+        return self.hash
 
     def __eq__(self, other):
-        return self.__hash__() == other.__hash__();
+        if self is other:
+            return True
+
+        if not isinstance(other, Argument):
+            return False
+
+        return self.hash == other.hash and self.key == other.key
 
 
 class AtomicArgument(Argument):
 
+    __slots__ = ()
+
     def __init__(self, label, proposition):
         super().__init__(label, proposition)
 
-        self.premises.append(proposition)
-        self.top_rule = None
+        self._premises = frozenset([proposition])
+        self._rules = self._rule_labels = self._sub_arguments = self._defeasible_rules = self._strict_rules = frozenset()
+
+        self.key = (proposition.type, proposition.formula)
+        self.hash = hash(self.key)
 
 class RuleArgument(Argument):
-    def __init__(self, label, top_rule, last_sub_arguments):
+
+    __slots__ = ()
+
+    def __init__(self, label, top_rule, last_sub_arguments, rule_bit):
         super().__init__(label, top_rule.consequent)
 
-        self.last_sub_arguments = last_sub_arguments
-        self.rules.append(top_rule)
+        self.top_rule = top_rule
+        self.last_sub_arguments = tuple(last_sub_arguments)
 
-        for a in last_sub_arguments:
-            self.premises.extend(a.premises)
-            self.rules.extend([r for r in a.rules if r not in self.rules])
-            self.sub_arguments.extend([a] + a.sub_arguments)
+        # arguments are identified by their top rule and their direct sub-arguments; sub-arguments
+        # are compared by their own (cached) keys, so this is cheap to hash and compare
+        self.key = (top_rule.label, top_rule.type, top_rule.consequent, self.last_sub_arguments)
+        self.hash = hash(self.key)
 
-        self.defeasible_rules = [r for r in self.rules if r.type==Rule.DEFEASIBLE]
-        self.strict_rules = [r for r in self.rules if r.type==Rule.STRICT]
+        self.rule_bits = rule_bit
+        for a in self.last_sub_arguments:
+            self.rule_bits = self.rule_bits | a.rule_bits
+            self.depth = max(self.depth, a.depth)
 
-        self.top_rule = top_rule
+        self.depth = self.depth + 1
+
+class RuleBits:
+    '''
+    Gives each rule label a bit, for the rule_bits of the arguments constructed with it. Each theory has its own,
+    started afresh whenever it constructs its arguments from scratch, so it only holds the labels of its rules
+    '''
+
+    def __init__(self):
+        self.bits = {}
+
+    def bit(self, label):
+        bit = self.bits.get(label)
+        if bit is None:
+            bit = 1 << len(self.bits)
+            self.bits[label] = bit
+        return bit
+
+    def mask(self, labels):
+        mask = 0
+        for label in labels:
+            mask = mask | self.bit(label)
+        return mask
+
+def union(sets, element=None):
+    '''
+    Returns the union of the frozensets and element (if not None), reusing the largest of the sets if it is the union
+    '''
+
+    largest = max(sets, key=len) if sets else frozenset()
+
+    if all(s is largest or s <= largest for s in sets) and (element is None or element in largest):
+        return largest
+
+    result = largest.union(*[s for s in sets if s is not largest])
+    if element is not None:
+        result = result | frozenset([element])
+
+    return result
+
+
+class ArgumentIndex:
+    '''
+    Index over the conclusions of arguments, keyed by (term, arity), by the constant
+    in each parameter position and by the conclusion itself, so that the arguments whose
+    conclusion matches a formula can be found without scanning every argument
+    '''
+
+    def __init__(self, arguments=None):
+        self.by_term = {}
+        self.by_constant = {}
+        self.by_conclusion = {}
+
+        if arguments is not None:
+            for a in arguments:
+                self.add(a)
+
+    def add(self, argument):
+        conclusion = argument.conclusion
+        key = (conclusion.term, len(conclusion.parameters))
+
+        if key not in self.by_term:
+            self.by_term[key] = []
+        self.by_term[key].append(argument)
+
+        for i in range(len(conclusion.parameters)):
+            constant_key = (key, i, conclusion.parameters[i])
+            if constant_key not in self.by_constant:
+                self.by_constant[constant_key] = []
+            self.by_constant[constant_key].append(argument)
+
+        conclusion = str(conclusion)
+        if conclusion not in self.by_conclusion:
+            self.by_conclusion[conclusion] = []
+        self.by_conclusion[conclusion].append(argument)
+
+    def remove(self, argument):
+        conclusion = argument.conclusion
+        key = (conclusion.term, len(conclusion.parameters))
+
+        self.by_term[key].remove(argument)
+
+        for i in range(len(conclusion.parameters)):
+            self.by_constant[(key, i, conclusion.parameters[i])].remove(argument)
+
+        self.by_conclusion[str(conclusion)].remove(argument)
+
+    def with_conclusion(self, conclusion):
+        '''
+        Returns the arguments whose conclusion is (the string) conclusion
+        '''
+
+        return self.by_conclusion.get(conclusion, [])
+
+    def matches(self, formula):
+        '''
+        Returns the arguments whose conclusion has the same term and number of parameters as formula,
+        and the same parameter wherever formula does not have a variable
+        '''
+
+        key = (formula.term, len(formula.parameters))
+        candidates = self.by_term.get(key, [])
+
+        # narrow down to the smallest bucket of any constant position
+        constants = [i for i in range(len(formula.parameters)) if not formula.parameters[i][0].isupper()]
+
+        for i in constants:
+            bucket = self.by_constant.get((key, i, formula.parameters[i]), [])
+            if len(bucket) < len(candidates):
+                candidates = bucket
+
+        if not constants:
+            return candidates
+
+        return [a for a in candidates if all(a.conclusion.parameters[i] == formula.parameters[i] for i in constants)]
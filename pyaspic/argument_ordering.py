@@ -0,0 +1,137 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from .set_preference import SetPreference
+
+class ArgumentOrdering:
+    '''
+    Compares arguments under the weakest-link or last-link ordering, using the preferences
+    between knowledge base elements and between rules compiled into bitsets
+
+    The premises and rules of each argument are compiled once, so a comparison costs a few
+    integer operations and pairs of arguments can be compared on demand (e.g. only for attacks)
+    '''
+
+    WEAKEST = "weakest"
+    LAST = "last"
+
+    def __init__(self, knowledge_base, argumentation_system, ordering="weakest"):
+        self.ordering = ordering
+
+        self.premise_preferences = SetPreference(knowledge_base.preferences)
+        self.rule_preferences = SetPreference(argumentation_system.rule_preferences)
+
+        self.profiles = {}
+
+    def profile(self, argument):
+        '''
+        Returns the compiled premises, defeasible rules and last defeasible rules of the argument,
+        whether it is strict and firm, whether it is defeasible or plausible, and whether it is firm
+        '''
+
+        profile = self.profiles.get(argument.label)
+
+        if profile is None:
+            # the profiles of the sub-arguments are combined, so they are found first, without recursing
+            stack = [argument]
+
+            while stack:
+                a = stack[-1]
+
+                pending = [s for s in a.last_sub_arguments if s.label not in self.profiles]
+                if pending:
+                    stack.extend(pending)
+                    continue
+
+                stack.pop()
+                if a.label not in self.profiles:
+                    self.profiles[a.label] = self.combine(a)
+
+            profile = self.profiles[argument.label]
+
+        return profile
+
+    def combine(self, argument):
+        '''
+        Returns the profile of the argument from the profiles of its direct sub-arguments
+        '''
+
+        if argument.top_rule is None:
+            premises = self.premise_preferences.compile(argument.premises)
+            rules = self.rule_preferences.compile([])
+            firm = argument.is_firm()
+        else:
+            subs = [self.profiles[s.label] for s in argument.last_sub_arguments]
+            premises = self.premise_preferences.merge([p[0] for p in subs])
+            rules = self.rule_preferences.merge([p[1] for p in subs] + [self.rule_preferences.compile(argument.last_def_rules())])
+            firm = any(p[5] for p in subs)
+
+        strict = rules[0] == 0
+
+        return (premises,
+                rules,
+                self.rule_preferences.compile(argument.last_def_rules()),
+                strict and firm,
+                not strict or not firm,
+                firm)
+
+    def compare(self, arg1, arg2):
+        '''
+        Compares two (different) arguments, returning the preference (less preferred label, more preferred label)
+        that follows from comparing arg1 to arg2 under the ordering, or None
+        '''
+
+        p1 = self.profile(arg1)
+        p2 = self.profile(arg2)
+
+        if self.ordering == self.LAST:
+            if p1[3] and p2[4]:
+                return (arg2.label, arg1.label)
+            elif p1[2][0] == 0 and p2[2][0] == 0:
+                if self.premise_preferences.check(p1[0], p2[0]):
+                    return (arg1.label, arg2.label)
+            elif self.rule_preferences.check(p1[2], p2[2]):
+                return (arg1.label, arg2.label)
+        elif self.ordering == self.WEAKEST:
+            if self.premise_preferences.check(p1[0], p2[0]):
+                if p2[1][0] > 0:
+                    if self.rule_preferences.check(p1[1], p2[1]):
+                        return (arg1.label, arg2.label)
+                else:
+                    return (arg1.label, arg2.label)
+
+        return None
+
+    def is_less_preferred(self, arg1, arg2):
+        '''
+        Checks if arg1 is less preferred than arg2, i.e. if (arg1.label, arg2.label) follows from
+        comparing arg1 to arg2 or from comparing arg2 to arg1
+        '''
+
+        if arg1.label == arg2.label:
+            return False
+
+        preference = (arg1.label, arg2.label)
+
+        return self.compare(arg1, arg2) == preference or self.compare(arg2, arg1) == preference
+
+    def preferences(self, pairs):
+        '''
+        Returns the set of pairs (arg1, arg2) of arguments in pairs where arg1 is less preferred than arg2
+        '''
+
+        return set([(arg1, arg2) for (arg1, arg2) in pairs if self.is_less_preferred(arg1, arg2)])
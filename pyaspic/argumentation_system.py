@@ -15,55 +15,121 @@ You should have received a copy of the GNU Lesser General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
+import copy
+import re
 from .rule import Rule
 from .formula import Formula
 
 class ArgumentationSystem:
 
+    LAZY_TRANSPOSITION = "lazy"
+
     def __init__(self, transposition=False):
-        self.language = set()
         self.rules = set()
         self.rule_preferences = []
 
-        self.contrariness = {}
+        # the contrariness as added, which contrariness is instantiated from as the language grows
+        self.declared_contrariness = {}
+
+        # the declared (formula, contrary) pairs, by the term and arity of the formula and of the contrary
+        self.contrary_patterns = {}
+        self.contrary_of_patterns = {}
 
+        # the language (the conclusions of arguments), also indexed by term and arity, the contraries
+        # of each formula in it (and of each declared formula without variables) and the formulas each is a contrary of,
+        # as strings, and the formulas whose contraries have changed since changed_contrariness was last emptied
+        self.clear_language()
+
+        # False, True to add the transpositions of strict rules as they are added, or LAZY_TRANSPOSITION
+        # to add them during construction, once an argument concludes the negation of the rule's consequent
         self.transposition = transposition
 
+        # the structures of the rules, so transpositions that are already rules are not added again
+        self.rule_structures = set()
+
+        # with lazy transposition, the strict rules not transposed yet, by the term and arity of their negated consequent
+        # and of their antecedents, and the labels of the rules that have been
+        self.transposable = {}
+        self.transposable_antecedents = {}
+        self.transposed = set()
+
+        # incremented on every change, so that theories can tell when cached results are stale
+        self.version = 0
+
+        # the rules indexed by the term and arity of their consequents, and the version and number of rules it was built at
+        self.consequent_index = None
+
     def add_rule(self, rule:Rule):
         self.rules.add(rule)
+        self.rule_structures.add(self.rule_structure(rule))
+        self.version = self.version + 1
+
+        # if the rule is strict and we're closed under transposition, add the transpositions, now or when needed
+        if rule.type == Rule.STRICT and self.transposition == self.LAZY_TRANSPOSITION:
+            key = (self.negation(rule.consequent).term, len(rule.consequent.parameters))
+            self.transposable.setdefault(key, []).append(rule)
+            for ant in rule.antecedents:
+                self.transposable_antecedents.setdefault((ant.term, len(ant.parameters)), []).append(rule)
+        elif rule.type == Rule.STRICT and self.transposition == True:
+            self.add_transpositions(rule)
 
-        # if the rule is strict and we're closed under transposition, add the transposition
-        if rule.type == Rule.STRICT and self.transposition == True:
-            antecedents = [str(a) for a in rule.antecedents]
+    def negation(self, formula):
+        return Formula("~" + str(formula))
+
+    def rule_structure(self, rule):
+        return (frozenset(rule.antecedents), rule.consequent, rule.type)
+
+    def transpositions(self, rule):
+        '''
+        Returns the transpositions of a strict rule: for each antecedent, the rule from the other antecedents
+        and the negation of the consequent to the negation of that antecedent, labelled [<label>tp<n>]
+        '''
 
-            label = rule.label[1:-1]
+        label = rule.label[1:-1]
+        negated_consequent = self.negation(rule.consequent)
 
-            new_antecedents = []
-            skip = 0
+        transpositions = []
+        for i in range(len(rule.antecedents)):
+            antecedents = rule.antecedents[:i] + rule.antecedents[i+1:] + [negated_consequent]
+            new_label = "[{label}tp{counter}]".format(label=label, counter=i+1)
+            transpositions.append(Rule(new_label, antecedents, self.negation(rule.antecedents[i]), Rule.STRICT))
 
-            if len(antecedents) == 1:
-                new_antecedents.append(["~"+str(rule.consequent)])
-            else:
-                while skip < len(antecedents):
-                    s = []
-                    for i in range(len(antecedents)):
-                        if i != skip:
-                            s.append(antecedents[i])
+        return transpositions
 
-                    skip = skip + 1
-                    if s:
-                        s.append("~"+str(rule.consequent))
-                        new_antecedents.append(s)
+    def add_transpositions(self, rule):
+        '''
+        Adds the transpositions of a strict rule that are not already rules (with the same antecedents,
+        in any order, and consequent), returning the added rules
+        '''
 
-            counter = 1
+        self.transposed.add(rule.label)
 
-            for s in new_antecedents:
-                consequent = "~"+list(set(antecedents) - set(s))[0]
-                new_rule = ",".join(s) + "->" + consequent
-                new_label = "[{label}tp{counter}]".format(label=label,counter=str(counter))
-                r = Rule.from_string(new_label, new_rule)
+        added = []
+        for r in self.transpositions(rule):
+            structure = self.rule_structure(r)
+            if structure not in self.rule_structures:
                 self.rules.add(r)
-                counter = counter + 1
+                self.rule_structures.add(structure)
+                added.append(r)
+
+        return added
+
+    def derive_transpositions(self, term, arity, antecedent=False):
+        '''
+        With lazy transposition, adds the transpositions of the strict rules whose negated consequent
+        (or, if antecedent, one of whose antecedents) has the given term and arity, returning the added rules
+
+        The transpositions are part of the closure of the rules, so deriving them does not change the version
+        '''
+
+        index = self.transposable_antecedents if antecedent else self.transposable
+        added = []
+
+        for rule in index.pop((term, arity), []):
+            if rule.label not in self.transposed:
+                added.extend(self.add_transpositions(rule))
+
+        return added
 
     def add_rule_preference(self, preference):
         less_preferred = preference[0]
@@ -73,6 +139,82 @@ class ArgumentationSystem:
 
         if len(r) == 2:
             self.rule_preferences.append(preference)
+            self.version = self.version + 1
+
+    def add_rule_preferences(self, preferences):
+        '''
+        Adds each preference as add_rule_preference does, indexing the rules by label once rather than for each preference
+        '''
+
+        rules = {}
+        for rule in self.rules:
+            rules.setdefault(rule.label, []).append(rule)
+
+        added = False
+
+        for preference in preferences:
+            (less_preferred, more_preferred) = (preference[0], preference[1])
+
+            count = len(rules.get(less_preferred, []))
+            if more_preferred != less_preferred:
+                count = count + len([rule for rule in rules.get(more_preferred, []) if rule.type != Rule.STRICT])
+
+            if count == 2:
+                self.rule_preferences.append(preference)
+                added = True
+
+        if added:
+            self.version = self.version + 1
+
+    def remove_rule(self, label):
+        '''
+        Removes the rule with the given label, along with its transpositions and any preferences over them,
+        returning the labels of the removed rules
+        '''
+
+        transposition = re.compile(r"^\[" + re.escape(label[1:-1]) + r"tp[0-9]+\]$")
+
+        removed = set([r.label for r in self.rules if r.label == label or transposition.match(r.label)])
+
+        if removed:
+            self.rules = set([r for r in self.rules if r.label not in removed])
+            self.rule_structures = set([self.rule_structure(r) for r in self.rules])
+            self.transposed = self.transposed - removed
+
+            for index in [self.transposable, self.transposable_antecedents]:
+                for key in index:
+                    index[key] = [r for r in index[key] if r.label not in removed]
+            self.rule_preferences = [p for p in self.rule_preferences if p[0] not in removed and p[1] not in removed]
+            self.version = self.version + 1
+
+        return removed
+
+    def remove_rule_preference(self, preference):
+        if preference in self.rule_preferences:
+            self.rule_preferences = [p for p in self.rule_preferences if p != preference]
+            self.version = self.version + 1
+
+    def rules_concluding(self, term, arity):
+        '''
+        Returns the rules whose consequent has the given term and number of parameters,
+        first deriving the transpositions that conclude it with lazy transposition
+        '''
+
+        if self.transposition == self.LAZY_TRANSPOSITION and term[0] == "~":
+            self.derive_transpositions(term[1:], arity, True)
+
+        # derived transpositions do not change the version, but do change the number of rules
+        if self.consequent_index is None or self.consequent_index[0] != (self.version, len(self.rules)):
+            index = {}
+            for r in self.rules:
+                key = (r.consequent.term, len(r.consequent.parameters))
+                if key not in index:
+                    index[key] = []
+                index[key].append(r)
+
+            self.consequent_index = ((self.version, len(self.rules)), index)
+
+        return self.consequent_index[1].get((term, arity), [])
 
     def add_contrary(self, contrary, contradiction=False):
         '''
@@ -82,95 +224,207 @@ class ArgumentationSystem:
 
         If contradiction=True, el2 is also a contrary of el1, or formally:
             el1 in cf(el2)
+
+        Either may have variables, in which case the contrariness holds between their instantiations
+        in the language whose shared variables have the same values
         '''
 
         el1 = contrary[0]
         el2 = contrary[1]
 
-        if str(el2) not in self.contrariness:
-            self.contrariness[str(el2)] = set()
-
         if type(el1) is str:
             el1 = Formula(el1)
 
-        self.contrariness[str(el2)].add(el1)
+        if str(el2) not in self.declared_contrariness:
+            self.declared_contrariness[str(el2)] = set()
+
+        if el1 not in self.declared_contrariness[str(el2)]:
+            self.declared_contrariness[str(el2)].add(el1)
+
+            pair = (Formula(str(el2)), el1)
+            for (index, formula) in [(self.contrary_patterns, pair[0]), (self.contrary_of_patterns, pair[1])]:
+                key = (formula.term, len(formula.parameters))
+                if key not in index:
+                    index[key] = []
+                index[key].append(pair)
+
+            # instantiate the new contrariness over the language so far
+            self.instantiate_contrary(pair)
+
+        self.version = self.version + 1
 
         if contradiction:
             self.add_contrary((el2, el1), False)
 
+    def instantiate_contrary(self, pair):
+        '''
+        Adds the contrariness for each instantiation of a declared (formula, contrary) pair in the language
+        '''
+
+        for (formula, binding) in self.instances(pair[0]):
+            for (c, b) in self.instances(pair[1], binding):
+                self.add_contrariness(formula, c)
+
+    def unify(self, pattern, formula, binding=None):
+        '''
+        Returns the binding of the variables of pattern that makes it formula, extending and
+        consistent with binding, or None if there is none
+        '''
+
+        if pattern.term != formula.term or len(pattern.parameters) != len(formula.parameters):
+            return None
+
+        binding = dict(binding) if binding else {}
+
+        for (p, f) in zip(pattern.parameters, formula.parameters):
+            if p[0].isupper():
+                if binding.setdefault(p, f) != f:
+                    return None
+            elif p != f:
+                return None
+
+        return binding
+
+    def instances(self, pattern, binding=None):
+        '''
+        Returns (formula, binding) for each instantiation of pattern in the language consistent with binding;
+        a formula without variables is its only instantiation, whether in the language or not
+        '''
+
+        if not pattern.has_variables():
+            return [(pattern, binding or {})]
+
+        instances = []
+        for formula in self.language_index.get((pattern.term, len(pattern.parameters)), []):
+            b = self.unify(pattern, formula, binding)
+            if b is not None:
+                instances.append((formula, b))
+
+        return instances
+
     def instantiate_formula(self, formula):
         '''
         Instantiates the given formula using the language
         '''
 
-        instantiated = []
-        parameter_mapping = []
+        return dict([(f, {k: v for k, v in b.items() if k in formula.variables}) for (f, b) in self.instances(formula)])
+
+    def add_contrariness(self, formula, contrary):
+        '''
+        Records that contrary is a contrary of formula, both instantiated
+        '''
+
+        formula = str(formula)
+        contrary = str(contrary)
+
+        contraries = self.contraries_of(formula)
+        if contrary in contraries:
+            return
+
+        contraries.add(contrary)
+
+        if contrary not in self.contrary_to:
+            self.contrary_to[contrary] = set()
+        self.contrary_to[contrary].add(formula)
+
+        self.changed_contrariness.add(formula)
+
+    def contraries_of(self, formula):
+        '''
+        Returns the set of contraries of formula, as strings, which always includes its negation
+        '''
+
+        # a string is written as the formula would be (e.g. "q(a,b)" as "q(a, b)")
+        formula = str(Formula(formula)) if type(formula) is str else str(formula)
+        contraries = self.contrariness.get(formula)
+        if contraries is None:
+            contraries = set()
+            self.contrariness[formula] = contraries
+            self.add_contrariness(formula, formula[1:] if formula[0] == "~" else "~" + formula)
+
+        return contraries
+
+    def add_to_language(self, formula):
+        '''
+        Adds a formula to the language, instantiating the contrariness for it: its own contraries,
+        and it as a contrary of the formulas in the language
+        '''
+
+        if formula in self.language:
+            return
+
+        self.language.add(formula)
+        self.language_size = self.language_size + 1
+
+        key = (formula.term, len(formula.parameters))
+        if key not in self.language_index:
+            self.language_index[key] = []
+        self.language_index[key].append(formula)
 
-        if formula.has_variables():
-            for wff in self.language:
-                parameter_map = {}
-                tmp = []
-                if formula.term == wff.term and len(formula.parameters) == len(wff.parameters):
-                    for i in range(len(formula.parameters)):
-                        if formula.parameters[i] == wff.parameters[i] or formula.parameters[i].isupper():
-                            tmp.append(wff.parameters[i])
-                            if formula.parameters[i].isupper():
-                                parameter_map[formula.parameters[i]] = wff.parameters[i]
+        self.contraries_of(str(formula))
 
-                    if len(tmp) == len(formula.parameters):
-                        instantiated.append(Formula("{term}({params})".format(term=formula.term,params=",".join(tmp))))
-                        parameter_mapping.append(parameter_map)
-        else:
-            instantiated = [formula]
-            parameter_mapping.append({})
+        for (pattern, contrary) in self.contrary_patterns.get(key, []):
+            binding = self.unify(pattern, formula)
+            if binding is not None:
+                for (c, b) in self.instances(contrary, binding):
+                    self.add_contrariness(formula, c)
 
-        return dict(zip(instantiated, parameter_mapping))
+        for (pattern, contrary) in self.contrary_of_patterns.get(key, []):
+            binding = self.unify(contrary, formula)
+            if binding is not None:
+                for (f, b) in self.instances(pattern, binding):
+                    self.add_contrariness(f, formula)
 
     def update_contrariness(self):
         '''
-        Updates the contrariness to reflect specific instantiations of rules
+        Instantiates the contrariness for any formulas added to the language directly, rather than
+        with add_to_language; otherwise the contrariness is already up to date with the language
         '''
 
-        temp = {}
+        if len(self.language) == self.language_size:
+            return
 
-        for wff in self.language:
-            wff = str(wff)
-            if wff[0] == "~":
-                temp[wff] = [wff[1:]]
-            else:
-                temp[wff] = ["~"+wff]
+        for formula in [f for f in self.language if f not in self.language_index.get((f.term, len(f.parameters)), [])]:
+            self.language.discard(formula)
+            self.add_to_language(formula)
 
-        contrary_pairs = []
+    def copy(self):
+        '''
+        Returns a copy of this system with an empty language: the rules and formulas are shared, but not the
+        sets, lists and indexes that change as rules, transpositions and contraries are added, so the copy
+        and this system can change independently
+        '''
 
-        for el, contraries in self.contrariness.items():
-            contrary_pairs.extend([(c, el) for c in contraries])
+        system = copy.copy(self)
 
-        contrary_pairs = [(str(el2), el1) for el1,x in self.contrariness.items() for el2 in x]
+        system.rules = set(self.rules)
+        system.rule_structures = set(self.rule_structures)
+        system.rule_preferences = list(self.rule_preferences)
+        system.transposed = set(self.transposed)
 
-        for (el1, el2) in contrary_pairs:
-            el1 = Formula(el1)
-            el2 = Formula(el2)
-
-            el1_instantiations = self.instantiate_formula(el1)
-            el2_instantiations = self.instantiate_formula(el2)
-
-            for el2_instantiation, el2_mapping in el2_instantiations.items():
-                c = set(["~"+str(el2_instantiation)])
-                for el1_instantiation, el1_mapping in el1_instantiations.items():
-                    if el1_mapping == el2_mapping:
-                        c.add(str(el1_instantiation))
-                    elif el1_mapping == {} or el2_mapping == {}:
-                        c.add(str(el1_instantiation))
-                    else:
-                        for k1,v1 in el1_mapping.items():
-                            add = True
-                            for k2, v2 in el2_mapping.items():
-                                if v1 == v2 and k1 != k2 or k1 == k2 and v1 != v2:
-                                    add = False
-                                    break
-                            if add:
-                                c.add(str(el1_instantiation))
-
-                temp[str(el2_instantiation)] = c
-
-        self.contrariness = temp
+        system.transposable = {key: list(rules) for key, rules in self.transposable.items()}
+        system.transposable_antecedents = {key: list(rules) for key, rules in self.transposable_antecedents.items()}
+
+        system.declared_contrariness = {key: set(contraries) for key, contraries in self.declared_contrariness.items()}
+        system.contrary_patterns = {key: list(pairs) for key, pairs in self.contrary_patterns.items()}
+        system.contrary_of_patterns = {key: list(pairs) for key, pairs in self.contrary_of_patterns.items()}
+
+        system.clear_language()
+
+        return system
+
+    def clear_language(self):
+        '''
+        Empties the language, leaving the contrariness between the declared formulas without variables
+        '''
+
+        self.language = set()
+        self.language_index = {}
+        self.language_size = 0
+        self.contrariness = {}
+        self.contrary_to = {}
+        self.changed_contrariness = set()
+
+        for pairs in self.contrary_patterns.values():
+            for pair in pairs:
+                self.instantiate_contrary(pair)
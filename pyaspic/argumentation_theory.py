@@ -19,11 +19,16 @@ from .argument import *
 from .argumentation_system import ArgumentationSystem
 from .knowledge_base import KnowledgeBase
 from .formula import Formula
-import itertools
+from .argument_ordering import ArgumentOrdering
+from .semantics import ArgumentationFramework
+from .engine_client import EngineClient
+from .evaluation_stats import EvaluationStats
+from .grounder import RuleGrounder
+from .well_formedness import WellFormednessChecker
 import copy
-from .set_preference import check_preference
-import requests
+import hashlib
 import json
+import time
 import os
 
 import pprint
@@ -33,7 +38,20 @@ class ArgumentationTheory:
     Class representing an ASPIC+ Argumentation Theory (AT)
     '''
 
-    def __init__(self, argumentation_system, knowledge_base, ordering="weakest", engine="http://ws.arg.tech/e/dom"):
+    # use as the engine to compute extensions in-process instead of calling a remote service
+    LOCAL_ENGINE = "local"
+
+    # the cached stages of the evaluation pipeline, and the stages each one depends on
+    STAGES = {
+        "arguments": [],
+        "contrariness": ["arguments"],
+        "attacks": ["contrariness"],
+        "preferences": ["arguments"],
+        "defeats": ["attacks", "preferences"]
+    }
+
+    def __init__(self, argumentation_system, knowledge_base, ordering="weakest", engine="http://ws.arg.tech/e/dom", stats=None,
+                 minimal=False, max_per_conclusion=None, cache=None):
 
         self.argumentation_system = argumentation_system
         self.knowledge_base = knowledge_base
@@ -41,78 +59,243 @@ class ArgumentationTheory:
         self.arg_count = 0;
 
         self.arguments = []
+        self.argument_index = ArgumentIndex()
+        self.argument_registry = {}
+        self.rule_bits = RuleBits()
+        self.super_arguments = {}
+        self.argument_descriptions = {}
         self.attack = []
         self.defeat = []
 
+        # the attackers and defeaters of each argument, by label; attackers and direct defeaters
+        # only attack the argument itself, defeaters include the defeaters of its sub-arguments
+        self.attackers = {}
+        self.direct_defeaters = {}
+        self.defeaters = {}
+
         self.argument_preferences = []
+        self.argument_ordering = None
         self.ordering = ordering
 
         self.engine = engine
 
+        # for each stage, the inputs it was last computed from and the generation it was computed in
+        self.stages = {}
+        self.generation = 0
+
+        # engine responses, keyed by (defeats generation, engine, semantics)
+        self.engine_responses = {}
+
+        # an EvaluationStats to record where evaluation time goes (True for a new one), or None
+        if stats is True:
+            stats = EvaluationStats()
+        self.stats = stats
+
+        # the last grounded labelling computed locally, and the arguments whose defeaters have changed
+        # since (None if unknown), so the labelling can be updated rather than recomputed
+        self.grounded_labelling = None
+        self.changed_arguments = None
+
+        # the ConstructionBudget that limits the construction of arguments, if any, and the limit
+        # construction stopped at (None if all the arguments were constructed)
+        self.budget = None
+        self.partial = None
+
+        # whether construction only keeps arguments that are not dominated by another argument for
+        # the same conclusion (see keep_argument), and the most arguments it keeps for a conclusion
+        self.minimal = minimal
+        self.max_per_conclusion = max_per_conclusion
+
+        # an EvaluationCache of the responses of evaluate, keyed by fingerprint, or None; and the
+        # fingerprint of the theory with the inputs it was computed from
+        self.cache = cache
+        self.theory_fingerprint = None
+
     def check_well_formed(self):
         '''
-        Checks if this theory is well-formed based on the two principles in Prakken 2010
+        Checks if this theory is well-formed based on the two principles in Prakken 2010, returning (True, None)
+        or (False, the first principle violated); see well_formedness_violations for all the violations
         '''
 
-        # check 1: no consequent of a defeasible rule is a contrary of the consequent of a strict rule
-        rules = self.argumentation_system.rules
-        contrariness = {x:str(z) for x,y in self.argumentation_system.contrariness.items() for z in y}
+        violations = self.well_formedness_violations()
 
-        # record the rule consequents for check 2...
-        rule_consequents = []
+        if violations:
+            return False, violations[0][0]
 
-        for r1 in rules:
-            rule_consequents.append(r1.consequent)
-            for r2 in rules:
-                if r1.label == r2.label:
-                    continue
+        return True, None
+
+    def well_formedness_violations(self, semantics=None):
+        '''
+        Returns (principle, description) for every violation of the well-formedness principles and,
+        if semantics is given, of the rationality postulates by the extensions under those semantics
+        (see WellFormednessChecker)
+        '''
 
-                if r1.type == Rule.STRICT and r2.type == Rule.DEFEASIBLE:
-                    if str(r1.consequent) in contrariness and str(r2.consequent) in contrariness[str(r1.consequent)]:
-                        return False, "Consequents of defeasible rules cannot be contraries of consequents of strict rules"
+        checker = WellFormednessChecker(self.argumentation_system, self.knowledge_base)
+        violations = checker.violations()
 
-        # check 2: assumptions can't be contraries of consequents of rules, nor axioms/premises
-        for a in self.knowledge_base.assumptions:
-            for el in rule_consequents + self.knowledge_base.axioms + self.knowledge_base.premises:
-                if str(el) in contrariness:
-                    if str(a) in contrariness[str(el)]:
-                        return False, "Assumptions cannot be contraries of axioms or premises"
+        if semantics is not None:
+            # the conclusions of the arguments are needed, so a cached response will not do
+            response, _ = self.evaluate_theory(semantics, None, None)
 
-        return True, None
+            for id, ext in response["extensions"].items():
+                ext = set(ext)
+                violations.extend(checker.postulate_violations([a.conclusion for a in self.arguments if a.label in ext], id))
+
+        return violations
+
+    def evaluate(self, semantics="grounded", query=None, budget=None):
+        '''
+        Evaluates this theory under the given semantics
+
+        Each stage of the evaluation (arguments, contrariness, attacks, preferences, defeats and
+        extensions) is cached, and only recomputed when something it depends on has changed
+        through the argumentation system, the knowledge base, the ordering or the engine
+
+        If budget (a ConstructionBudget) is given, construction stops when it is exceeded, and the
+        extensions of the arguments constructed so far are returned, with response["partial"] set
+        to the limit that was exceeded
+
+        With a cache, the response for a theory with the same fingerprint is returned if there is one
+        (its arguments may be labelled differently), and responses are cached unless they are partial.
+        The arguments of the theory are not constructed when the response is cached
+        '''
+
+        cached = self.cached_response(semantics, query, budget)
+        if cached is not None:
+            return cached
+
+        return self.cache_response(self.evaluate_theory(semantics, query, budget), semantics, budget)
+
+    def evaluate_theory(self, semantics, query, budget):
+        '''
+        Evaluates this theory as evaluate does, without the cache
+        '''
+
+        self.budget = budget
+        self.update_stage("defeats")
+
+        return self.theory_response(self.engine_response(semantics), semantics, query)
+
+    async def evaluate_async(self, semantics="grounded", query=None, budget=None):
+        '''
+        As evaluate, but awaitable: with a remote engine, the event loop is free while waiting for its response
+        '''
 
+        cached = self.cached_response(semantics, query, budget)
+        if cached is not None:
+            return cached
 
-    def evaluate(self, semantics="grounded", query=None):
+        self.budget = budget
+        self.update_stage("defeats")
 
-        self.construct_arguments()
-        self.calculate_argument_preferences()
-        self.calculate_defeat()
+        key = self.engine_response_key(semantics)
+
+        if self.engine == self.LOCAL_ENGINE or key in self.engine_responses:
+            response = self.engine_response(semantics)
+        else:
+            if self.stats is not None:
+                start = time.perf_counter()
+
+            response = await self.engine_client().evaluate_async([a.label for a in self.arguments], self.defeat, semantics)
+            self.engine_responses[key] = response
+
+            if self.stats is not None:
+                self.stats.record_stage("extensions", time.perf_counter() - start)
+
+        return self.cache_response(self.theory_response(response, semantics, query), semantics, budget)
+
+    def fingerprint(self, semantics="grounded"):
+        '''
+        Returns a hash (as hex) of the rules (and their transpositions), contrariness, knowledge base, preferences,
+        ordering and construction options of this theory and semantics, which does not depend on the order
+        in which any of them were added
+        '''
+
+        system = self.argumentation_system
+        knowledge_base = self.knowledge_base
+
+        inputs = (system.version, knowledge_base.version, self.ordering, self.minimal, self.max_per_conclusion)
+
+        if self.theory_fingerprint is None or self.theory_fingerprint[0] != inputs:
+            # lazily transposed systems only hold the transpositions derived so far, so all of them are included
+            rules = set([str(r) for r in system.rules])
+            if system.transposition == ArgumentationSystem.LAZY_TRANSPOSITION:
+                for r in system.rules:
+                    if r.type == Rule.STRICT and r.label not in system.transposed:
+                        rules.update([str(t) for t in system.transpositions(r) if system.rule_structure(t) not in system.rule_structures])
+
+            canonical = {
+                "rules": sorted(rules),
+                "contrariness": sorted([[el, sorted([str(c) for c in els])] for el, els in system.declared_contrariness.items() if els]),
+                "rule_preferences": sorted(set([(str(x), str(y)) for (x, y) in system.rule_preferences])),
+                "axioms": sorted(set([str(p) for p in knowledge_base.axioms])),
+                "premises": sorted(set([str(p) for p in knowledge_base.premises])),
+                "assumptions": sorted(set([str(p) for p in knowledge_base.assumptions])),
+                "preferences": sorted(set([(str(x), str(y)) for (x, y) in knowledge_base.preferences])),
+                "ordering": self.ordering,
+                "minimal": self.minimal,
+                "max_per_conclusion": self.max_per_conclusion
+            }
+
+            digest = hashlib.sha256(json.dumps(canonical, sort_keys=True).encode("utf-8")).hexdigest()
+            self.theory_fingerprint = (inputs, digest)
+
+        return hashlib.sha256("{theory}:{semantics}".format(theory=self.theory_fingerprint[1], semantics=semantics).encode("utf-8")).hexdigest()
+
+    def cached_response(self, semantics, query, budget):
+        '''
+        Returns the response of evaluate from the cache, or None
+        '''
+
+        if self.cache is None or budget is not None:
+            return None
+
+        response = self.cache.get(self.fingerprint(semantics))
+        if response is None:
+            return None
 
         query_response = None
+        if query is not None:
+            query_response = any(query in c for c in response["acceptableConclusions"].values())
+
+        return response, query_response
+
+    def cache_response(self, result, semantics, budget):
+        '''
+        Caches the response of evaluate, without its stats, unless construction was limited by a budget
+        '''
+
+        if self.cache is not None and budget is None and not self.partial:
+            self.cache.put(self.fingerprint(semantics), {key: value for (key, value) in result[0].items() if key != "stats"})
+
+        return result
+
+    def theory_response(self, response, semantics, query):
+        '''
+        Builds the response of evaluate from the engine's response
+        '''
 
-        data = {
-            "arguments": [a.label for a in self.arguments],
-            "attacks": ["({a},{b})".format(a=a,b=b) for (a,b) in self.calculate_defeat()],
-            "semantics": semantics
-        }
-        response = requests.post(self.engine, data = json.dumps(data))
-        response = response.json()
+        query_response = None
 
         if semantics not in response:
             semantics = "grounded"
 
-        extensions = {i: response[semantics][i] for i in range(len(response[semantics])) if type(response[semantics][i]) is list }
+        # the engine's response is kept for later evaluations, so the response is built from copies of its lists
+        extensions = {i: list(response[semantics][i]) for i in range(len(response[semantics])) if type(response[semantics][i]) is list }
 
         if not extensions:
-            extensions = {0: response[semantics]}
+            extensions = {0: list(response[semantics])}
 
-        del response[semantics]
+        response = {key: copy.deepcopy(value) for (key, value) in response.items() if key != semantics}
         response["extensions"] = extensions
 
 
         response["acceptableConclusions"] = {}
 
         for id, ext in extensions.items():
-            c = [str(a.conclusion) for a in self.arguments if a.label in extensions[id]]
+            ext = set(ext)
+            c = [str(a.conclusion) for a in self.arguments if a.label in ext]
 
             if query is not None and query in c:
                 query_response = True
@@ -122,27 +305,464 @@ class ArgumentationTheory:
         response["arguments"] = {}
 
         for a in self.arguments:
-            arg = {"conclusion": str(a.conclusion),
-                   "defeasible_rules": [str(r) for r in a.defeasible_rules],
-                   "premises": [str(p) for p in a.premises],
-                   "top_rule": str(a.top_rule),
-                   "sub_arguments": [s.label for s in a.sub_arguments],
-                   "last_sub_arguments": [s.label for s in a.last_sub_arguments]
-                  }
-            response["arguments"][a.label] = arg
+            # arguments never change, so each is only described once, with tuples rather than lists,
+            # and each response is given its own copy
+            if a.label not in self.argument_descriptions:
+                sub_arguments = a.walk()
+                self.argument_descriptions[a.label] = {"conclusion": str(a.conclusion),
+                       "defeasible_rules": tuple(unique([str(s.top_rule) for s in [a] + sub_arguments if s.top_rule is not None and s.top_rule.type == Rule.DEFEASIBLE])),
+                       "premises": tuple(unique([str(p) for s in [a] + sub_arguments if s.top_rule is None for p in s.premises])),
+                       "top_rule": str(a.top_rule),
+                       "sub_arguments": tuple([s.label for s in sub_arguments]),
+                       "last_sub_arguments": tuple([s.label for s in a.last_sub_arguments])
+                      }
+            response["arguments"][a.label] = {key: list(value) if type(value) is tuple else value
+                                              for (key, value) in self.argument_descriptions[a.label].items()}
 
         if query is not None and query_response is None:
             query_response = False
 
+        if self.partial:
+            response["partial"] = self.partial
+
+        if self.stats is not None:
+            self.stats.record_evaluation({"arguments": len(self.arguments), "attacks": len(self.attack),
+                                          "defeats": len(self.defeat), "extensions": len(extensions)})
+            response["stats"] = self.stats.to_dict()
+
         return response, query_response
 
 
+    def query(self, conclusion, semantics="grounded"):
+        '''
+        Decides whether conclusion is acceptable: concluded by an argument in the grounded extension or,
+        for preferred semantics, by an argument in at least one preferred extension
+
+        If this theory has not been evaluated, only the arguments relevant to the query are constructed,
+        by chaining backwards from the conclusion over the rules (see relevant_theory)
+        '''
+
+        conclusion = str(Formula(str(conclusion)))
+
+        if self.is_evaluated():
+            theory = self
+        else:
+            theory = self.relevant_theory(conclusion)
+            theory.update_stage("defeats")
+
+        framework = ArgumentationFramework([a.label for a in theory.arguments], theory.defeat)
+
+        for a in theory.argument_index.with_conclusion(conclusion):
+            if framework.is_accepted(a.label, semantics):
+                return True
+
+        return False
+
+    def relevant_theory(self, conclusion):
+        '''
+        Returns the part of this theory relevant to conclusion: the rules and knowledge base elements
+        that can be used in an argument for it, for one of its counterarguments, for one of theirs, and so on
+
+        Starting from the conclusion, each relevant formula makes relevant its contraries, the antecedents
+        of the rules concluding it and the undercutters of those rules; formulas are matched by term and arity
+        '''
+
+        conclusion = Formula(str(conclusion))
+
+        system = self.argumentation_system
+        knowledge_base = self.knowledge_base
+
+        # the contraries of each formula, in both directions, by term and arity
+        contraries = {}
+        for el, els in system.declared_contrariness.items():
+            el = Formula(el)
+            for c in els:
+                for (x, y) in [(el, c), (c, el)]:
+                    key = (x.term, len(x.parameters))
+                    if key not in contraries:
+                        contraries[key] = set()
+                    contraries[key].add((y.term, len(y.parameters)))
+
+        labelled_rules = {r.label: r for r in system.rules}
+
+        relevant = set()
+        rules = set()
+        stack = [(conclusion.term, len(conclusion.parameters))]
+
+        while stack:
+            key = stack.pop()
+            if key in relevant:
+                continue
+            relevant.add(key)
+
+            (term, arity) = key
+            if term[0] == "~":
+                stack.append((term[1:], arity))
+            else:
+                stack.append(("~" + term, arity))
+
+            stack.extend(contraries.get(key, []))
+
+            for r in system.rules_concluding(term, arity):
+                rules.add(r)
+                stack.extend([(ant.term, len(ant.parameters)) for ant in r.antecedents
+                              if not ("<" in ant.term or ">" in ant.term or "=" in ant.term)])
+
+                if r.type == Rule.DEFEASIBLE:
+                    stack.append(("~" + r.label, 0))
+
+                # undercutters are only constructed if the rule they undercut is used
+                if r.is_undercutter and r.consequent.term[1:].strip() in labelled_rules:
+                    consequent = labelled_rules[r.consequent.term[1:].strip()].consequent
+                    stack.append((consequent.term, len(consequent.parameters)))
+
+        relevant_system = ArgumentationSystem()
+        relevant_system.rules = rules
+        relevant_system.rule_preferences = list(system.rule_preferences)
+        for el, els in system.declared_contrariness.items():
+            for c in els:
+                relevant_system.add_contrary((c, el))
+
+        relevant_knowledge_base = KnowledgeBase()
+        relevant_knowledge_base.axioms = [p for p in knowledge_base.axioms if (p.term, len(p.parameters)) in relevant]
+        relevant_knowledge_base.premises = [p for p in knowledge_base.premises if (p.term, len(p.parameters)) in relevant]
+        relevant_knowledge_base.assumptions = [p for p in knowledge_base.assumptions if (p.term, len(p.parameters)) in relevant]
+        relevant_knowledge_base.preferences = list(knowledge_base.preferences)
+
+        return ArgumentationTheory(relevant_system, relevant_knowledge_base, self.ordering, self.LOCAL_ENGINE, self.stats,
+                                   self.minimal, self.max_per_conclusion)
+
+    def engine_response(self, semantics):
+        '''
+        Returns the response of the engine for the current defeats under the given semantics,
+        only calling the engine if it has not already been asked the same question
+        '''
+
+        key = self.engine_response_key(semantics)
+
+        if key in self.engine_responses:
+            return self.engine_responses[key]
+
+        if self.stats is not None:
+            start = time.perf_counter()
+
+        if self.engine == self.LOCAL_ENGINE:
+            framework = ArgumentationFramework([a.label for a in self.arguments], self.defeat)
+
+            if semantics in ArgumentationFramework.SEMANTICS and semantics != ArgumentationFramework.GROUNDED:
+                response = framework.solve(semantics)
+            else:
+                # relabel only the arguments affected by incremental updates since the last grounded labelling
+                if self.changed_arguments is None:
+                    self.grounded_labelling = framework.grounded_labelling()
+                else:
+                    self.grounded_labelling = framework.grounded_labelling(self.grounded_labelling, self.changed_arguments)
+                self.changed_arguments = set()
+
+                response = {ArgumentationFramework.GROUNDED: framework.ordered(self.grounded_labelling[0])}
+        else:
+            response = self.engine_client().evaluate([a.label for a in self.arguments], self.defeat, semantics)
+
+        if self.stats is not None:
+            self.stats.record_stage("extensions", time.perf_counter() - start)
+
+        self.engine_responses[key] = response
+        return response
+
+    def engine_response_key(self, semantics):
+        return (self.stages["defeats"][1], self.engine, semantics)
+
+    def engine_client(self):
+        '''
+        Returns the client for the remote engine: the engine itself if it is an EngineClient,
+        otherwise the client shared by all theories using the engine's URL
+        '''
+
+        if isinstance(self.engine, EngineClient):
+            return self.engine
+
+        return EngineClient.for_url(self.engine)
+
+    def stage_inputs(self, stage):
+        '''
+        Returns the inputs of a stage: the versions of the parts of the theory it reads,
+        and the generations of the stages it depends on
+        '''
+
+        if stage == "arguments":
+            # arguments constructed within a budget are only reused while evaluating with the same budget
+            external = (self.argumentation_system.version, self.knowledge_base.version, self.budget if self.partial else None,
+                        self.minimal, self.max_per_conclusion)
+        elif stage == "contrariness":
+            external = (self.argumentation_system.version,)
+        elif stage == "preferences":
+            external = (self.argumentation_system.version, self.knowledge_base.version, self.ordering)
+        else:
+            external = ()
+
+        return (external, tuple([self.stages[d][1] for d in self.STAGES[stage]]))
+
+    def update_stage(self, stage):
+        '''
+        Brings a stage, and the stages it depends on, up to date, recomputing it only if its inputs have changed
+        '''
+
+        for dependency in self.STAGES[stage]:
+            self.update_stage(dependency)
+
+        inputs = self.stage_inputs(stage)
+
+        if stage in self.stages and self.stages[stage][0] == inputs:
+            return
+
+        if self.stats is not None:
+            start = time.perf_counter()
+
+        if stage == "arguments":
+            self.build_arguments()
+        elif stage == "contrariness":
+            self.argumentation_system.update_contrariness()
+        elif stage == "attacks":
+            self.attackers = {}
+            self.update_attacks(self.arguments_by_label)
+        elif stage == "preferences":
+            self.argument_ordering = ArgumentOrdering(self.knowledge_base, self.argumentation_system, self.ordering)
+        elif stage == "defeats":
+            self.direct_defeaters = {}
+            self.defeaters = {}
+            self.update_defeats(self.arguments_by_label, self.arguments_by_label)
+
+            # the extensions have to be computed from scratch
+            self.changed_arguments = None
+
+        if self.stats is not None:
+            self.stats.record_stage(stage, time.perf_counter() - start)
+
+        self.generation = self.generation + 1
+
+        # construction may have stopped at the budget, which changes the inputs of the arguments
+        self.stages[stage] = (self.stage_inputs(stage), self.generation)
+
+    def is_evaluated(self):
+        '''
+        Returns True if every stage of the evaluation is up to date
+        '''
+
+        for stage in self.STAGES:
+            if stage not in self.stages or self.stages[stage][0] != self.stage_inputs(stage):
+                return False
+
+        return True
+
+    def add_axiom(self, formula):
+        self.update(self.knowledge_base.add_axiom, formula)
+
+    def add_premise(self, formula):
+        self.update(self.knowledge_base.add_premise, formula)
+
+    def add_assumption(self, formula):
+        self.update(self.knowledge_base.add_assumption, formula)
+
+    def add_preference(self, preference):
+        self.update(self.knowledge_base.add_preference, preference)
+
+    def add_rule(self, rule):
+        self.update(self.argumentation_system.add_rule, rule)
+
+    def add_rule_preference(self, preference):
+        self.update(self.argumentation_system.add_rule_preference, preference)
+
+    def retract_axiom(self, formula):
+        self.update(self.knowledge_base.remove_axiom, formula)
+
+    def retract_premise(self, formula):
+        self.update(self.knowledge_base.remove_premise, formula)
+
+    def retract_assumption(self, formula):
+        self.update(self.knowledge_base.remove_assumption, formula)
+
+    def retract_preference(self, preference):
+        self.update(self.knowledge_base.remove_preference, preference)
+
+    def retract_rule(self, label):
+        self.update(self.argumentation_system.remove_rule, label)
+
+    def retract_rule_preference(self, preference):
+        self.update(self.argumentation_system.remove_rule_preference, preference)
+
+    def update(self, change, *args):
+        '''
+        Applies a change to the knowledge base or the argumentation system of this theory
+
+        If the theory has been evaluated, only the arguments, attacks and defeats affected by the change
+        are updated, and the next (local, grounded) evaluation only relabels the arguments it affects;
+        otherwise (or if construction is pruned) the change is picked up by the next evaluation as usual
+        '''
+
+        if not self.is_evaluated() or self.partial or self.is_pruned():
+            change(*args)
+            return
+
+        if self.stats is not None:
+            start = time.perf_counter()
+
+        before = self.theory_elements()
+        self.argumentation_system.changed_contrariness = set()
+        change(*args)
+        after = self.theory_elements()
+
+        if before == after:
+            # nothing changed, so all the stages are still up to date
+            for stage in self.STAGES:
+                self.stages[stage] = (self.stage_inputs(stage), self.stages[stage][1])
+            return
+
+        removed_elements = before[0] - after[0]
+        added_elements = after[0] - before[0]
+        removed_rules = before[1] - after[1]
+        added_rules = after[1] - before[1]
+
+        ''' remove the arguments that are built on removed elements or rules, and then the undercutters
+            of rules no longer used by any argument, as these would not be constructed from scratch'''
+        doomed = set()
+        removed_mask = self.rule_bits.mask(removed_rules)
+        for a in self.arguments:
+            if a.top_rule is None:
+                if a.key in removed_elements:
+                    doomed.add(a.label)
+            elif a.rule_bits & removed_mask:
+                doomed.add(a.label)
+
+        self.tried_rules = self.tried_rules - removed_rules
+
+        removed = []
+        while doomed:
+            doomed.update(self.all_super_arguments(doomed))
+
+            removed.extend(self.remove_arguments(doomed))
+
+            undercutters = set([r.label for r in self.argumentation_system.rules
+                                if r.is_undercutter and r.consequent.term[1:].strip() not in self.used_defeasible_rules])
+
+            self.tried_rules = self.tried_rules - undercutters
+            undercutters_mask = self.rule_bits.mask(undercutters)
+            doomed = set([a.label for a in self.arguments if a.rule_bits & undercutters_mask])
+
+        ''' construct the arguments for added elements, then everything that follows from them and from added rules'''
+        added = []
+        for p in self.knowledge_base.premises + self.knowledge_base.axioms + self.knowledge_base.assumptions:
+            if (p.type, p.formula) in added_elements:
+                self.arg_count = self.arg_count + 1
+                a = AtomicArgument("A" + str(self.arg_count), p)
+                if a in self.argument_registry:
+                    self.arg_count = self.arg_count - 1
+                    continue
+                self.register_argument(a)
+                added.append(a)
+
+        self.add_arguments(added)
+
+        if added or added_rules:
+            added.extend(self.extend_arguments(added))
+
+        ''' the contrariness is instantiated as the language grows, noting the conclusions whose contraries changed'''
+        self.argumentation_system.update_contrariness()
+        changed_contrariness = self.argumentation_system.changed_contrariness
+        contrary_to = self.argumentation_system.contrary_to
+
+        conclusions = set(changed_contrariness)
+        for a in removed + added:
+            conclusions.update(contrary_to.get(str(a.conclusion), []))
+            if str(a.conclusion)[:2] == "~[":
+                conclusions.add(str(a.conclusion))
+
+        attacked = set([a.label for a in added])
+        for c in conclusions:
+            attacked.update([a.label for a in self.argument_index.with_conclusion(c)])
+            if c[:2] == "~[":
+                attacked.update([a.label for a in self.arguments_by_top_rule.get(c[1:], [])])
+
+        for a in removed:
+            del self.attackers[a.label]
+            del self.direct_defeaters[a.label]
+            del self.defeaters[a.label]
+
+        self.update_attacks(attacked)
+
+        ''' preferences between arguments can only change if the preferences do; otherwise
+            only the arguments with changed attackers need their attacks filtered again'''
+        self.argument_ordering = ArgumentOrdering(self.knowledge_base, self.argumentation_system, self.ordering)
+
+        if before[2] != after[2]:
+            attacked = set(self.arguments_by_label)
+
+        changed = set(attacked)
+        changed.update(self.all_super_arguments(attacked))
+
+        self.update_defeats(attacked, changed)
+
+        if self.changed_arguments is not None:
+            self.changed_arguments.update(changed)
+
+        if self.stats is not None:
+            self.stats.record_stage("update", time.perf_counter() - start)
+
+        # all the stages are now up to date
+        for stage in ["arguments", "contrariness", "attacks", "preferences", "defeats"]:
+            self.generation = self.generation + 1
+            self.stages[stage] = (self.stage_inputs(stage), self.generation)
+
+    def theory_elements(self):
+        '''
+        Returns the knowledge base elements, the rule labels and the preferences of this theory,
+        to tell what an update has changed
+        '''
+
+        elements = set([(p.type, p.formula) for p in self.knowledge_base.premises + self.knowledge_base.axioms + self.knowledge_base.assumptions])
+        rules = set([r.label for r in self.argumentation_system.rules])
+        preferences = (list(self.knowledge_base.preferences), list(self.argumentation_system.rule_preferences))
+
+        return elements, rules, preferences
+
+    def remove_arguments(self, labels):
+        '''
+        Removes the arguments with the given labels, which must include all of their superarguments,
+        returning the removed arguments
+        '''
+
+        removed = [a for a in self.arguments if a.label in labels]
+
+        self.arguments = [a for a in self.arguments if a.label not in labels]
+
+        for a in removed:
+            self.argument_index.remove(a)
+            del self.argument_registry[a]
+            del self.arguments_by_label[a.label]
+            self.argument_descriptions.pop(a.label, None)
+
+            if a.label in self.super_arguments:
+                del self.super_arguments[a.label]
+
+            for label in set([s.label for s in a.last_sub_arguments]):
+                if label not in labels:
+                    self.super_arguments[label].remove(a.label)
+
+            if a.top_rule is not None and a.top_rule.type == Rule.DEFEASIBLE:
+                self.arguments_by_top_rule[a.top_rule.label].remove(a)
+
+        self.used_defeasible_rules = set([a.top_rule.label for a in self.arguments
+                                          if a.top_rule is not None and a.top_rule.type == Rule.DEFEASIBLE])
+
+        return removed
+
     def calculate_argument_preferences(self):
         '''
         Calculates the argument preferences based on the ordering provided at construction time,
         and the preferences between knowledge base elements and/or rules
         '''
 
+        ordering = ArgumentOrdering(self.knowledge_base, self.argumentation_system, self.ordering)
+
         self.argument_preferences = []
 
         for arg1 in self.arguments:
@@ -150,21 +770,9 @@ class ArgumentationTheory:
                 if arg1.label == arg2.label:
                     continue
 
-                if self.ordering == "last":
-                    if (arg1.is_strict() and arg1.is_firm()) and (arg2.is_defeasible() or arg2.is_plausible()):
-                        self.argument_preferences.append((arg2.label, arg1.label))
-                    elif not arg1.last_def_rules() and not arg2.last_def_rules():
-                        if check_preference(arg1.premises, arg2.premises, self.knowledge_base.preferences):
-                            self.argument_preferences.append((arg1.label, arg2.label))
-                    elif check_preference(arg1.last_def_rules(), arg2.last_def_rules(), self.argumentation_system.rule_preferences):
-                            self.argument_preferences.append((arg1.label, arg2.label))
-                elif self.ordering == "weakest":
-                    if check_preference(arg1.premises, arg2.premises, self.knowledge_base.preferences):
-                        if arg2.defeasible_rules:
-                            if check_preference(arg1.get_defeasible_rules(), arg2.get_defeasible_rules(), self.argumentation_system.rule_preferences):
-                                self.argument_preferences.append((arg1.label, arg2.label))
-                        else:
-                            self.argument_preferences.append((arg1.label, arg2.label))
+                preference = ordering.compare(arg1, arg2)
+                if preference is not None:
+                    self.argument_preferences.append(preference)
 
         return self.argument_preferences
 
@@ -173,255 +781,628 @@ class ArgumentationTheory:
         '''
         Calculates defeat by considering attacks and preferences
 
-        Takes advantage of the recursive nature of the calculate_attack method
+        Takes advantage of the propagation step of the calculate_attack method
         by first calculating simple attacks, filtering these into defeats
         then passing the filtered list into the calculate_attack method
+
+        Preferences are only calculated for the pairs of arguments in the simple attacks
         '''
 
         att = self.calculate_attack(simple=True)
 
-        prefs = self.calculate_argument_preferences()
+        ordering = ArgumentOrdering(self.knowledge_base, self.argumentation_system, self.ordering)
+
+        self.defeat = self.calculate_attack(attacks=self.filter_defeats(att, ordering))
+        return self.defeat
+
+    def filter_defeats(self, attacks, ordering):
+        '''
+        Filters simple attacks into defeats using the given ArgumentOrdering
+        '''
+
+        arguments = {a.label: a for a in self.arguments}
+
         defeat = []
 
-        for (arg1, arg2) in att:
-            if (arg1, arg2) in prefs and (arg2, arg1) in prefs:
-                defeat.append((arg1,arg2))
-            elif(arg2, arg1) in prefs:
+        for (arg1, arg2) in attacks:
+            # an attack succeeds as a defeat if the attacked argument is less preferred than the attacker
+            if ordering.is_less_preferred(arguments[arg2], arguments[arg1]):
                 defeat.append((arg1, arg2))
 
-        self.defeat = self.calculate_attack(attacks=defeat)
-        return self.defeat
+        return defeat
 
     def calculate_attack(self, attacks=None, simple=False):
         '''
         Calculates attack based on contrariness and undercutting rules
         If simple == True then only direct attacks based on the contrariness and undercutters
         are considered;
-        If simple == False, then all attacks are (recursively) calculated
+        If simple == False, then all attacks are calculated
         (i.e. if A attacks B and B is a sub-argument in C, then A will attack C)
         '''
 
         if attacks is None:
-            attacks = []
-            for arg1 in self.arguments:
+            attacks = [(attacker, target.label) for target in self.arguments for attacker in self.attacks_on(target)]
 
-                # arguments whose top rules are strict cannot be attacked
-                if arg1.top_rule is not None and arg1.top_rule.type == Rule.STRICT:
-                    continue
-                arg1_conclusion = str(arg1.conclusion)
-
-                if arg1_conclusion in self.argumentation_system.contrariness:
-                    contraries = self.argumentation_system.contrariness[arg1_conclusion]
-
-                    for arg2 in self.arguments:
-                        arg2_conclusion = str(arg2.conclusion)
-                        if arg2_conclusion in contraries:
-                            attacks.append((arg2.label, arg1.label))
-                elif arg1_conclusion[:2] == "~[":
-                    undercut_rule = arg1_conclusion[1:]
-                    for arg2 in self.arguments:
-                        if arg2.top_rule:
-                            if arg2.top_rule.type==Rule.DEFEASIBLE and arg2.top_rule.label == undercut_rule:
-                                attacks.append((arg1.label,arg2.label))
             if simple:
                 return attacks
             else:
                 return self.calculate_attack(attacks)
         else:
-            tmp_attacks = [a for a in attacks]
+            ''' an attack on an argument is an attack on all of its superarguments,
+                which are found from the index of direct superarguments'''
+            propagated = []
+            seen = set()
+            targets = {}
 
-            for (arg1, arg2) in tmp_attacks:
-                for arg in self.arguments:
-                    if arg2 in [a.label for a in arg.sub_arguments]:
-                        att = (arg1, arg.label)
-                        if att not in attacks:
-                            attacks.append(att)
+            for (arg1, arg2) in attacks:
+                if arg2 not in targets:
+                    targets[arg2] = [arg2] + self.all_super_arguments([arg2])
 
-            if len(attacks) == len(tmp_attacks):
-                return attacks
-            else:
-                return self.calculate_attack(attacks)
+                for target in targets[arg2]:
+                    att = (arg1, target)
+                    if att not in seen:
+                        seen.add(att)
+                        propagated.append(att)
+
+            return propagated
+
+    def attacks_on(self, target):
+        '''
+        Returns the labels of the arguments that directly attack target,
+        either on its conclusion (via the contrariness) or on its top rule (by undercutting)
+        '''
+
+        # arguments whose top rules are strict cannot be attacked
+        if target.top_rule is not None and target.top_rule.type == Rule.STRICT:
+            return []
+
+        attackers = []
+        contrariness = self.argumentation_system.contrariness
+        conclusion = str(target.conclusion)
+
+        if conclusion in contrariness:
+            for c in sorted(set([str(c) for c in contrariness[conclusion]])):
+                attackers.extend([a.label for a in self.argument_index.with_conclusion(c)])
+
+        if target.top_rule is not None and target.top_rule.type == Rule.DEFEASIBLE:
+            undercut = "~" + target.top_rule.label
+            if undercut not in contrariness:
+                for a in self.argument_index.with_conclusion(undercut):
+                    if a.top_rule is None or a.top_rule.type != Rule.STRICT:
+                        attackers.append(a.label)
+
+        return attackers
+
+    def update_attacks(self, targets):
+        '''
+        Recomputes the attackers of the given arguments (by label), and the list of attacks
+        '''
+
+        for label in targets:
+            if label in self.arguments_by_label:
+                self.attackers[label] = self.attacks_on(self.arguments_by_label[label])
+
+        self.attack = [(a, target.label) for target in self.arguments for a in self.attackers[target.label]]
+
+    def update_defeats(self, targets, changed):
+        '''
+        Recomputes the direct defeaters of the given arguments (by label) from their attackers, the defeaters
+        of the changed arguments, which must include the targets and their superarguments, and the list of defeats
+        '''
+
+        for label in targets:
+            if label in self.arguments_by_label:
+                target = self.arguments_by_label[label]
+                self.direct_defeaters[label] = [a for a in self.attackers[label]
+                                                if self.argument_ordering.is_less_preferred(target, self.arguments_by_label[a])]
+
+        ''' an attack on an argument is an attack on all of its superarguments, so an argument is defeated
+            by its direct defeaters and the defeaters of its direct sub-arguments, which are updated first'''
+        done = set()
+
+        for label in changed:
+            stack = [label]
+
+            while stack:
+                current = stack[-1]
+                if current in done or current not in self.arguments_by_label:
+                    stack.pop()
+                    continue
+
+                argument = self.arguments_by_label[current]
+
+                pending = [s.label for s in argument.last_sub_arguments if s.label in changed and s.label not in done]
+                if pending:
+                    stack.extend(pending)
+                    continue
+
+                stack.pop()
+                done.add(current)
+
+                self.defeaters[current] = unique(self.direct_defeaters[current] +
+                                                 [a for s in argument.last_sub_arguments for a in self.defeaters[s.label]])
+
+        self.defeat = [(a, target.label) for target in self.arguments for a in self.defeaters[target.label]]
 
     def construct_arguments(self, args=None):
         '''
-        Recursively constructs arguments by:
+        Constructs the arguments (see build_arguments), then updates the contrariness
+        to reflect the language of their conclusions
+        '''
+
+        self.build_arguments(args)
+
+        self.argumentation_system.update_contrariness()
+
+        return self.arguments
+
+    def build_arguments(self, args=None):
+        '''
+        Iteratively constructs arguments by:
             1) constructing atomic arguments based on the knowledge base
             2) constructing arguments based on the atomic arguments and the rules
             3) repeatedly trying to construct more arguments until no more can be found
+
+        Construction is semi-naive: after a rule has been tried once, later passes only try
+        combinations of arguments that include at least one argument constructed in the previous pass
         '''
 
-        if args is not None:
-            tmp_args = [a for a in args]
-        else:
-            tmp_args = None
+        self.extend_arguments(self.start_construction(args))
+
+        return self.arguments
+
+    def iter_arguments(self, budget=None):
+        '''
+        Constructs the arguments as build_arguments does, yielding them as they become available:
+        the atomic arguments, and then the arguments constructed in each pass
+
+        If budget (a ConstructionBudget) is exceeded, construction stops early and partial is set to
+        the limit that was exceeded; the arguments constructed so far are then evaluated as usual
+        '''
+
+        self.budget = budget
+        self.stages.pop("arguments", None)
+
+        args = self.start_construction()
+        for a in args:
+            yield a
+
+        for new_args in self.construction_passes(args):
+            for a in new_args:
+                yield a
 
-        if tmp_args is None:
-            tmp_args = []
+        self.generation = self.generation + 1
+        self.stages["arguments"] = (self.stage_inputs("arguments"), self.generation)
+
+    def start_construction(self, args=None):
+        '''
+        Resets the arguments, then registers the atomic arguments from the knowledge base (or args), returning them
+        '''
+
+        # registry of the arguments constructed so far, keyed by their structure, for duplicate detection
+        self.argument_registry = {}
+        self.arguments_by_label = {}
+        self.arguments_by_top_rule = {}
+        self.argument_descriptions = {}
+
+        # index from the label of each argument to the labels of the arguments it is a direct sub-argument of
+        self.super_arguments = {}
+
+        # index over the conclusions of all arguments constructed so far
+        self.argument_index = ArgumentIndex()
+
+        # labels of the rules that have been tried against the full set of arguments at least once
+        self.tried_rules = set()
+        self.grounders = {}
+
+        self.arguments = []
+
+        # all the used defeasible rules - used to determine if undercutters are relevant
+        self.used_defeasible_rules = set()
+
+        partial = None
+
+        if args is None:
+            self.arg_count = 0
+
+            # no argument is left that uses a rule, so rules removed since are given bits no longer
+            self.rule_bits = RuleBits()
+
+            args = []
             for p in self.knowledge_base.premises + self.knowledge_base.axioms + self.knowledge_base.assumptions:
+                if self.budget is not None and not self.budget.allows_arguments(len(args)):
+                    partial = self.budget.MAX_ARGUMENTS
+                    break
+
                 self.arg_count = self.arg_count + 1
                 a = AtomicArgument("A" + str(self.arg_count), p)
-                if a.conclusion.term[:2] != "~[":
-                    self.argumentation_system.language.add(a.conclusion)
-                tmp_args.append(a)
-
-            self.arguments = self.construct_arguments(tmp_args)
-            return self.arguments
+                if a in self.argument_registry:
+                    self.arg_count = self.arg_count - 1
+                    continue
+                self.register_argument(a)
+                args.append(a)
         else:
-            # get all the used defeasible rules - used to determine if undercutters are relevant
-            used_defeasible_rules = set([r.label for a in tmp_args for r in a.defeasible_rules])
+            args = [a for a in args]
+            for a in args:
+                self.register_argument(a)
+
+        self.add_arguments(args)
+
+        # the limit of the budget that construction stopped at, if any
+        self.partial = partial
+
+        # for pruning, the profiles used to compare the strength of arguments, and the attack points of each argument
+        if self.is_pruned():
+            self.pruning_ordering = ArgumentOrdering(self.knowledge_base, self.argumentation_system, self.ordering)
+            self.attack_points = {}
+            self.attack_point_count = 0
+
+        return args
+
+    def extend_arguments(self, delta):
+        '''
+        Runs construction passes, starting from the arguments in delta, until no more arguments
+        can be found; rules that have not been tried yet are tried against all the arguments.
+        Returns the arguments that were constructed
+        '''
+
+        constructed = []
+
+        for new_args in self.construction_passes(delta):
+            constructed.extend(new_args)
+
+        return constructed
+
+    def construction_passes(self, delta):
+        '''
+        Runs construction passes as extend_arguments does, yielding the arguments constructed in each pass
+        as soon as they are available to the rules; stops early if the budget is exceeded
+        '''
+
+        budget = self.budget
+        if budget is not None:
+            budget.start()
+
+        try:
+            for new_args in self.run_passes(delta, budget):
+                yield new_args
+        finally:
+            if budget is not None:
+                budget.stop()
+
+    def run_passes(self, delta, budget):
+        system = self.argumentation_system
+        lazy_transposition = system.transposition == ArgumentationSystem.LAZY_TRANSPOSITION
+        pruning = self.is_pruned()
+
+        def stopped():
+            '''
+            Records the limit of the budget that is exceeded, if any, returning True if construction has to stop
+            '''
+
+            self.partial = budget.exceeded(len(self.arguments) + len(new_args)) or self.partial
+            return self.partial is not None and self.partial != budget.MAX_DEPTH
+
+        new_args = []
+        if budget is not None and stopped():
+            return
+
+        # strict rules added since the last construction may be transposable given the existing arguments
+        if lazy_transposition:
+            for key in [k for k in system.transposable if self.argument_index.by_term.get(k)]:
+                system.derive_transpositions(*key)
+
+        # the counts of each pass are only kept, and the pass only timed, if stats are being recorded
+        counting = self.stats is not None
+
+        while True:
+            if counting:
+                start = time.perf_counter()
+                attempts = combined = rejected_bindings = rejected_comparisons = duplicates = pruned = 0
+
+            new_args = []
+
+            # the new arguments kept for each conclusion, and the labels of the arguments they dominate
+            kept = {}
+            doomed = set()
+            delta_ids = set([id(a) for a in delta])
+            delta_keys = set([(a.conclusion.term, len(a.conclusion.parameters)) for a in delta])
+
+            # the transpositions of a strict rule can only fire once the negation of its consequent is concluded
+            if lazy_transposition:
+                for key in delta_keys:
+                    system.derive_transpositions(*key)
+
+            stop = False
+
+            for r in system.rules:
+                if stop:
+                    break
 
-            for r in self.argumentation_system.rules:
                 if r.is_undercutter:
                     label = r.consequent.term[1:].strip()
-                    if label not in used_defeasible_rules:
+                    if label not in self.used_defeasible_rules:
                         continue # don't consider this rule if the rule it undercuts isn't used
 
-                antecedent_fulfilment = {}
+                grounder = self.grounder(r)
 
-                parameter_mapping = {}
-                comparisons = []
+                # a rule that has already been tried can only fire again if an antecedent matches a new conclusion
+                tried = r.label in self.tried_rules
+                if tried:
+                    if not any((ant.term, len(ant.parameters)) in delta_keys for ant in grounder.antecedents):
+                        continue
+                else:
+                    self.tried_rules.add(r.label)
+
+                if counting:
+                    attempts = attempts + 1
+
+                ''' the index only returns arguments with the same term and number of parameters,
+                    where the parameters are the same or the antecedent has a variable in that position'''
+                candidates = []
+                for i in range(len(grounder.antecedents)):
+                    c, rejected = grounder.candidates(i, self.argument_index.matches(grounder.antecedents[i]))
+                    if counting:
+                        rejected_bindings = rejected_bindings + rejected
+                    candidates.append(c)
+
+                ''' the first time a rule is tried, join the arguments fulfilling each antecedent;
+                    this provides full coverage of all possible combinations of args to instantiate this rule.
+                    After that, only combinations involving a newly constructed argument can be new'''
+                for (argument_sets, binding) in grounder.ground(candidates, delta_ids if tried else None, None if budget is None else stopped):
+                    if counting:
+                        combined = combined + 1
+
+                    if budget is not None and stopped():
+                        break
+
+                    proceed = True
+
+                    # do we have any comparisons that need evaluated
+                    for comparison in grounder.comparisons:
+                        result = comparison.evaluate_comparison(binding)
+                        if not result:
+                            proceed = False
+                            break
+
+                    if not proceed:
+                        if counting:
+                            rejected_comparisons = rejected_comparisons + 1
+                        continue
 
-                for ant in r.antecedents:
+                    if r.consequent.has_variables():
+                        # formulas are immutable, so instantiate a new rule rather than changing this one
+                        new_rule = Rule(r.label, [ant.instantiate(binding) for ant in r.antecedents], r.consequent.instantiate(binding), r.type)
+                    else:
+                        new_rule = r
+
+                    self.arg_count = self.arg_count + 1
+                    a = RuleArgument("A" + str(self.arg_count), new_rule, argument_sets, grounder.rule_bit)
+                    if budget is not None and not budget.allows_depth(a.depth):
+                        self.arg_count = self.arg_count - 1
+                        self.partial = self.partial or budget.MAX_DEPTH
+                    elif a in self.argument_registry:
+                        self.arg_count = self.arg_count - 1
+                        if counting:
+                            duplicates = duplicates + 1
+                    elif pruning and not self.keep_argument(a, kept, doomed):
+                        self.arg_count = self.arg_count - 1
+                        if counting:
+                            pruned = pruned + 1
+                    else:
+                        self.register_argument(a)
+                        new_args.append(a)
+
+                # the join also stops, without yielding, when the budget is exceeded between combinations
+                stop = budget is not None and self.partial is not None and self.partial != budget.MAX_DEPTH
+
+            # the new arguments only become available to the rules in the next pass
+            self.add_arguments(new_args)
+
+            # arguments built on a dominated argument are built again on the argument dominating it in the next pass
+            if doomed:
+                doomed.update(self.all_super_arguments(doomed))
+                self.remove_arguments(doomed)
+                new_args = [a for a in new_args if a.label not in doomed]
+                if counting:
+                    pruned = pruned + len(doomed)
+
+            if counting:
+                self.stats.record_pass(time.perf_counter() - start, len(new_args), {
+                    "rule_attempts": attempts, "combinations": combined, "rejected_bindings": rejected_bindings,
+                    "rejected_comparisons": rejected_comparisons, "duplicates": duplicates, "pruned": pruned})
+
+            if new_args:
+                yield new_args
+
+            ''' anchor step; if no new args were found in this pass, we have reached the fixpoint '''
+            if not new_args or stop:
+                return
+
+            delta = new_args
+
+    def is_pruned(self):
+        '''
+        Returns True if construction only keeps some of the arguments for each conclusion
+        '''
 
-                    if "<" in ant.term or ">" in ant.term or "=" in ant.term:
-                        comparisons.append(ant)
-                        continue
+        return self.minimal or self.max_per_conclusion is not None
 
-                    for a in args:
-                        # don't re-use rules
-                        if r.label in [rule.label for rule in a.rules]:
-                            continue
-
-                        conclusion = a.conclusion
-                        tmp = []
-
-                        ''' Only consider this conclusion as fulfilling the antecedent
-                            if it has the same term and same number of parameters'''
-                        if conclusion.term == ant.term and len(conclusion.parameters) == len(ant.parameters):
-                            for i in range(len(conclusion.parameters)):
-                                ''' either the paramters are the same, or the antecedent has a variable in this position'''
-                                if conclusion.parameters[i] == ant.parameters[i] or ant.parameters[i][0].isupper():
-                                    tmp.append(conclusion.parameters[i])
-                                    if str(conclusion) not in parameter_mapping:
-                                        parameter_mapping[str(conclusion)] = {}
-
-                                    ''' and if the antecedent does have a  variable, record the value it should be mapped to '''
-                                    if ant.parameters[i][0].isupper():
-                                        parameter_mapping[str(conclusion)][ant.parameters[i][0]] = conclusion.parameters[i]
-
-                            '''if the temporary list is the same length as the antecedent paramters, this conclusion fulfils it'''
-                            if len(tmp) == len(ant.parameters):
-                                if ant.term not in antecedent_fulfilment:
-                                    antecedent_fulfilment[ant.term] = []
-                                antecedent_fulfilment[ant.term].append(a)
-
-                t = [s for s in antecedent_fulfilment.values()]
-
-                ''' from here, consider only relevant antecedents: those that are fulfilled by the conclusions
-                    of other arguments, rather than those that express an arthimetic comparison'''
-                relevant_antecedents = [a for a in r.antecedents if a.term not in [c.term for c in comparisons]]
-
-                ''' only continue if every antecedent has at least one argument that fulfils it '''
-                if set(antecedent_fulfilment.keys()) == set([a.term for a in relevant_antecedents]):
-
-                    ''' create the cartesian product from each set of fulfilling arguments;
-                        this provides full coverage of all possible combinations of args to instantiate this rule'''
-                    for argument_sets in itertools.product(*t):
-                        argument_sets = list(argument_sets)
-
-                        proceed = True
-                        ''' verify parameters: we can only continue if the parameter mappings harmonise (see harmonise_parameters method)'''
-                        harmonised_parameters = self.harmonise_parameters(argument_sets, parameter_mapping)
-
-                        if harmonised_parameters is None:
-                            continue
-
-                        # do we have any comparisons that need evaluated
-                        for comparison in comparisons:
-                            result = comparison.evaluate_comparison(harmonised_parameters)
-                            if not result:
-                                proceed = False
-                                break
-
-                        if not proceed:
-                            continue
-
-                        if r.consequent.has_variables():
-                            new_rule = copy.deepcopy(r)
-                            for a in argument_sets:
-                                if str(a.conclusion) in parameter_mapping:
-                                    map = parameter_mapping[str(a.conclusion)]
-
-                                    parameters = new_rule.consequent.parameters
-                                    variables = new_rule.consequent.variables
-
-                                    for i in range(len(variables)):
-                                        if variables[i] in map:
-                                            for a in new_rule.antecedents:
-                                                a.variable_mapping[variables[i]] = map[variables[i]]
-                                            new_rule.consequent.variable_mapping[variables[i]] = map[variables[i]]
-
-                                    new_rule.consequent.resolve_expressions()
-
-                                    for i in range(len(parameters)):
-                                        if parameters[i] in map:
-                                            new_rule.consequent.parameters[i] = map[parameters[i]]
-                        else:
-                            new_rule = r
-
-                        self.arg_count = self.arg_count + 1
-                        a = RuleArgument("A" + str(self.arg_count), new_rule, argument_sets)
-                        if a.conclusion.term[:2] != "~[":
-                            self.argumentation_system.language.add(a.conclusion)
-
-                        if a not in args:
-                            args.append(a)
-                        else:
-                            self.arg_count = self.arg_count - 1
-
-            ''' anchor step; if True, we haven't added more args in this pass so should return'''
-            if len(args) == len(tmp_args):
-
-                # update contrariness
-                self.argumentation_system.update_contrariness()
-                return args
-            else:
-                return self.construct_arguments(args)
+    def keep_argument(self, argument, kept, doomed):
+        '''
+        Decides whether a newly constructed argument is kept, given the arguments kept in this pass for each
+        conclusion (kept), adding the labels of the existing arguments it dominates to doomed
+
+        When minimal, an argument is dropped if an argument for the same conclusion dominates it: it compares to
+        every argument as the dropped one does, is attacked only where the dropped one is too (on the same premises,
+        sub-arguments and top rule) and attacks the same arguments. Dropping it then leaves the extensions unchanged
+        apart from its own (and its superarguments', which are constructed on the dominating argument instead).
+        Beyond that, at most max_per_conclusion arguments are kept for each conclusion, which does change them
+        '''
 
+        conclusion = str(argument.conclusion)
+        others = [a for a in self.argument_index.with_conclusion(conclusion) + kept.get(conclusion, []) if a.label not in doomed]
 
+        keep = True
 
-    def harmonise_parameters(self, arguments, parameter_mapping):
+        if self.minimal:
+            # the argument is given its attack point last, so the point can be given again if it is dropped
+            for a in others:
+                self.points(a)
+            count = self.attack_point_count
+            self.points(argument)
+
+            keep = not any(self.dominates(a, argument) for a in others)
+
+            if keep:
+                dominated = [a.label for a in others if self.dominates(argument, a) and not argument.has_sub_argument(a)]
+                if dominated:
+                    doomed.update(dominated)
+                    others = [a for a in others if a.label not in doomed]
+
+        if keep and self.max_per_conclusion is not None and len(others) >= self.max_per_conclusion:
+            keep = False
+
+        if keep:
+            kept.setdefault(conclusion, []).append(argument)
+        elif self.minimal:
+            # the label of a dropped argument is used again
+            del self.attack_points[argument.label]
+            self.pruning_ordering.profiles.pop(argument.label, None)
+            self.attack_point_count = count
+
+        return keep
+
+    def dominates(self, arg1, arg2):
         '''
-        Attempts to generate a harmonised parameter mapping based on the mappings
-        for individual arguments (i.e. X in arg1 must be mapped to the same value as X in arg2, or not exist in arg2 etc.)
+        Returns True if arg1 dominates arg2, an argument for the same conclusion, as described in keep_argument
         '''
 
-        # if there's no parameter mapping, don't bother...
-        if not parameter_mapping:
-            return {}
-
-        harmonised_parameters = {}
-        proceed = True
+        top = arg1.top_rule
+        if top is not None and top.type == Rule.DEFEASIBLE:
+            if arg2.top_rule is None or arg2.top_rule.type != Rule.DEFEASIBLE or arg2.top_rule.label != top.label:
+                return False
 
-        if len(arguments) > 1:
-            for arg in arguments:
-                conclusion = str(arg.conclusion)
-                if conclusion in parameter_mapping:
-                    for parameter,value in parameter_mapping[conclusion].items():
-                        for arg2 in arguments:
-                            conclusion2 = str(arg2.conclusion)
-                            if conclusion != conclusion2 and conclusion2 in parameter_mapping:
-                                if parameter in parameter_mapping[conclusion2] and parameter_mapping[conclusion2][parameter] != value:
-                                    proceed = False
-                                    harmonised_parameters = None
-                                    break
-                                else:
-                                    harmonised_parameters[parameter] = value
-                                if not proceed:
-                                    break
-                if not proceed:
-                    break
+        if top is None:
+            inner = self.points(arg1)
         else:
-            harmonised_parameters = parameter_mapping[str(arguments[0].conclusion)]
+            inner = 0
+            for s in arg1.last_sub_arguments:
+                inner = inner | self.points(s)
+
+        if inner & ~self.points(arg2):
+            return False
+
+        return self.strength_key(arg1) == self.strength_key(arg2)
+
+    def points(self, argument):
+        '''
+        Returns the attack points of an argument as a bitset: its sub-arguments (and itself) that can be
+        attacked on their own, as in attacks_on, i.e. the atomic ones (axioms included) and those whose
+        top rule is not strict
+        '''
+
+        points = self.attack_points.get(argument.label)
+
+        if points is None:
+            points = 0
+            for s in argument.last_sub_arguments:
+                points = points | self.points(s)
+
+            if argument.top_rule is None or argument.top_rule.type != Rule.STRICT:
+                points = points | (1 << self.attack_point_count)
+                self.attack_point_count = self.attack_point_count + 1
+
+            self.attack_points[argument.label] = points
+
+        return points
+
+    def strength_key(self, argument):
+        '''
+        Returns the parts of the profile of an argument under the ordering that comparisons depend on:
+        whether each compiled set is empty, its masks, and the flags
+        '''
+
+        profile = self.pruning_ordering.profile(argument)
+
+        return tuple([(p[0] > 0, p[1], p[2]) for p in profile[:3]]) + profile[3:]
+
+    def grounder(self, rule):
+        '''
+        Returns the RuleGrounder for rule, creating it the first time the rule is tried
+        '''
+
+        grounder = self.grounders.get(rule.label)
+        if grounder is None or grounder.rule is not rule:
+            grounder = RuleGrounder(rule, self.rule_bits.bit(rule.label))
+            self.grounders[rule.label] = grounder
+
+        return grounder
+
+    def register_argument(self, argument):
+        '''
+        Registers a newly constructed argument, so it is recognised as a duplicate if constructed again
+        '''
+
+        if argument.conclusion.term[:2] != "~[":
+            self.argumentation_system.add_to_language(argument.conclusion)
+
+        self.argument_registry[argument] = argument
+        self.arguments_by_label[argument.label] = argument
+        self.index_super_arguments(argument)
+
+    def add_arguments(self, arguments):
+        '''
+        Adds registered arguments to the arguments of this theory, making them available to the rules
+        '''
+
+        self.arguments.extend(arguments)
+
+        for a in arguments:
+            self.argument_index.add(a)
+
+        # the sub-arguments of each argument are also arguments, so the defeasible rules used are their top rules
+        self.used_defeasible_rules.update([a.top_rule.label for a in arguments
+                                           if a.top_rule is not None and a.top_rule.type == Rule.DEFEASIBLE])
+
+        for a in arguments:
+            if a.top_rule is not None and a.top_rule.type == Rule.DEFEASIBLE:
+                if a.top_rule.label not in self.arguments_by_top_rule:
+                    self.arguments_by_top_rule[a.top_rule.label] = []
+                self.arguments_by_top_rule[a.top_rule.label].append(a)
+
+    def index_super_arguments(self, argument):
+        '''
+        Records argument as a superargument of each of its direct sub-arguments
+        '''
+
+        for label in set([s.label for s in argument.last_sub_arguments]):
+            if label not in self.super_arguments:
+                self.super_arguments[label] = []
+            self.super_arguments[label].append(argument.label)
+
+    def all_super_arguments(self, labels):
+        '''
+        Returns the labels of all the superarguments of the arguments with the given labels, each once
+        '''
+
+        seen = set(labels)
+        found = []
+        stack = list(labels)
+
+        while stack:
+            for label in self.super_arguments.get(stack.pop(), []):
+                if label not in seen:
+                    seen.add(label)
+                    found.append(label)
+                    stack.append(label)
+
+        return found
+
+def unique(items):
+    '''
+    Returns items without repeats, in the order they first occur
+    '''
 
-        return harmonised_parameters
+    seen = set()
+    return [i for i in items if not (i in seen or seen.add(i))]
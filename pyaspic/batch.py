@@ -0,0 +1,165 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from .argumentation_theory import ArgumentationTheory
+from .theory_loader import TheoryLoader
+import argparse
+import json
+import multiprocessing
+import sys
+
+# the argumentation system and settings shared by all the cases evaluated in a worker process
+worker = {}
+
+class BatchEvaluator:
+    '''
+    Evaluates many knowledge bases against the same argumentation system, in parallel across a pool of processes
+
+    The system is sent to each worker process once, when the pool starts, rather than with every case
+    '''
+
+    def __init__(self, argumentation_system, ordering="weakest", engine=ArgumentationTheory.LOCAL_ENGINE, processes=None, chunksize=16):
+        self.argumentation_system = argumentation_system
+        self.ordering = ordering
+        self.engine = engine
+
+        # the number of worker processes (all the CPUs if None; 1 evaluates in this process)
+        self.processes = processes
+
+        # the number of cases sent to a worker at a time
+        self.chunksize = chunksize
+
+    def evaluate(self, cases, semantics="grounded"):
+        '''
+        Evaluates each case, either a KnowledgeBase or a (KnowledgeBase, query) tuple, under the given semantics,
+        yielding the result of ArgumentationTheory.evaluate for each case, in the order of the cases,
+        as soon as it (and the cases before it) have been evaluated
+        '''
+
+        return self.map(evaluate_case, ((case, semantics) for case in cases))
+
+    def evaluate_json(self, lines, semantics="grounded"):
+        '''
+        Evaluates each case in lines, a JSON object per line (see knowledge_base_from_json), yielding a JSON
+        object per case with the id of the case, the query result and the response of ArgumentationTheory.evaluate.
+        Cases are parsed by the workers
+        '''
+
+        return self.map(evaluate_json_case, ((line, semantics) for line in lines if line.strip()))
+
+    def map(self, function, cases):
+        arguments = (self.argumentation_system, self.ordering, self.engine)
+
+        if self.processes == 1:
+            initialise_worker(*arguments)
+            for case in cases:
+                yield function(case)
+            return
+
+        with multiprocessing.Pool(self.processes, initialise_worker, arguments) as pool:
+            for result in pool.imap(function, cases, self.chunksize):
+                yield result
+
+def initialise_worker(argumentation_system, ordering, engine):
+    worker["argumentation_system"] = argumentation_system
+    worker["ordering"] = ordering
+    worker["engine"] = engine
+
+def case_system():
+    '''
+    Returns a copy of the worker's argumentation system for a single case: the language and contrariness
+    grow with the arguments of the case, and lazily transposed rules with its conclusions, so neither is
+    shared with other cases or (when evaluating in this process) with the system given to the evaluator
+    '''
+
+    return worker["argumentation_system"].copy()
+
+def evaluate_case(case):
+    (case, semantics) = case
+
+    query = None
+    if type(case) is tuple:
+        (case, query) = case
+
+    theory = ArgumentationTheory(case_system(), case, worker["ordering"], worker["engine"])
+
+    return theory.evaluate(semantics, query)
+
+def evaluate_json_case(case):
+    (line, semantics) = case
+
+    data = json.loads(line)
+    knowledge_base = knowledge_base_from_json(data)
+
+    theory = ArgumentationTheory(case_system(), knowledge_base, worker["ordering"], worker["engine"])
+    response, query_response = theory.evaluate(data.get("semantics", semantics), data.get("query"))
+
+    result = {"id": data.get("id"), "query": query_response}
+    result.update(response)
+
+    return json.dumps(result)
+
+def system_from_json(data):
+    '''
+    Creates an argumentation system from a dict of the form:
+        {"rules": {"[r1]": "a,b=>c", ...}, "contraries": [["a", "b"], ...], "contradictories": [["c", "d"], ...],
+         "rule_preferences": [["[r1]", "[r2]"], ...], "transposition": false}
+    where contraries are read as in ArgumentationSystem.add_contrary
+    '''
+
+    return TheoryLoader().read_dict(data).system()
+
+def knowledge_base_from_json(data):
+    '''
+    Creates a knowledge base from a dict of the form:
+        {"axioms": ["a", ...], "premises": ["b", ...], "assumptions": ["c", ...], "preferences": [["b", "c"], ...]}
+    '''
+
+    return TheoryLoader().read_dict(data).knowledge_base()
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Evaluates many knowledge bases (one JSON object per line) against the same argumentation system")
+    parser.add_argument("system", help="JSON file describing the argumentation system")
+    parser.add_argument("cases", nargs="?", default="-", help="JSON lines file of knowledge bases (default: standard input)")
+    parser.add_argument("-o", "--output", default="-", help="file to write the results to, one JSON object per line (default: standard output)")
+    parser.add_argument("-s", "--semantics", default="grounded")
+    parser.add_argument("--ordering", default="weakest", choices=["weakest", "last"])
+    parser.add_argument("--engine", default=ArgumentationTheory.LOCAL_ENGINE)
+    parser.add_argument("-p", "--processes", type=int, default=None, help="number of worker processes (default: all CPUs)")
+    parser.add_argument("-c", "--chunksize", type=int, default=16, help="number of cases sent to a worker at a time")
+    args = parser.parse_args(args)
+
+    with open(args.system) as f:
+        argumentation_system = system_from_json(json.load(f))
+
+    evaluator = BatchEvaluator(argumentation_system, args.ordering, args.engine, args.processes, args.chunksize)
+
+    cases = sys.stdin if args.cases == "-" else open(args.cases)
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+
+    try:
+        for result in evaluator.evaluate_json(cases, args.semantics):
+            output.write(result + "\n")
+            output.flush()
+    finally:
+        if cases is not sys.stdin:
+            cases.close()
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from .rule import Rule
+from .argumentation_theory import ArgumentationTheory, unique
+from .semantics import ArgumentationFramework
+from .engine_client import EngineClient
+from array import array
+import copy
+import json
+import mmap
+import struct
+import sys
+
+class CompiledFramework:
+    '''
+    A built theory saved in a compact binary file: its strings (formulas, rules, labels) each stored once,
+    its rules, the arguments as a DAG over their direct sub-arguments, and the attacks, defeats and
+    preferences between them as pairs of argument indexes
+
+    The file is opened with mmap and its tables are read in place, so processes opening the same file
+    share its pages, and strings and argument descriptions are only decoded when they are used
+
+    The file starts with MAGIC and the sizes of its sections, followed by the sections, each a little-endian
+    array of 32-bit integers (or bytes, for the text of the strings) padded to 8 bytes:
+        string offsets   (strings + 1) offsets into the text, which is UTF-8
+        string text
+        rules            (label, rule, is defeasible) for each rule
+        arguments        (label, conclusion, top rule or -1, premise or -1, first sub-argument, sub-arguments) for each argument
+        sub-arguments    the direct sub-arguments of the arguments, in order
+        attacks          (attacker, attacked) for each attack
+        defeats          (defeater, defeated) for each defeat
+        preferences      (less preferred, more preferred) for the pairs of arguments in an attack
+    String 0 is a JSON object of the settings the theory was evaluated with (ordering, partial)
+    '''
+
+    MAGIC = b"PYASPIC\x01"
+
+    HEADER = struct.Struct("<8s8Q")
+
+    # the number of integers in a record of each table
+    RULE = 3
+    ARGUMENT = 6
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, strings, rules, arguments, subs, attacks, defeats, preferences, text = self.HEADER.unpack_from(self.map, 0)
+        if magic != self.MAGIC:
+            raise ValueError("{path} is not a compiled framework".format(path=path))
+
+        view = memoryview(self.map)
+        position = self.HEADER.size
+
+        self.string_offsets, position = section(view, position, strings + 1)
+        self.text = view[position:position + text]
+        position = position + padded(text)
+
+        self.rules, position = section(view, position, rules * self.RULE)
+        self.argument_table, position = section(view, position, arguments * self.ARGUMENT)
+        self.sub_argument_table, position = section(view, position, subs)
+        self.attack_table, position = section(view, position, attacks * 2)
+        self.defeat_table, position = section(view, position, defeats * 2)
+        self.preference_table, position = section(view, position, preferences * 2)
+
+        self.size = arguments
+
+        self.strings = {}
+        self.descriptions = {}
+        self.labels = None
+        self.indexes = None
+
+        self.settings = json.loads(self.string(0))
+        self.ordering = self.settings["ordering"]
+        self.partial = self.settings["partial"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        '''
+        Releases the views of the file and closes its map
+        '''
+
+        for table in [self.string_offsets, self.text, self.rules, self.argument_table, self.sub_argument_table,
+                      self.attack_table, self.defeat_table, self.preference_table]:
+            if isinstance(table, memoryview):
+                table.release()
+
+        self.map.close()
+
+    @classmethod
+    def save(cls, theory, path):
+        '''
+        Evaluates the arguments, attacks and defeats of theory (if they are not up to date) and saves them to path
+        '''
+
+        theory.update_stage("defeats")
+
+        strings = {}
+        text = []
+
+        def string(s):
+            i = strings.get(s)
+            if i is None:
+                i = len(text)
+                strings[s] = i
+                text.append(s.encode("utf-8"))
+            return i
+
+        string(json.dumps({"ordering": theory.ordering, "partial": theory.partial}))
+
+        rule_ids = {}
+        rules = array("i")
+        index = {a.label: i for (i, a) in enumerate(theory.arguments)}
+        arguments = array("i")
+        subs = array("i")
+
+        for a in theory.arguments:
+            rule = -1
+            premise = -1
+
+            if a.top_rule is None:
+                premise = string(str(next(iter(a.premises))))
+            else:
+                # instances of the same rule share a label, so rules are told apart by their text
+                description = str(a.top_rule)
+                rule = rule_ids.get(description)
+                if rule is None:
+                    rule = len(rule_ids)
+                    rule_ids[description] = rule
+                    rules.extend([string(a.top_rule.label), string(description), 1 if a.top_rule.type == Rule.DEFEASIBLE else 0])
+
+            arguments.extend([string(a.label), string(str(a.conclusion)), rule, premise, len(subs), len(a.last_sub_arguments)])
+            subs.extend([index[s.label] for s in a.last_sub_arguments])
+
+        attacks = array("i", [index[x] for pair in theory.attack for x in pair])
+        defeats = array("i", [index[x] for pair in theory.defeat for x in pair])
+
+        arguments_by_label = theory.arguments_by_label
+        preferences = array("i")
+        for pair in unique(theory.attack):
+            (x, y) = [arguments_by_label[label] for label in pair]
+            for (p, q) in [(x, y), (y, x)]:
+                if theory.argument_ordering.is_less_preferred(p, q):
+                    preferences.extend([index[p.label], index[q.label]])
+
+        offsets = array("i", [0])
+        for s in text:
+            offsets.append(offsets[-1] + len(s))
+        text = b"".join(text)
+
+        with open(path, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, len(offsets) - 1, len(rules) // cls.RULE, len(arguments) // cls.ARGUMENT,
+                                    len(subs), len(attacks) // 2, len(defeats) // 2, len(preferences) // 2, len(text)))
+
+            write_section(f, offsets)
+            f.write(text + b"\0" * (padded(len(text)) - len(text)))
+
+            for table in [rules, arguments, subs, attacks, defeats, preferences]:
+                write_section(f, table)
+
+    def string(self, i):
+        s = self.strings.get(i)
+        if s is None:
+            s = str(self.text[self.string_offsets[i]:self.string_offsets[i + 1]], "utf-8")
+            self.strings[i] = s
+        return s
+
+    def __len__(self):
+        return self.size
+
+    def label(self, i):
+        return self.string(self.argument_table[i * self.ARGUMENT])
+
+    def index(self, label):
+        '''
+        Returns the index of the argument with the given label
+        '''
+
+        if self.indexes is None:
+            self.indexes = {label: i for (i, label) in enumerate(self.arguments())}
+        return self.indexes[label]
+
+    def arguments(self):
+        '''
+        Returns the labels of the arguments, in the order they were constructed
+        '''
+
+        if self.labels is None:
+            self.labels = [self.label(i) for i in range(self.size)]
+        return self.labels
+
+    def conclusion(self, i):
+        return self.string(self.argument_table[i * self.ARGUMENT + 1])
+
+    def top_rule(self, i):
+        '''
+        Returns the text of the top rule of the i-th argument, or None if it is atomic
+        '''
+
+        rule = self.argument_table[i * self.ARGUMENT + 2]
+        return None if rule < 0 else self.string(self.rules[rule * self.RULE + 1])
+
+    def is_defeasible_rule(self, i):
+        rule = self.argument_table[i * self.ARGUMENT + 2]
+        return rule >= 0 and self.rules[rule * self.RULE + 2] == 1
+
+    def premise(self, i):
+        '''
+        Returns the premise of the i-th argument (as in the knowledge base), or None if it has a top rule
+        '''
+
+        premise = self.argument_table[i * self.ARGUMENT + 3]
+        return None if premise < 0 else self.string(premise)
+
+    def last_sub_arguments(self, i):
+        start = self.argument_table[i * self.ARGUMENT + 4]
+        return list(self.sub_argument_table[start:start + self.argument_table[i * self.ARGUMENT + 5]])
+
+    def walk(self, i):
+        '''
+        Returns the indexes of the sub-arguments of the i-th argument depth first, each once, as Argument.walk does
+        '''
+
+        walk = []
+        seen = set()
+        stack = list(reversed(self.last_sub_arguments(i)))
+
+        while stack:
+            j = stack.pop()
+            if j in seen:
+                continue
+
+            seen.add(j)
+            walk.append(j)
+            stack.extend(reversed(self.last_sub_arguments(j)))
+
+        return walk
+
+    def pairs(self, table):
+        return [(self.label(table[k]), self.label(table[k + 1])) for k in range(0, len(table), 2)]
+
+    def attacks(self):
+        return self.pairs(self.attack_table)
+
+    def defeats(self):
+        return self.pairs(self.defeat_table)
+
+    def preferences(self):
+        return self.pairs(self.preference_table)
+
+    def describe(self, i):
+        '''
+        Returns the description of the i-th argument, as in the "arguments" of a response of ArgumentationTheory.evaluate;
+        descriptions are cached with tuples, and each call returns its own copy
+        '''
+
+        description = self.descriptions.get(i)
+
+        if description is None:
+            sub_arguments = self.walk(i)
+            chain = [i] + sub_arguments
+            description = {"conclusion": self.conclusion(i),
+                           "defeasible_rules": tuple(unique([self.top_rule(j) for j in chain if self.is_defeasible_rule(j)])),
+                           "premises": tuple(unique([self.premise(j) for j in chain if self.premise(j) is not None])),
+                           "top_rule": str(self.top_rule(i)),
+                           "sub_arguments": tuple([self.label(j) for j in sub_arguments]),
+                           "last_sub_arguments": tuple([self.label(j) for j in self.last_sub_arguments(i)])
+                          }
+            self.descriptions[i] = description
+
+        return {key: list(value) if type(value) is tuple else value for (key, value) in description.items()}
+
+    def evaluate(self, semantics="grounded", query=None, engine=ArgumentationTheory.LOCAL_ENGINE):
+        '''
+        Evaluates the saved framework as ArgumentationTheory.evaluate evaluates the theory, with the local engine,
+        the URL of a remote one or an EngineClient, returning the same response
+        '''
+
+        arguments = self.arguments()
+        defeats = self.defeats()
+
+        if engine == ArgumentationTheory.LOCAL_ENGINE:
+            response = ArgumentationFramework(arguments, defeats).solve(semantics)
+        elif isinstance(engine, EngineClient):
+            response = engine.evaluate(arguments, defeats, semantics)
+        else:
+            response = EngineClient.for_url(engine).evaluate(arguments, defeats, semantics)
+
+        if semantics not in response:
+            semantics = "grounded"
+
+        # a remote engine's client caches its responses, so the response is built from copies of its lists
+        extensions = {i: list(response[semantics][i]) for i in range(len(response[semantics])) if type(response[semantics][i]) is list}
+        if not extensions:
+            extensions = {0: list(response[semantics])}
+
+        response = {key: copy.deepcopy(value) for (key, value) in response.items() if key != semantics}
+        response["extensions"] = extensions
+
+        query_response = None if query is None else False
+
+        response["acceptableConclusions"] = {}
+        for id, ext in extensions.items():
+            ext = set(ext)
+            c = [self.conclusion(i) for i in range(self.size) if arguments[i] in ext]
+
+            if query is not None and query in c:
+                query_response = True
+
+            response["acceptableConclusions"][id] = c
+
+        response["arguments"] = {arguments[i]: self.describe(i) for i in range(self.size)}
+
+        if self.partial:
+            response["partial"] = self.partial
+
+        return response, query_response
+
+def padded(size):
+    return (size + 7) // 8 * 8
+
+def section(view, position, count):
+    '''
+    Returns a view of count 32-bit integers at position, and the position of the next section
+    '''
+
+    size = count * 4
+    table = view[position:position + size].cast("i")
+
+    if sys.byteorder != "little":
+        table = array("i", table)
+        table.byteswap()
+
+    return table, position + padded(size)
+
+def write_section(f, table):
+    if sys.byteorder != "little":
+        table = array("i", table)
+        table.byteswap()
+
+    data = table.tobytes()
+    f.write(data + b"\0" * (padded(len(data)) - len(data)))
@@ -0,0 +1,79 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import time
+import tracemalloc
+
+class ConstructionBudget:
+    '''
+    Limits on the construction of arguments: the number of arguments, the depth of an argument,
+    the time in seconds since construction started, and the memory in bytes allocated since then
+
+    The memory is measured with tracemalloc, which is started for the construction if it is not
+    already tracing, and slows construction down. Arguments deeper than max_depth are not constructed,
+    while exceeding any other limit stops construction; atomic arguments count towards max_arguments too
+    '''
+
+    MAX_ARGUMENTS = "max_arguments"
+    MAX_DEPTH = "max_depth"
+    DEADLINE = "deadline"
+    MAX_MEMORY = "max_memory"
+
+    def __init__(self, max_arguments=None, max_depth=None, deadline=None, max_memory=None):
+        self.max_arguments = max_arguments
+        self.max_depth = max_depth
+        self.deadline = deadline
+        self.max_memory = max_memory
+
+        self.started = None
+        self.tracing = False
+
+    def start(self):
+        self.started = time.perf_counter()
+
+        if self.max_memory is not None:
+            self.tracing = not tracemalloc.is_tracing()
+            if self.tracing:
+                tracemalloc.start()
+            self.memory = tracemalloc.get_traced_memory()[0]
+
+    def stop(self):
+        if self.tracing:
+            tracemalloc.stop()
+            self.tracing = False
+
+    def exceeded(self, arguments):
+        '''
+        Returns the limit that is exceeded once there are the given number of arguments, or None
+        '''
+
+        if self.max_arguments is not None and arguments >= self.max_arguments:
+            return self.MAX_ARGUMENTS
+
+        if self.deadline is not None and time.perf_counter() - self.started >= self.deadline:
+            return self.DEADLINE
+
+        if self.max_memory is not None and tracemalloc.get_traced_memory()[0] - self.memory >= self.max_memory:
+            return self.MAX_MEMORY
+
+        return None
+
+    def allows_arguments(self, arguments):
+        return self.max_arguments is None or arguments < self.max_arguments
+
+    def allows_depth(self, depth):
+        return self.max_depth is None or depth <= self.max_depth
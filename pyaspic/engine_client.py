@@ -0,0 +1,176 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import copy
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+class EngineClient:
+    '''
+    Client for a remote argumentation engine, which computes the extensions of a framework sent as
+    {"arguments": [...], "attacks": ["(a,b)", ...], "semantics": ...}
+
+    Connections are kept alive and reused, at most max_concurrency requests are in flight at once,
+    failed requests are retried with exponential backoff, and responses to identical frameworks are cached
+    '''
+
+    # responses with these statuses are worth retrying
+    RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+    # clients shared by theories that only give the engine's URL, so they share connections and cache
+    clients = {}
+    clients_lock = threading.Lock()
+
+    def __init__(self, url, timeout=30, retries=3, backoff=0.5, max_concurrency=8, cache_size=1024):
+        if requests is None:
+            raise ImportError("the requests package is required to use a remote engine; use engine=\"local\" to evaluate in-process")
+
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.in_flight = threading.BoundedSemaphore(max_concurrency)
+        self.executor = None
+        self.executor_lock = threading.Lock()
+
+        # responses, keyed by payload, least recently used first
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+
+    def for_url(url):
+        '''
+        Returns the shared client for the engine at url
+        '''
+
+        with EngineClient.clients_lock:
+            if url not in EngineClient.clients:
+                EngineClient.clients[url] = EngineClient(url)
+            return EngineClient.clients[url]
+
+    def payload(self, arguments, attacks, semantics):
+        return json.dumps({
+            "arguments": list(arguments),
+            "attacks": ["({a},{b})".format(a=a,b=b) for (a,b) in attacks],
+            "semantics": semantics
+        })
+
+    def evaluate(self, arguments, attacks, semantics="grounded"):
+        '''
+        Returns the engine's response for the framework of the given argument labels and (attacker, attacked) pairs
+        '''
+
+        return self.post(self.payload(arguments, attacks, semantics))
+
+    async def evaluate_async(self, arguments, attacks, semantics="grounded"):
+        '''
+        As evaluate, but awaitable; the request is made on a thread of this client, so the event loop is not blocked
+        '''
+
+        payload = self.payload(arguments, attacks, semantics)
+
+        response = self.cached(payload)
+        if response is not None:
+            return response
+
+        # in a coroutine, this is the running loop (get_running_loop needs Python 3.7)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self.get_executor(), self.post, payload)
+
+    def evaluate_many(self, frameworks, semantics="grounded"):
+        '''
+        Evaluates each of the (arguments, attacks) frameworks concurrently, returning the responses in the same order
+        '''
+
+        futures = [self.get_executor().submit(self.evaluate, arguments, attacks, semantics) for (arguments, attacks) in frameworks]
+
+        return [f.result() for f in futures]
+
+    def get_executor(self):
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(self.max_concurrency)
+
+            return self.executor
+
+    def cached(self, payload):
+        with self.cache_lock:
+            if payload in self.cache:
+                self.cache.move_to_end(payload)
+                return copy.deepcopy(self.cache[payload])
+
+        return None
+
+    def post(self, payload):
+        response = self.cached(payload)
+        if response is not None:
+            return response
+
+        attempt = 0
+
+        while True:
+            try:
+                with self.in_flight:
+                    r = self.session.post(self.url, data=payload, timeout=self.timeout)
+
+                if r.status_code not in self.RETRY_STATUSES:
+                    r.raise_for_status()
+                    response = r.json()
+                    break
+
+                if attempt >= self.retries:
+                    r.raise_for_status()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt >= self.retries:
+                    raise
+
+            time.sleep(self.backoff * (2 ** attempt))
+            attempt = attempt + 1
+
+        if self.cache_size:
+            with self.cache_lock:
+                self.cache[payload] = copy.deepcopy(response)
+                while len(self.cache) > self.cache_size:
+                    self.cache.popitem(last=False)
+
+        return response
+
+    def close(self):
+        with self.executor_lock:
+            executor = self.executor
+            self.executor = None
+
+        if executor is not None:
+            executor.shutdown()
+
+        self.session.close()
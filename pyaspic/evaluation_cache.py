@@ -0,0 +1,170 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from collections import OrderedDict
+import copy
+import json
+import os
+import tempfile
+
+class EvaluationCache:
+    '''
+    Cache of the responses of ArgumentationTheory.evaluate, keyed by the fingerprint of the theory and semantics
+
+    The most recently used max_entries responses are kept in memory. If path is given, responses are also
+    written to files in that directory, so they outlive the process and are shared by processes using it;
+    the least recently used files are removed once they take more than max_bytes
+
+    Responses are copied when they are put and got, so changing a response does not change the cached one
+    '''
+
+    def __init__(self, max_entries=1024, path=None, max_bytes=None):
+        self.max_entries = max_entries
+        self.path = path
+        self.max_bytes = max_bytes
+
+        self.entries = OrderedDict()
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        '''
+        Returns a copy of the response cached for key, or None
+        '''
+
+        response = self.entries.get(key)
+
+        if response is not None:
+            self.entries.move_to_end(key)
+            self.hits = self.hits + 1
+            return copy.deepcopy(response)
+
+        if self.path is not None:
+            response = self.read(key)
+            if response is not None:
+                self.remember(key, response)
+                self.hits = self.hits + 1
+                self.disk_hits = self.disk_hits + 1
+                return copy.deepcopy(response)
+
+        self.misses = self.misses + 1
+        return None
+
+    def put(self, key, response):
+        '''
+        Caches a copy of response for key
+        '''
+
+        self.remember(key, copy.deepcopy(response))
+
+        if self.path is not None:
+            self.write(key, response)
+
+    def remember(self, key, response):
+        self.entries[key] = response
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions = self.evictions + 1
+
+    def clear(self):
+        '''
+        Empties the cache, including its directory
+        '''
+
+        self.entries = OrderedDict()
+
+        if self.path is not None:
+            for name in self.files():
+                os.remove(os.path.join(self.path, name))
+
+    def stats(self):
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses,
+                "evictions": self.evictions, "entries": len(self.entries)}
+
+    def file(self, key):
+        return os.path.join(self.path, key + ".json")
+
+    def files(self):
+        return [name for name in os.listdir(self.path) if name.endswith(".json")]
+
+    def read(self, key):
+        try:
+            with open(self.file(key)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # the file was used, so it is the last to be removed
+        try:
+            os.utime(self.file(key))
+        except OSError:
+            pass
+
+        # JSON objects have string keys, while extensions are numbered
+        for field in ["extensions", "acceptableConclusions"]:
+            if field in data:
+                data[field] = {int(i): v for (i, v) in data[field].items()}
+
+        return data
+
+    def write(self, key, response):
+        # written to a temporary file first, so other processes never read a partly written response
+        (descriptor, temporary) = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(descriptor, "w") as f:
+            json.dump(response, f)
+        os.replace(temporary, self.file(key))
+
+        if self.max_bytes is not None:
+            self.shrink()
+
+    def shrink(self):
+        '''
+        Removes the least recently used files until those left take at most max_bytes
+        '''
+
+        files = []
+        for name in self.files():
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum([size for (mtime, size, name) in files])
+
+        for (mtime, size, name) in sorted(files):
+            if total <= self.max_bytes:
+                break
+
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                pass
+
+            total = total - size
+            self.evictions = self.evictions + 1
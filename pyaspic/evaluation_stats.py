@@ -0,0 +1,88 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+class EvaluationStats:
+    '''
+    Records where the time of evaluating an ArgumentationTheory goes: the wall time of each stage
+    (accumulated over the evaluations since the last reset), each construction pass, counts of the work
+    done by argument construction, and the sizes of the last evaluation
+
+    Callbacks are called as callback(event, data) as each stage, pass or evaluation completes, with event
+    one of STAGE ({"stage", "time"}), PASS ({"pass", "time", "arguments"} and the pass's counts) or EVALUATE (to_dict())
+    '''
+
+    STAGE = "stage"
+    PASS = "pass"
+    EVALUATE = "evaluate"
+
+    # the counts recorded by argument construction
+    COUNTS = [
+        "rule_attempts",         # rules tried against the arguments in a pass
+        "combinations",          # combinations of sub-arguments considered for a rule
+        "rejected_bindings",     # arguments matching an antecedent that bind one of its variables to two values
+        "rejected_comparisons",  # combinations that failed a comparison antecedent
+        "duplicates",            # arguments constructed again
+        "pruned"                 # arguments dropped or removed for being dominated, or beyond the most for a conclusion
+    ]
+
+    def __init__(self, callbacks=None):
+        self.callbacks = list(callbacks) if callbacks else []
+        self.reset()
+
+    def reset(self):
+        self.stage_times = {}
+        self.passes = []
+        self.counts = {c: 0 for c in self.COUNTS}
+        self.sizes = {}
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def notify(self, event, data):
+        for callback in self.callbacks:
+            callback(event, data)
+
+    def record_stage(self, stage, time):
+        self.stage_times[stage] = self.stage_times.get(stage, 0) + time
+
+        if self.callbacks:
+            self.notify(self.STAGE, {"stage": stage, "time": time})
+
+    def record_pass(self, time, arguments, counts):
+        for c, n in counts.items():
+            self.counts[c] = self.counts[c] + n
+
+        record = {"pass": len(self.passes) + 1, "time": time, "arguments": arguments}
+        record.update(counts)
+        self.passes.append(record)
+
+        if self.callbacks:
+            self.notify(self.PASS, record)
+
+    def record_evaluation(self, sizes):
+        self.sizes = sizes
+
+        if self.callbacks:
+            self.notify(self.EVALUATE, self.to_dict())
+
+    def to_dict(self):
+        return {
+            "stage_times": dict(self.stage_times),
+            "passes": [dict(p) for p in self.passes],
+            "counts": dict(self.counts),
+            "sizes": dict(self.sizes)
+        }
@@ -0,0 +1,164 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+import operator
+import re
+
+class Expression:
+    '''
+    Class representing an arithmetic expression (e.g. X+{Y*2}) or comparison (e.g. X<Y, X==3),
+    parsed once into a tree of closures that can be evaluated against many bindings of its variables
+
+    Variables start with an uppercase letter, and are bound to strings that are read as numbers;
+    braces group like parentheses. Evaluating raises ValueError if a variable is unbound or not a number
+    '''
+
+    tokens = re.compile(r"\s*(?:([0-9]+(?:\.[0-9]+)?)|([A-Za-z_][A-Za-z0-9_]*)|(<=|>=|==|!=|<|>|=|[-+*/(){}]))")
+
+    comparisons = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+                   "==": operator.eq, "=": operator.eq, "!=": operator.ne}
+
+    arithmetic = {"+": operator.add, "-": operator.sub, "*": operator.mul, "/": operator.truediv}
+
+    closing = {"(": ")", "{": "}"}
+
+    def __init__(self, source):
+        self.source = source
+        self.variables = []
+        self.is_comparison = False
+
+        self.parse_tokens(source)
+        self.position = 0
+
+        function = self.parse_sum()
+
+        if self.peek() in self.comparisons:
+            op = self.comparisons[self.next()]
+            left = function
+            right = self.parse_sum()
+            function = lambda binding: op(left(binding), right(binding))
+            self.is_comparison = True
+
+        if self.position != len(self.parsed):
+            raise ValueError("unexpected {token} in {source}".format(token=self.parsed[self.position][1], source=source))
+
+        self.function = function
+        del self.parsed
+
+    def evaluate(self, binding):
+        '''
+        Returns the value of this expression (True/False for a comparison) given the binding of its variables
+        '''
+
+        return self.function(binding)
+
+    def parse_tokens(self, source):
+        self.parsed = []
+        position = 0
+        source = source.rstrip()
+
+        while position < len(source):
+            match = self.tokens.match(source, position)
+            if match is None or match.end() == position:
+                raise ValueError("cannot parse {source}".format(source=source))
+
+            number, name, symbol = match.groups()
+            if number is not None:
+                self.parsed.append(("number", number))
+            elif name is not None:
+                self.parsed.append(("name", name))
+            else:
+                self.parsed.append(("symbol", symbol))
+
+            position = match.end()
+
+    def peek(self):
+        if self.position < len(self.parsed):
+            return self.parsed[self.position][1]
+        return None
+
+    def next(self):
+        if self.position >= len(self.parsed):
+            raise ValueError("unexpected end of {source}".format(source=self.source))
+
+        token = self.parsed[self.position]
+        self.position = self.position + 1
+        return token[1]
+
+    def parse_sum(self):
+        function = self.parse_product()
+
+        while self.peek() in ["+", "-"]:
+            function = self.binary(self.arithmetic[self.next()], function, self.parse_product())
+
+        return function
+
+    def parse_product(self):
+        function = self.parse_unary()
+
+        while self.peek() in ["*", "/"]:
+            function = self.binary(self.arithmetic[self.next()], function, self.parse_unary())
+
+        return function
+
+    def parse_unary(self):
+        if self.peek() == "-":
+            self.next()
+            operand = self.parse_unary()
+            return lambda binding: -operand(binding)
+
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind, token = self.parsed[self.position] if self.position < len(self.parsed) else (None, None)
+        self.next()
+
+        if kind == "number":
+            value = number(token)
+            return lambda binding: value
+
+        if kind == "name":
+            if token[0].isupper():
+                if token not in self.variables:
+                    self.variables.append(token)
+                return lambda binding: variable(binding, token)
+
+            # constants are not numbers, so expressions over them cannot be evaluated
+            return lambda binding: number(token)
+
+        if token in self.closing:
+            function = self.parse_sum()
+            if self.next() != self.closing[token]:
+                raise ValueError("unbalanced brackets in {source}".format(source=self.source))
+            return function
+
+        raise ValueError("unexpected {token} in {source}".format(token=token, source=self.source))
+
+    def binary(self, op, left, right):
+        return lambda binding: op(left(binding), right(binding))
+
+def number(value):
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+def variable(binding, name):
+    if name not in binding:
+        raise ValueError("{name} is not bound".format(name=name))
+
+    return number(binding[name])
@@ -16,47 +16,96 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.
 """
 
 import re
+import weakref
+from .expression import Expression
 
 class Formula:
+    '''
+    Class representing a (possibly first-order) formula
 
-    def __init__(self, str_formula):
-        self.regex = re.compile(r"(([^() ]+)(\([^()]+\))?)", re.VERBOSE)
+    Formulas are immutable and hash-consed: constructing a formula from a string that has
+    been seen before returns the existing object, so identical formulas share one instance
+    '''
 
-        self.comparison_regex = re.compile(r"((?:[A-Z][a-z]*)|(?:[0-9]+))[ ]*(?:<|>|==)[ ]*([A-Z][a-z]*|[0-9]+)")
+    regex = re.compile(r"(([^() ]+)(\([^()]+\))?)", re.VERBOSE)
 
-        self.expression_regex = re.compile(r"\[([^\[\]]+)\]")
+    expression_regex = re.compile(r"\[([^\[\]]+)\]")
 
-        self.expressions = {}
-        self.expression_map = {}
+    __slots__ = ("term", "parameters", "variables", "expressions", "expression_map", "is_comparison", "comparison", "_str", "_hash", "__weakref__")
 
-        self.variable_mapping = {}
+    # interned formulas, keyed by both the string they were created from and their canonical string
+    table = weakref.WeakValueDictionary()
 
-        self.is_comparison = False
+    def __new__(cls, str_formula):
+        formula = cls.table.get(str_formula)
+        if formula is not None:
+            return formula
+
+        formula = object.__new__(cls)
+        formula.parse(str_formula)
+
+        # share the instance with any equivalent formula written differently (e.g. "q(a,b)" and "q(a, b)")
+        formula = cls.table.setdefault(formula._str, formula)
+        cls.table[str_formula] = formula
+
+        return formula
+
+    def parse(self, str_formula):
+        term = None
+        parameters = []
+        variables = []
+        expressions = {}
+        expression_map = {}
+        is_comparison = False
+        comparison = None
 
         match = re.findall(self.regex, str_formula)
 
         if match:
             match = [m for m in match[0] if m.strip() != '']
 
-            self.term = match[1]
-
-            self.parameters = []
-            self.variables = []
+            term = match[1]
 
             if len(match) == 3:
                 for v in match[2][1:-1].split(","):
                     v = v.strip()
-                    if not self.parse_expression(v):
-                        self.parameters.append(v)
+                    if not self.parse_expression(v, parameters, variables, expressions, expression_map):
+                        parameters.append(v)
                         if v[0].isupper():
-                            self.variables.append(v)
-            else:
-                match2 = re.findall(self.comparison_regex, self.term)
-                if match2:
-                    self.is_comparison = True
-                    for m in match2[0]:
-                        if m[0].isupper():
-                            self.variables.append(m[0])
+                            variables.append(v)
+            elif "<" in term or ">" in term or "=" in term:
+                try:
+                    comparison = Expression(term)
+                except ValueError:
+                    comparison = None
+
+                if comparison is not None and comparison.is_comparison:
+                    is_comparison = True
+                    variables.extend(comparison.variables)
+                else:
+                    comparison = None
+
+        object.__setattr__(self, "term", term)
+        object.__setattr__(self, "parameters", tuple(parameters))
+        object.__setattr__(self, "variables", tuple(variables))
+        object.__setattr__(self, "expressions", expressions)
+        object.__setattr__(self, "expression_map", expression_map)
+        object.__setattr__(self, "is_comparison", is_comparison)
+        object.__setattr__(self, "comparison", comparison)
+
+        if parameters:
+            p = []
+            for param in parameters:
+                if param in expression_map:
+                    p.append("[{expr}]".format(expr=expression_map[param]))
+                else:
+                    p.append(param)
+
+            object.__setattr__(self, "_str", "{term}({parameters})".format(term=term, parameters=", ".join(p)))
+        else:
+            object.__setattr__(self, "_str", str(term))
+
+        object.__setattr__(self, "_hash", hash((term, self.parameters)))
 
     def has_variables(self):
         return (len(self.variables) > 0)
@@ -66,96 +115,109 @@ class Formula:
 
 
     def evaluate_comparison(self, variable_mapping):
+        '''
+        Evaluates this comparison given the values of its variables; comparisons that cannot be evaluated
+        (e.g. because a variable is unbound, or not a number) are False
+        '''
+
         if not self.is_comparison:
             return False
 
-        expression = self.term
-
-        for k,v in variable_mapping.items():
-            expression = expression.replace(k,v)
-
         try:
-            result = eval(expression)
-        except:
-            result = False
-
-        return result
+            return self.comparison.evaluate(variable_mapping)
+        except (ValueError, ArithmeticError):
+            return False
 
 
-    def parse_expression(self, input):
+    def parse_expression(self, input, parameters, variables, expressions, expression_map):
         match = re.findall(self.expression_regex, input)
 
         if match:
             expr_parameters = []
             current = ""
-            self.parameters.append(match[0])
+            parameters.append(match[0])
             for char in match[0]:
                 if char in ["+","-","*","/","{","}"]:
                     if current != "":
                         if current[0].isupper():
-                            self.variables.append(current)
+                            variables.append(current)
                             expr_parameters.append(current)
                     current = ""
                 else:
                     current = current + char
             if current != "":
                 if current[0].isupper():
-                    self.variables.append(current)
+                    variables.append(current)
                     expr_parameters.append(current)
 
             expr = match[0].replace("{","(")
             expr = expr.replace("}",")")
 
-            self.expressions[len(self.parameters)-1] = {"parameters": expr_parameters, "expression": expr}
-            self.expression_map[match[0]] = match[0]
+            try:
+                compiled = Expression(expr)
+            except ValueError:
+                compiled = None
+
+            expressions[len(parameters)-1] = {"parameters": expr_parameters, "expression": expr, "compiled": compiled}
+            expression_map[match[0]] = match[0]
 
             return True
         else:
             return False
 
 
-    def resolve_expressions(self):
-        for k,v in self.expressions.items():
-            parameters = v["parameters"]
-            expression = v["expression"]
+    def instantiate(self, variable_mapping):
+        '''
+        Returns the formula obtained by resolving the expressions of this formula and replacing its
+        variables according to variable_mapping (formulas are immutable, so this one is unchanged)
+        '''
+
+        if not self.variables or not self.parameters:
+            return self
 
-            for p in v["parameters"]:
-                if p in self.variable_mapping:
-                    value = self.variable_mapping[p]
-                    expression = expression.replace(p, value)
+        parameters = list(self.parameters)
 
+        for k,v in self.expressions.items():
+            # expressions that cannot be evaluated resolve to 0
             try:
-                result = int(eval(expression))
-            except:
+                result = int(v["compiled"].evaluate(variable_mapping))
+            except (AttributeError, ValueError, ArithmeticError):
                 result = 0
 
-            self.parameters[k] = str(result)
+            parameters[k] = str(result)
 
-    def __str__(self):
-        if self.parameters:
+        for i in range(len(parameters)):
+            if i not in self.expressions and parameters[i] in variable_mapping:
+                parameters[i] = variable_mapping[parameters[i]]
 
-            p = []
-            for param in self.parameters:
-                if param in self.expression_map:
-                    p.append("[{expr}]".format(expr=self.expression_map[param]))
-                elif param in self.variable_mapping:
-                    p.append(self.variable_mapping[param])
-                else:
-                    p.append(param)
+        return Formula("{term}({parameters})".format(term=self.term, parameters=", ".join(parameters)))
 
+    def __setattr__(self, name, value):
+        raise AttributeError("Formula objects are immutable")
 
-            return "{term}({parameters})".format(term=self.term, parameters=", ".join(p))
-        else:
-            return str(self.term)
+    def __reduce__(self):
+        return (Formula, (self._str,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __str__(self):
+        return self._str
 
     # def __repr__(self):
     #     return self.__str__()
 
     def __eq__(self, other):
+        if self is other:
+            return True
+
         if self.term == other.term and self.parameters == other.parameters:
             return True
         else:
             return False
 
     def __hash__(self):
-        return hash(str(self.term) + str(self.parameters))
+        return self._hash
@@ -0,0 +1,186 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+class RuleGrounder:
+    '''
+    Grounds a rule against arguments: finds the combinations of arguments, one for each antecedent,
+    whose conclusions bind the rule's variables consistently
+
+    The arguments matching each antecedent are joined one antecedent at a time, starting with the
+    fewest matches and then preferring antecedents that share variables with those already joined;
+    matches are looked up in a hash table on the values of the shared variables, so combinations
+    with conflicting bindings are never produced
+    '''
+
+    # the number of candidates tried between calls of interrupted, in join
+    CHECK_INTERVAL = 1024
+
+    def __init__(self, rule, rule_bit=0):
+        self.rule = rule
+
+        # the rule's bit in the rule_bits of the arguments it is grounded against (see RuleBits)
+        self.rule_bit = rule_bit
+
+        # comparisons are evaluated on the bindings, rather than fulfilled by arguments
+        self.comparisons = [ant for ant in rule.antecedents if "<" in ant.term or ">" in ant.term or "=" in ant.term]
+        comparison_terms = set([c.term for c in self.comparisons])
+        self.antecedents = [ant for ant in rule.antecedents if ant.term not in comparison_terms]
+
+        # for each antecedent, the positions of its variables
+        self.variables = []
+        for ant in self.antecedents:
+            self.variables.append([(i, ant.parameters[i]) for i in range(len(ant.parameters)) if ant.parameters[i][0].isupper()])
+
+    def bind(self, i, argument):
+        '''
+        Returns the binding of the variables of the i-th antecedent to the conclusion of argument,
+        or None if a variable occurs more than once and would be bound to different values
+        '''
+
+        binding = {}
+        parameters = argument.conclusion.parameters
+
+        for (position, variable) in self.variables[i]:
+            value = parameters[position]
+            if binding.setdefault(variable, value) != value:
+                return None
+
+        return binding
+
+    def candidates(self, i, arguments):
+        '''
+        Returns (argument, binding) for each of the arguments (matching the i-th antecedent) that binds it
+        consistently and does not already use the rule, and the number of arguments rejected for inconsistent bindings
+        '''
+
+        candidates = []
+        rejected = 0
+
+        for a in arguments:
+            # don't re-use rules
+            if a.uses_rule(self.rule_bit):
+                continue
+
+            binding = self.bind(i, a)
+            if binding is None:
+                rejected = rejected + 1
+            else:
+                candidates.append((a, binding))
+
+        return candidates, rejected
+
+    def join(self, candidates, interrupted=None):
+        '''
+        Yields (arguments, binding) for each combination of one candidate per antecedent whose bindings agree,
+        with the arguments in the order of the antecedents
+
+        Combinations are extended depth first, so they are yielded one at a time rather than all built
+        before the first is yielded; if interrupted is given, it is called every CHECK_INTERVAL candidates
+        tried, and the join stops as soon as it returns True
+        '''
+
+        if any(not c for c in candidates):
+            return
+
+        if not candidates:
+            yield [], {}
+            return
+
+        remaining = list(range(len(candidates)))
+        first = min(remaining, key=lambda i: len(candidates[i]))
+        remaining.remove(first)
+
+        bound = set([v for (p, v) in self.variables[first]])
+
+        # the antecedents after the first, in the order they are joined, each with the variables it shares
+        # with those before it and its candidates by the values of those variables
+        steps = []
+
+        while remaining:
+            # the next antecedent shares the most variables with those joined so far, then has the fewest candidates
+            i = min(remaining, key=lambda j: (-len(bound.intersection([v for (p, v) in self.variables[j]])), len(candidates[j])))
+            remaining.remove(i)
+
+            shared = sorted(bound.intersection([v for (p, v) in self.variables[i]]))
+
+            table = {}
+            for (a, binding) in candidates[i]:
+                key = tuple([binding[v] for v in shared])
+                if key not in table:
+                    table[key] = []
+                table[key].append((a, binding))
+
+            steps.append((i, shared, table))
+            bound.update([v for (p, v) in self.variables[i]])
+
+        order = [first] + [i for (i, shared, table) in steps]
+
+        # each entry is the candidates still to try for the next antecedent, and the combination they extend
+        stack = [(iter(candidates[first]), [None] * len(candidates), {})]
+        tried = 0
+
+        while stack:
+            (matches, arguments, binding) = stack[-1]
+
+            match = next(matches, None)
+            if match is None:
+                stack.pop()
+                continue
+
+            tried = tried + 1
+            if interrupted is not None and tried % self.CHECK_INTERVAL == 0 and interrupted():
+                return
+
+            depth = len(stack) - 1
+
+            (a, b) = match
+            new_arguments = list(arguments)
+            new_arguments[order[depth]] = a
+            new_binding = dict(binding)
+            new_binding.update(b)
+
+            if depth == len(steps):
+                yield new_arguments, new_binding
+            else:
+                (i, shared, table) = steps[depth]
+                stack.append((iter(table.get(tuple([new_binding[v] for v in shared]), [])), new_arguments, new_binding))
+
+    def ground(self, candidates, delta_ids=None, interrupted=None):
+        '''
+        Yields the consistent combinations of the candidates for each antecedent; if delta_ids is given,
+        only those including at least one argument whose id is in delta_ids, each exactly once:
+        the i-th join takes a delta argument for the i-th antecedent, older arguments before it and any argument after it.
+        Stops when interrupted returns True, as join does
+        '''
+
+        if delta_ids is None:
+            for combination in self.join(candidates, interrupted):
+                yield combination
+            return
+
+        old = [[c for c in s if id(c[0]) not in delta_ids] for s in candidates]
+        new = [[c for c in s if id(c[0]) in delta_ids] for s in candidates]
+
+        for i in range(len(candidates)):
+            if not new[i]:
+                continue
+
+            for combination in self.join(old[:i] + [new[i]] + candidates[i+1:], interrupted):
+                yield combination
+
+            if interrupted is not None and interrupted():
+                return
@@ -29,14 +29,20 @@ class KnowledgeBase:
 
         self.preferences = []
 
+        # incremented on every change, so that theories can tell when cached results are stale
+        self.version = 0
+
     def add_axiom(self, formula):
         self.axioms.append(Axiom(formula))
+        self.version = self.version + 1
 
     def add_premise(self, formula):
         self.premises.append(Premise(formula))
+        self.version = self.version + 1
 
     def add_assumption(self, formula):
         self.assumptions.append(Assumption(formula))
+        self.version = self.version + 1
 
     def add_preference(self, preference):
         lp = str(preference[0])
@@ -53,6 +59,62 @@ class KnowledgeBase:
             return
 
         self.preferences.append((lp, mp))
+        self.version = self.version + 1
+
+    def add_preferences(self, preferences):
+        '''
+        Adds each preference as add_preference does, collecting the axioms, premises and assumptions once rather than for each preference
+        '''
+
+        str_axioms = set([str(a) for a in self.axioms])
+        str_premises = set([str(p) for p in self.premises])
+        str_assumptions = set([str(a) for a in self.assumptions])
+
+        added = False
+
+        for preference in preferences:
+            lp = str(preference[0])
+            mp = str(preference[1])
+
+            if lp in str_axioms or mp in str_axioms:
+                continue
+
+            if lp in str_premises and mp in str_assumptions:
+                continue
+
+            self.preferences.append((lp, mp))
+            added = True
+
+        if added:
+            self.version = self.version + 1
+
+    def remove_axiom(self, formula):
+        self.axioms = self.remove_element(self.axioms, formula)
+
+    def remove_premise(self, formula):
+        self.premises = self.remove_element(self.premises, formula)
+
+    def remove_assumption(self, formula):
+        self.assumptions = self.remove_element(self.assumptions, formula)
+
+    def remove_element(self, elements, formula):
+        '''
+        Returns elements without those whose formula is the given formula
+        '''
+
+        remaining = [e for e in elements if str(e) != str(formula)]
+
+        if len(remaining) != len(elements):
+            self.version = self.version + 1
+
+        return remaining
+
+    def remove_preference(self, preference):
+        preference = (str(preference[0]), str(preference[1]))
+
+        if preference in self.preferences:
+            self.preferences = [p for p in self.preferences if p != preference]
+            self.version = self.version + 1
 
 class KnowledgeBaseElement:
 
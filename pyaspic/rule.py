@@ -23,6 +23,8 @@ class Rule:
     DEFEASIBLE = "=>"
     STRICT = "->"
 
+    antecedent_regex = re.compile(r"([^(), ]+\([^()]+\)?|[^(), ]+)")
+
     def __init__(self, label, antecedents, consequent, type):
         self.antecedents = antecedents
         self.consequent = consequent
@@ -42,11 +44,9 @@ class Rule:
         else:
             return None
 
-        antecedent_regex = r"([^(), ]+\([^()]+\)?|[^(), ]+)"
-
         parts = str_.split(type)
 
-        antecedents = [Formula(a.strip()) for a in re.findall(antecedent_regex, parts[0].strip())]
+        antecedents = [Formula(a.strip()) for a in Rule.antecedent_regex.findall(parts[0].strip())]
         consequent = Formula(parts[1].strip())
 
 
@@ -0,0 +1,332 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from collections import deque
+
+class ArgumentationFramework:
+    '''
+    Class representing an abstract (Dung-style) argumentation framework,
+    used to compute extensions in-process rather than via a remote engine
+    '''
+
+    GROUNDED = "grounded"
+    COMPLETE = "complete"
+    PREFERRED = "preferred"
+    STABLE = "stable"
+
+    SEMANTICS = [GROUNDED, COMPLETE, PREFERRED, STABLE]
+
+    def __init__(self, arguments, defeats):
+        self.arguments = list(arguments)
+
+        self.attackers = {a: set() for a in self.arguments}
+        self.attacked = {a: set() for a in self.arguments}
+
+        for (a, b) in defeats:
+            if a in self.attacked and b in self.attackers:
+                self.attacked[a].add(b)
+                self.attackers[b].add(a)
+
+    def solve(self, semantics):
+        '''
+        Computes the extensions under the given semantics, returning a response of the same
+        shape as the remote engine: {semantics: extension} for grounded, and
+        {semantics: [extension, ...]} otherwise. Unknown semantics fall back to grounded.
+        '''
+
+        if semantics == self.COMPLETE:
+            return {semantics: self.complete()}
+        elif semantics == self.PREFERRED:
+            return {semantics: self.preferred()}
+        elif semantics == self.STABLE:
+            return {semantics: self.stable()}
+
+        return {self.GROUNDED: self.grounded()}
+
+    def grounded(self):
+        '''
+        Computes the grounded extension in time linear in the size of the framework:
+        each argument keeps a count of attackers not yet labelled out, and is labelled in
+        as soon as that count reaches zero
+        '''
+
+        return self.ordered(self.grounded_labelling()[0])
+
+    def grounded_labelling(self, previous=None, affected=None):
+        '''
+        Computes the grounded labelling as the sets of arguments labelled in and out
+
+        Given the previous labelling, and the arguments whose attackers have changed since,
+        only the affected arguments and those they (transitively) attack are relabelled;
+        the labels of all other arguments cannot have changed
+        '''
+
+        if previous is None:
+            region = set(self.arguments)
+            labelled_in = set()
+            labelled_out = set()
+        else:
+            region = set()
+            stack = [a for a in affected if a in self.attackers]
+            while stack:
+                a = stack.pop()
+                if a not in region:
+                    region.add(a)
+                    stack.extend(self.attacked[a])
+
+            labelled_in = set([a for a in previous[0] if a in self.attackers and a not in region])
+            labelled_out = set([a for a in previous[1] if a in self.attackers and a not in region])
+
+        # attackers outside the region keep their labels: in attackers make the argument out,
+        # undecided attackers are counted but never labelled out, out attackers are not counted
+        remaining = {}
+        defeated = []
+
+        for a in self.arguments:
+            if a not in region:
+                continue
+
+            remaining[a] = 0
+            for b in self.attackers[a]:
+                if b in region or b not in labelled_out:
+                    remaining[a] = remaining[a] + 1
+                if b in labelled_in:
+                    defeated.append(a)
+
+        for a in defeated:
+            if a not in labelled_out:
+                labelled_out.add(a)
+                for c in self.attacked[a]:
+                    remaining[c] = remaining[c] - 1
+
+        queue = deque([a for a in self.arguments if a in region and remaining[a] == 0 and a not in labelled_out])
+
+        while queue:
+            a = queue.popleft()
+            labelled_in.add(a)
+
+            for b in self.attacked[a]:
+                if b in labelled_out:
+                    continue
+                labelled_out.add(b)
+
+                for c in self.attacked[b]:
+                    remaining[c] = remaining[c] - 1
+                    if remaining[c] == 0 and c not in labelled_out:
+                        queue.append(c)
+
+        return labelled_in, labelled_out
+
+    def complete(self):
+        '''
+        Enumerates the complete extensions (see labellings)
+        '''
+
+        return [self.ordered(e) for e in self.labellings(self.COMPLETE)]
+
+    def preferred(self):
+        '''
+        Computes the preferred extensions as the maximal admissible sets (see labellings)
+        '''
+
+        return [self.ordered(e) for e in self.labellings(self.PREFERRED)]
+
+    def stable(self):
+        '''
+        Computes the stable extensions: the complete extensions that defeat every argument outside them
+        '''
+
+        return [self.ordered(e) for e in self.labellings(self.STABLE)]
+
+    # the labels of arguments in the search for extensions
+    IN = "in"
+    OUT = "out"
+    UNDEC = "undec"
+    MUST_OUT = "must_out"
+    BLANK = "blank"
+
+    def labellings(self, semantics):
+        '''
+        Searches depth first for the admissible sets that are extensions under the given (complete, preferred or
+        stable) semantics, with labels as in Nofal, Atkinson and Dunne (2014). Each argument is in (IN), out because
+        an argument in the set defeats it (OUT), must be out because it defeats an argument in the set but is not
+        defeated yet (MUST_OUT), left out of the set (UNDEC) or not decided yet (BLANK)
+
+        The search starts from the grounded labelling, which every complete extension agrees with. An argument whose
+        defeaters are all out or must be out is defended by every admissible set extending the current one, so it is
+        taken in without branching; otherwise the search tries a BLANK argument in, then left out. A branch is
+        abandoned as soon as an argument that must be out has no defeater left that could be in, and also:
+        for complete semantics, when an argument left out is defended (all its defeaters are out);
+        for stable semantics, when an argument left out has no defeater left that could be in;
+        for preferred semantics, when its arguments that are in or could be in are a subset of an extension found
+        '''
+
+        labelled_in, labelled_out = self.grounded_labelling()
+
+        labels = dict([(a, self.IN) for a in labelled_in])
+        labels.update([(a, self.OUT) for a in labelled_out])
+        labels.update([(a, self.UNDEC) for a in self.arguments if a not in labels and a in self.attackers[a]])
+        labels.update([(a, self.BLANK) for a in self.arguments if a not in labels])
+
+        extensions = []
+        stack = [labels]
+
+        while stack:
+            labels = stack.pop()
+
+            if semantics == self.PREFERRED:
+                candidates = set([a for a in self.arguments if labels[a] == self.IN or labels[a] == self.BLANK])
+                if any(candidates <= e for e in extensions):
+                    continue
+            elif semantics == self.STABLE:
+                if any(labels[a] == self.UNDEC and not self.can_be_defeated(labels, a) for a in self.arguments):
+                    continue
+            elif any(labels[a] == self.UNDEC and all(labels[b] == self.OUT for b in self.attackers[a]) for a in self.arguments):
+                continue
+
+            blank = [a for a in self.arguments if labels[a] == self.BLANK]
+
+            if not blank:
+                if self.MUST_OUT not in labels.values():
+                    extension = set([a for a in self.arguments if labels[a] == self.IN])
+                    if semantics == self.PREFERRED:
+                        extensions = [e for e in extensions if not e <= extension]
+                    extensions.append(extension)
+                continue
+
+            defended = next((a for a in blank if all(labels[b] == self.OUT or labels[b] == self.MUST_OUT for b in self.attackers[a])), None)
+
+            if defended is not None:
+                if self.take_in(labels, defended):
+                    stack.append(labels)
+                continue
+
+            a = blank[0]
+
+            # pushed first, so explored after the branch with a in
+            branch = dict(labels)
+            branch[a] = self.UNDEC
+            if all(self.can_be_defeated(branch, b) for b in self.attacked[a] if branch[b] == self.MUST_OUT):
+                stack.append(branch)
+
+            if self.take_in(labels, a):
+                stack.append(labels)
+
+        return extensions
+
+    def take_in(self, labels, a):
+        '''
+        Labels a in, the arguments it defeats out and its defeaters that are not out yet as must be out,
+        returning False if an argument that must be out has no defeater left that could be in
+        '''
+
+        labels[a] = self.IN
+
+        for b in self.attacked[a]:
+            labels[b] = self.OUT
+
+        for b in self.attackers[a]:
+            if labels[b] != self.OUT:
+                labels[b] = self.MUST_OUT
+
+        return all(self.can_be_defeated(labels, b) for b in self.arguments if labels[b] == self.MUST_OUT)
+
+    def can_be_defeated(self, labels, a):
+        return any(labels[b] == self.BLANK for b in self.attackers[a])
+
+    def is_accepted(self, argument, semantics=GROUNDED):
+        '''
+        Decides whether argument is in the grounded extension or, for preferred semantics, in at least
+        one preferred extension (credulous acceptance)
+
+        Only the arguments that can (indirectly) defeat argument are considered: these are all the moves
+        the opponent could make in an argument game about it, and the proponent's replies are among them
+        '''
+
+        relevant = set()
+        stack = [argument]
+        while stack:
+            a = stack.pop()
+            if a not in relevant:
+                relevant.add(a)
+                stack.extend(self.attackers[a])
+
+        framework = ArgumentationFramework(self.ordered(relevant), [(a, b) for b in relevant for a in self.attackers[b]])
+
+        if semantics == self.PREFERRED:
+            return framework.admissible_set(argument) is not None
+
+        return argument in framework.grounded_labelling()[0]
+
+    def admissible_set(self, argument):
+        '''
+        Plays the credulous argument game for argument: the proponent builds an admissible set containing it,
+        answering each attack of the opponent on the set with a defeater that does not conflict with the set.
+        Returns the set, or None if the proponent cannot win
+        '''
+
+        if argument in self.attackers[argument]:
+            return None
+
+        return self.defend(set([argument]))
+
+    def defend(self, extension):
+        '''
+        Searches depth first for an admissible set extending extension, keeping the moves on a stack rather than
+        recursing, so long argument games do not exhaust the call stack. Each entry is a set and the proponent's
+        remaining replies to the first attack on it that the set does not defeat
+        '''
+
+        stack = [(extension, None)]
+
+        while stack:
+            (extension, replies) = stack[-1]
+
+            if replies is None:
+                b = self.unanswered(extension)
+                if b is None:
+                    return extension
+
+                # the opponent has moved b, so the proponent has to reply with one of its defeaters
+                replies = iter([c for c in self.ordered(self.attackers[b])
+                                if not (c in self.attackers[c] or self.attackers[c] & extension or self.attacked[c] & extension)])
+                stack[-1] = (extension, replies)
+
+            c = next(replies, None)
+            if c is None:
+                stack.pop()
+            else:
+                stack.append((extension | set([c]), None))
+
+        return None
+
+    def unanswered(self, extension):
+        '''
+        Returns the first attacker of a member of extension that extension does not defeat, or None
+        '''
+
+        defeated = set(b for a in extension for b in self.attacked[a])
+
+        for a in self.ordered(extension):
+            for b in self.attackers[a]:
+                if b not in defeated:
+                    return b
+
+        return None
+
+    def ordered(self, extension):
+        return [a for a in self.arguments if a in extension]
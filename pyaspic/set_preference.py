@@ -35,3 +35,74 @@ def check_preference(set1, set2, element_preferences):
                 return True
 
     return False
+
+
+class SetPreference:
+    '''
+    Compiled form of a list of (less preferred, more preferred) element preferences, giving the
+    same answers as check_preference; each element is assigned a bit, so the elements of a set
+    and the elements preferred to any of them are each represented by a single integer bitset
+    '''
+
+    def __init__(self, element_preferences):
+        self.empty = len(element_preferences) == 0
+
+        self.bits = {}
+        self.more_preferred = {}
+
+        for (x, y) in element_preferences:
+            x = str(x)
+            y = str(y)
+
+            if y not in self.bits:
+                self.bits[y] = 1 << len(self.bits)
+
+            self.more_preferred[x] = self.more_preferred.get(x, 0) | self.bits[y]
+
+    def compile(self, elements):
+        '''
+        Returns (size, mask, upper) for a set of elements, where mask has the bits of the elements
+        and upper has the bits of every element preferred to one of them
+        '''
+
+        mask = 0
+        upper = 0
+
+        for e in elements:
+            e = str(e)
+            mask = mask | self.bits.get(e, 0)
+            upper = upper | self.more_preferred.get(e, 0)
+
+        return (len(elements), mask, upper)
+
+    def merge(self, compiled):
+        '''
+        Returns the compiled form of the union of compiled sets, with the sum of their sizes
+        '''
+
+        size = 0
+        mask = 0
+        upper = 0
+
+        for (n, m, u) in compiled:
+            size = size + n
+            mask = mask | m
+            upper = upper | u
+
+        return (size, mask, upper)
+
+    def check(self, set1, set2):
+        '''
+        Equivalent to check_preference, for sets compiled with the compile method
+        '''
+
+        if set1[0] == 0:
+            return False
+
+        if set2[0] == 0:
+            return True
+
+        if self.empty:
+            return True
+
+        return (set1[2] & set2[1]) != 0
@@ -0,0 +1,168 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from .argumentation_system import ArgumentationSystem
+from .knowledge_base import KnowledgeBase, Axiom, Premise, Assumption
+from .formula import Formula
+from .rule import Rule
+import re
+
+class TheoryLoader:
+    '''
+    Loads an argumentation system and a knowledge base in bulk, from a theory file (see read) or dicts
+    (see read_dict): everything is read in a single pass, and then the system and knowledge base are built
+    with their indexes (of rules by label, and of the knowledge base's elements) computed once
+
+    Preferences are checked against everything that was read, wherever they appear, rather than against
+    what has been added so far, as add_preference and add_rule_preference do
+    '''
+
+    # a line declaring a rule, e.g. "[r1] a,b=>c", or an item, e.g. "premise: p(a)"
+    line_regex = re.compile(r"\s*(?:(\[[^\]]*\])\s*(.*?)|([a-z_]+)\s*:\s*(.*?))\s*$")
+
+    ELEMENTS = ["axiom", "premise", "assumption"]
+
+    # the pairs that can be read, and the keys of their lists in dicts
+    PAIRS = {"contrary": "contraries", "contradictory": "contradictories", "preference": "preferences", "rule_preference": "rule_preferences"}
+    TRANSPOSITIONS = {"true": True, "false": False, "lazy": ArgumentationSystem.LAZY_TRANSPOSITION}
+
+    def __init__(self, transposition=False):
+        self.transposition = transposition
+
+        self.rules = []
+        self.contraries = []
+        self.elements = {kind: [] for kind in self.ELEMENTS}
+        self.preferences = []
+        self.rule_preferences = []
+
+    def read(self, lines):
+        '''
+        Reads a theory, one declaration per line, where blank lines and lines starting with # are ignored:
+            [r1] a,b=>c                   a rule, as in Rule.from_string
+            axiom: a                      an axiom (and likewise premise: and assumption:)
+            contrary: a; b                a is a contrary of b (contradictory: also makes b a contrary of a)
+            preference: a; b              the premise a is less preferred than b
+            rule_preference: [r1]; [r2]   the rule [r1] is less preferred than [r2]
+            transposition: true           closes the strict rules under transposition (false, true or lazy)
+        Raises ValueError for a line that cannot be read, giving its number
+        '''
+
+        for (number, line) in enumerate(lines, 1):
+            if not line.strip() or line.lstrip()[0] == "#":
+                continue
+
+            match = self.line_regex.match(line)
+            if match is None:
+                raise ValueError("line {number}: cannot read {line}".format(number=number, line=line.strip()))
+
+            (label, rule, kind, value) = match.groups()
+
+            if label is not None:
+                if Rule.DEFEASIBLE not in rule and Rule.STRICT not in rule:
+                    raise ValueError("line {number}: {rule} is not a rule".format(number=number, rule=rule))
+                self.rules.append((label, rule))
+            elif kind in self.ELEMENTS:
+                self.elements[kind].append(value)
+            elif kind in self.PAIRS:
+                pair = [v.strip() for v in value.split(";")]
+                if len(pair) != 2 or not all(pair):
+                    raise ValueError("line {number}: expected two formulas separated by ; in {line}".format(number=number, line=line.strip()))
+                self.add_pair(kind, pair)
+            elif kind == "transposition" and value.lower() in self.TRANSPOSITIONS:
+                self.transposition = self.TRANSPOSITIONS[value.lower()]
+            else:
+                raise ValueError("line {number}: cannot read {line}".format(number=number, line=line.strip()))
+
+        return self
+
+    def read_dict(self, data):
+        '''
+        Reads a theory from a dict of the form of system_from_json, knowledge_base_from_json or both
+        '''
+
+        if "transposition" in data:
+            self.transposition = data["transposition"]
+
+        self.rules.extend(data.get("rules", {}).items())
+
+        for kind in self.ELEMENTS:
+            self.elements[kind].extend(data.get(kind + "s", []))
+
+        for kind, key in self.PAIRS.items():
+            for pair in data.get(key, []):
+                self.add_pair(kind, pair)
+
+        return self
+
+    def add_pair(self, kind, pair):
+        if kind == "contrary":
+            self.contraries.append(((pair[0], pair[1]), False))
+        elif kind == "contradictory":
+            self.contraries.append(((pair[0], pair[1]), True))
+        elif kind == "preference":
+            self.preferences.append((pair[0], pair[1]))
+        else:
+            self.rule_preferences.append((pair[0], pair[1]))
+
+    def system(self):
+        '''
+        Returns a new argumentation system of the rules, contraries and rule preferences read
+        '''
+
+        argumentation_system = ArgumentationSystem(transposition=self.transposition)
+
+        for (label, rule) in self.rules:
+            argumentation_system.add_rule(Rule.from_string(label, rule))
+
+        for (contrary, contradiction) in self.contraries:
+            argumentation_system.add_contrary(contrary, contradiction)
+
+        argumentation_system.add_rule_preferences(self.rule_preferences)
+
+        return argumentation_system
+
+    def knowledge_base(self):
+        '''
+        Returns a new knowledge base of the elements and preferences read
+        '''
+
+        knowledge_base = KnowledgeBase()
+
+        knowledge_base.axioms = [Axiom(Formula(a)) for a in self.elements["axiom"]]
+        knowledge_base.premises = [Premise(Formula(p)) for p in self.elements["premise"]]
+        knowledge_base.assumptions = [Assumption(Formula(a)) for a in self.elements["assumption"]]
+        knowledge_base.version = knowledge_base.version + 1
+
+        knowledge_base.add_preferences(self.preferences)
+
+        return knowledge_base
+
+def load_theory(source, transposition=False):
+    '''
+    Reads a theory file (see TheoryLoader.read) from a path, a file or any iterable of lines,
+    returning (argumentation system, knowledge base)
+    '''
+
+    loader = TheoryLoader(transposition)
+
+    if isinstance(source, str):
+        with open(source) as f:
+            loader.read(f)
+    else:
+        loader.read(source)
+
+    return loader.system(), loader.knowledge_base()
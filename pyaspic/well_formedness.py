@@ -0,0 +1,239 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from .rule import Rule
+from .grounder import RuleGrounder
+
+class WellFormednessChecker:
+    '''
+    Checks a theory against the well-formedness conditions of Prakken 2010, over the declared contrariness:
+        1) no consequent of a defeasible rule is a contrary of the consequent of a strict rule
+        2) no assumption is a contrary of the consequent of a rule, an axiom or a premise
+    and the conclusions of an extension against the rationality postulates of Caminada and Amgoud 2007:
+    closure under strict rules, direct consistency and indirect consistency
+
+    Every violation is reported, as (condition, description). Formulas are only compared with the contraries
+    declared for their term and arity, and matched by unification, so the time taken grows with the size
+    of the theory rather than with the number of pairs of rules
+    '''
+
+    RULE_CONSEQUENTS = "Consequents of defeasible rules cannot be contraries of consequents of strict rules"
+    ASSUMPTIONS = "Assumptions cannot be contraries of axioms or premises"
+    CLOSURE = "Conclusions of an extension must be closed under strict rules"
+    DIRECT_CONSISTENCY = "Conclusions of an extension must be consistent"
+    INDIRECT_CONSISTENCY = "The closure of the conclusions of an extension under strict rules must be consistent"
+
+    def __init__(self, argumentation_system, knowledge_base):
+        self.argumentation_system = argumentation_system
+        self.knowledge_base = knowledge_base
+
+        # the rules, including the transpositions a lazily transposed system has not derived yet
+        self.rules = sorted(argumentation_system.rules, key=lambda r: r.label)
+
+        if argumentation_system.transposition == argumentation_system.LAZY_TRANSPOSITION:
+            labels = set([r.label for r in self.rules])
+            for r in list(self.rules):
+                if r.type == Rule.STRICT and r.label not in argumentation_system.transposed:
+                    self.rules.extend([t for t in argumentation_system.transpositions(r) if t.label not in labels])
+
+        self.strict_rules = [r for r in self.rules if r.type == Rule.STRICT]
+
+    def violations(self):
+        '''
+        Returns the violations of both well-formedness conditions
+        '''
+
+        return self.rule_violations() + self.assumption_violations()
+
+    def rule_violations(self):
+        patterns = self.argumentation_system.contrary_patterns
+
+        defeasible_consequents = {}
+        for r in self.rules:
+            if r.type == Rule.DEFEASIBLE:
+                defeasible_consequents.setdefault(key(r.consequent), []).append(r)
+
+        violations = []
+
+        for r1 in self.strict_rules:
+            for (formula, contrary) in patterns.get(key(r1.consequent), []):
+                for r2 in defeasible_consequents.get(key(contrary), []):
+                    if r1.label != r2.label and unifiable([(r1.consequent, formula), (r2.consequent, contrary)]):
+                        violations.append((self.RULE_CONSEQUENTS, "{c2} ({r2}) is a contrary of {c1} ({r1})".format(
+                            c2=r2.consequent, r2=r2.label, c1=r1.consequent, r1=r1.label)))
+
+        return violations
+
+    def assumption_violations(self):
+        patterns = self.argumentation_system.contrary_of_patterns
+
+        elements = {}
+        for r in self.rules:
+            elements.setdefault(key(r.consequent), []).append((r.consequent, r.label))
+        for p in self.knowledge_base.axioms + self.knowledge_base.premises:
+            elements.setdefault(key(p.formula), []).append((p.formula, p.type))
+
+        violations = []
+
+        for a in self.knowledge_base.assumptions:
+            for (formula, contrary) in patterns.get(key(a.formula), []):
+                for (element, source) in elements.get(key(formula), []):
+                    if unifiable([(element, formula), (a.formula, contrary)]):
+                        violations.append((self.ASSUMPTIONS, "{a} is a contrary of {el} ({source})".format(
+                            a=a.formula, el=element, source=source)))
+
+        return violations
+
+    def postulate_violations(self, conclusions, extension=None):
+        '''
+        Returns the violations of the rationality postulates by the conclusions (formulas) of an extension
+        '''
+
+        name = "" if extension is None else " {id}".format(id=extension)
+
+        conclusions = set([c for c in conclusions if c.term[:2] != "~["])
+        closure = self.closure(conclusions)
+
+        violations = []
+
+        for c in sorted(closure - conclusions, key=str):
+            violations.append((self.CLOSURE, "extension{name} does not conclude {c}".format(name=name, c=c)))
+
+        direct = self.inconsistencies(conclusions)
+        for (c, x) in direct:
+            violations.append((self.DIRECT_CONSISTENCY, "extension{name} concludes {c} and its contrary {x}".format(name=name, c=c, x=x)))
+
+        # an inconsistency of the conclusions is also one of their closure, so it is only reported once
+        if closure != conclusions:
+            for (c, x) in self.inconsistencies(closure):
+                if (c, x) not in direct:
+                    violations.append((self.INDIRECT_CONSISTENCY, "the closure of extension{name} includes {c} and its contrary {x}".format(name=name, c=c, x=x)))
+
+        return violations
+
+    def closure(self, conclusions):
+        '''
+        Returns the closure of conclusions (formulas) under the strict rules
+        '''
+
+        closure = set(conclusions)
+        index = {}
+        delta = list(closure)
+
+        while delta:
+            for c in delta:
+                index.setdefault(key(c), []).append(c)
+
+            delta = []
+
+            for r in self.strict_rules:
+                grounder = RuleGrounder(r)
+
+                candidates = []
+                for ant in grounder.antecedents:
+                    candidates.append([(c, b) for (c, b) in [(c, self.argumentation_system.unify(ant, c)) for c in index.get(key(ant), [])] if b is not None])
+
+                for (formulas, binding) in grounder.join(candidates):
+                    if all(comparison.evaluate_comparison(binding) for comparison in grounder.comparisons):
+                        consequent = r.consequent.instantiate(binding)
+                        if consequent not in closure and consequent.term[:2] != "~[":
+                            closure.add(consequent)
+                            delta.append(consequent)
+
+        return closure
+
+    def inconsistencies(self, formulas):
+        '''
+        Returns each pair (formula, contrary) of the formulas where one is a contrary of the other, once
+        '''
+
+        names = set([str(f) for f in formulas])
+
+        pairs = []
+        seen = set()
+
+        for f in sorted(formulas, key=str):
+            for x in sorted(self.contraries(f)):
+                pair = frozenset([str(f), x])
+                if x in names and pair not in seen:
+                    seen.add(pair)
+                    pairs.append((str(f), x))
+
+        return pairs
+
+    def contraries(self, formula):
+        '''
+        Returns the contraries of formula, instantiating the declared contrariness for it if it is not in the language
+        '''
+
+        system = self.argumentation_system
+
+        contraries = system.contrariness.get(str(formula))
+        if contraries is not None and formula in system.language:
+            return contraries
+
+        contraries = set(contraries or [])
+        contraries.add(str(formula)[1:] if str(formula)[0] == "~" else "~" + str(formula))
+
+        for (pattern, contrary) in system.contrary_patterns.get(key(formula), []):
+            binding = system.unify(pattern, formula)
+            if binding is not None:
+                contraries.update([str(c) for (c, b) in system.instances(contrary, binding)])
+
+        return contraries
+
+def key(formula):
+    return (formula.term, len(formula.parameters))
+
+def unifiable(pairs):
+    '''
+    Returns whether each (formula, pattern) pair can be made equal by a single substitution, where each
+    formula has its own variables and the patterns share theirs; parameters that are expressions match anything
+    '''
+
+    parent = {}
+
+    def find(x):
+        while x in parent:
+            x = parent[x]
+        return x
+
+    for i in range(len(pairs)):
+        (formula, pattern) = pairs[i]
+
+        for (f, p) in zip(formula.parameters, pattern.parameters):
+            x = find(parameter(formula, f, i))
+            y = find(parameter(pattern, p, None))
+
+            if x == y:
+                continue
+
+            if x[0] == "constant" and y[0] == "constant":
+                return False
+
+            if x[0] == "constant":
+                parent[y] = x
+            else:
+                parent[x] = y
+
+    return True
+
+def parameter(formula, p, owner):
+    if p in formula.expression_map or p[0].isupper():
+        return ("variable", owner, p)
+
+    return ("constant", p)
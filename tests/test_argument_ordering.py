@@ -0,0 +1,78 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationTheory
+from pyaspic.argument_ordering import ArgumentOrdering
+from pyaspic.set_preference import SetPreference, check_preference
+from .theories import random_theory
+import random
+import unittest
+
+def preference(arg1, arg2, ordering, knowledge_base, system):
+    '''
+    Returns the preference that follows from comparing arg1 to arg2 under the ordering, computed from the
+    definitions of the orderings with check_preference on the sets of premises and rules
+    '''
+
+    if ordering == "last":
+        if (arg1.is_strict() and arg1.is_firm()) and (arg2.is_defeasible() or arg2.is_plausible()):
+            return (arg2.label, arg1.label)
+        elif not arg1.last_def_rules() and not arg2.last_def_rules():
+            if check_preference(arg1.premises, arg2.premises, knowledge_base.preferences):
+                return (arg1.label, arg2.label)
+        elif check_preference(arg1.last_def_rules(), arg2.last_def_rules(), system.rule_preferences):
+            return (arg1.label, arg2.label)
+    elif check_preference(arg1.premises, arg2.premises, knowledge_base.preferences):
+        if not arg2.defeasible_rules or check_preference(arg1.get_defeasible_rules(), arg2.get_defeasible_rules(), system.rule_preferences):
+            return (arg1.label, arg2.label)
+
+    return None
+
+class ArgumentOrderingTest(unittest.TestCase):
+
+    def test_compiled_sets_match_check_preference(self):
+        rnd = random.Random(0)
+        elements = ["e{i}".format(i=i) for i in range(8)]
+
+        for _ in range(200):
+            preferences = [tuple(rnd.sample(elements, 2)) for _ in range(rnd.randint(0, 6))]
+            compiled = SetPreference(preferences)
+
+            set1 = rnd.sample(elements, rnd.randint(0, 3))
+            set2 = rnd.sample(elements, rnd.randint(0, 3))
+            halves = [compiled.compile(set2[:1]), compiled.compile(set2[1:])]
+
+            self.assertEqual(compiled.check(compiled.compile(set1), compiled.compile(set2)), check_preference(set1, set2, preferences))
+            self.assertEqual(compiled.check(compiled.compile(set1), compiled.merge(halves)), check_preference(set1, set2, preferences))
+
+    def test_orderings_match_definitions(self):
+        for seed in range(40):
+            system, knowledge_base = random_theory(seed)
+            theory = ArgumentationTheory(system, knowledge_base, engine=ArgumentationTheory.LOCAL_ENGINE)
+            theory.construct_arguments()
+
+            for ordering in ["weakest", "last"]:
+                compiled = ArgumentOrdering(knowledge_base, system, ordering)
+
+                for arg1 in theory.arguments:
+                    for arg2 in theory.arguments:
+                        if arg1.label != arg2.label:
+                            self.assertEqual(compiled.compare(arg1, arg2), preference(arg1, arg2, ordering, knowledge_base, system),
+                                             (seed, ordering, arg1.label, arg2.label))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,375 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationSystem, ArgumentationTheory, ConstructionBudget, Formula, Rule, load_theory
+from pyaspic.argument import ArgumentIndex
+from pyaspic.grounder import RuleGrounder
+from .theories import random_theory
+import copy
+import time
+import unittest
+
+def local_theory(system, knowledge_base, **options):
+    return ArgumentationTheory(system, knowledge_base, engine=ArgumentationTheory.LOCAL_ENGINE, **options)
+
+def conclusions(theory, semantics="grounded"):
+    '''
+    Returns the sets of conclusions of the arguments in each extension, which do not depend on how arguments are labelled
+    '''
+
+    response, _ = theory.evaluate(semantics)
+    return sorted([sorted(set(c)) for c in response["acceptableConclusions"].values()])
+
+class ArgumentationTheoryTest(unittest.TestCase):
+
+    def test_rule_bits_are_per_theory(self):
+        first = local_theory(*load_theory(["[r1] a=>b", "[r2] b=>c", "premise: a"]))
+        second = local_theory(*load_theory(["[s1] a=>b", "premise: a"]))
+        first.evaluate()
+        second.evaluate()
+
+        self.assertEqual(set(first.rule_bits.bits), set(["[r1]", "[r2]"]))
+        self.assertEqual(set(second.rule_bits.bits), set(["[s1]"]))
+
+        # rules no longer in the system are dropped when the arguments are constructed afresh
+        first.argumentation_system.remove_rule("[r2]")
+        first.evaluate()
+        self.assertEqual(set(first.rule_bits.bits), set(["[r1]"]))
+
+    def test_construction_is_closed(self):
+        for seed in range(60):
+            system, knowledge_base = random_theory(seed)
+            theory = local_theory(system, knowledge_base)
+            theory.construct_arguments()
+
+            by_conclusion = {}
+            for a in theory.arguments:
+                by_conclusion.setdefault(str(a.conclusion), []).append(a)
+
+            # a rule is applied whenever each of its antecedents is concluded by an argument that does not use it
+            for r in system.rules:
+                if r.is_undercutter:
+                    continue
+                applicable = all(any(r.label not in a.rule_labels for a in by_conclusion.get(str(ant), [])) for ant in r.antecedents)
+                applied = any(a.top_rule is not None and a.top_rule.label == r.label for a in theory.arguments)
+                self.assertEqual(applied, applicable, (seed, r.label))
+
+    def test_arguments_are_identified_by_structure(self):
+        for seed in range(30):
+            first = local_theory(*random_theory(seed))
+            second = local_theory(*random_theory(seed))
+            first.construct_arguments()
+            second.construct_arguments()
+
+            # each argument is constructed once, and the same arguments are equal whatever their labels
+            self.assertEqual(len(set(first.arguments)), len(first.arguments), seed)
+            self.assertEqual(set(first.arguments), set(second.arguments), seed)
+
+            for a in first.arguments:
+                b = second.argument_registry[a]
+                self.assertEqual(hash(a), hash(b))
+                self.assertEqual(str(a.conclusion), str(b.conclusion))
+                self.assertEqual(set(a.sub_arguments), set(b.sub_arguments))
+
+    def test_attacks_reach_every_superargument(self):
+        for seed in range(60):
+            theory = local_theory(*random_theory(seed))
+            theory.construct_arguments()
+
+            direct = theory.calculate_attack(simple=True)
+            expected = set([(a, b.label) for (a, s) in direct for b in theory.arguments
+                            if b.label == s or s in [c.label for c in b.sub_arguments]])
+
+            attacks = theory.calculate_attack()
+            self.assertEqual(len(set(attacks)), len(attacks), seed)
+            self.assertEqual(set(attacks), expected, seed)
+
+    def test_incremental_updates_match_fresh_build(self):
+        for seed in range(60):
+            system, knowledge_base = random_theory(seed)
+            theory = local_theory(system, knowledge_base)
+            theory.evaluate()
+
+            labels = sorted([r.label for r in system.rules])
+            theory.retract_rule(labels[seed % len(labels)])
+            theory.add_rule(Rule.from_string("[n]", "a0=>a{i}".format(i=seed % 8)))
+            premise = Formula("a{i}".format(i=seed % 4))
+            if premise in [p.formula for p in knowledge_base.premises]:
+                theory.retract_premise(premise)
+            else:
+                theory.add_premise(premise)
+
+            system, knowledge_base = random_theory(seed)
+            system.remove_rule(labels[seed % len(labels)])
+            system.add_rule(Rule.from_string("[n]", "a0=>a{i}".format(i=seed % 8)))
+            if premise in [p.formula for p in knowledge_base.premises]:
+                knowledge_base.remove_premise(premise)
+            else:
+                knowledge_base.add_premise(premise)
+
+            self.assertEqual(conclusions(theory), conclusions(local_theory(system, knowledge_base)), seed)
+
+    def test_each_kind_of_update_matches_fresh_build(self):
+        def changes(seed):
+            system, knowledge_base = random_theory(seed)
+            labels = sorted([r.label for r in system.rules if r.type == Rule.DEFEASIBLE and not r.is_undercutter])
+
+            yield ("add_axiom", Formula("a{i}".format(i=4 + seed % 4)))
+            yield ("add_assumption", Formula("a{i}".format(i=4 + (seed + 1) % 4)))
+            yield ("retract_axiom", Formula("a{i}".format(i=seed % 4)))
+            yield ("retract_assumption", Formula("a{i}".format(i=(seed + 1) % 4)))
+            yield ("add_preference", ("a{i}".format(i=seed % 4), "a{i}".format(i=(seed + 2) % 4)))
+            if knowledge_base.preferences:
+                yield ("retract_preference", knowledge_base.preferences[0])
+            if len(labels) >= 2:
+                yield ("add_rule_preference", (labels[0], labels[-1]))
+            if system.rule_preferences:
+                yield ("retract_rule_preference", system.rule_preferences[0])
+
+        def apply(system, knowledge_base, name, value):
+            target = system if "rule" in name else knowledge_base
+            getattr(target, name.replace("retract_", "remove_"))(value)
+
+        for seed in range(40):
+            for (name, value) in changes(seed):
+                theory = local_theory(*random_theory(seed))
+                theory.evaluate()
+                getattr(theory, name)(value)
+
+                system, knowledge_base = random_theory(seed)
+                apply(system, knowledge_base, name, value)
+                fresh = local_theory(system, knowledge_base)
+
+                for semantics in ["grounded", "preferred"]:
+                    self.assertEqual(conclusions(theory, semantics), conclusions(fresh, semantics), (seed, name, semantics))
+                self.assertEqual(set(theory.arguments), set(fresh.arguments), (seed, name))
+
+    def test_budget_stops_large_joins(self):
+        system, knowledge_base = load_theory(["[r1] p(X),q(Y)=>r(X,Y)"] +
+                                             ["premise: p(a{i})".format(i=i) for i in range(1000)] +
+                                             ["premise: q(b{i})".format(i=i) for i in range(1000)])
+
+        for budget in [ConstructionBudget(max_arguments=2100), ConstructionBudget(deadline=0.05)]:
+            theory = local_theory(system, knowledge_base)
+            start = time.perf_counter()
+            arguments = list(theory.iter_arguments(budget))
+
+            self.assertLess(time.perf_counter() - start, 1)
+            self.assertLess(len(arguments), 2000 + 1000 * 1000)
+            self.assertIsNotNone(theory.partial)
+
+        self.assertEqual(len(arguments), len(theory.arguments))
+        self.assertEqual(theory.partial, ConstructionBudget.DEADLINE)
+
+        theory = local_theory(system, knowledge_base)
+        theory.evaluate(budget=ConstructionBudget(max_arguments=2100))
+        self.assertEqual(len(theory.arguments), 2100)
+        self.assertEqual(theory.partial, ConstructionBudget.MAX_ARGUMENTS)
+
+    def test_budget_counts_atomic_arguments(self):
+        system, knowledge_base = load_theory(["[r1] p(X)=>r(X)"] + ["premise: p(a{i})".format(i=i) for i in range(50)])
+        theory = local_theory(system, knowledge_base)
+
+        response, _ = theory.evaluate(budget=ConstructionBudget(max_arguments=10))
+
+        self.assertEqual(len(theory.arguments), 10)
+        self.assertEqual(response["partial"], ConstructionBudget.MAX_ARGUMENTS)
+        self.assertTrue(all(a.top_rule is None for a in theory.arguments))
+
+    def test_index_matches_scan(self):
+        constants = ["a", "b", "c"]
+        theory = local_theory(*load_theory(["premise: p({x},{y})".format(x=x, y=y) for x in constants for y in constants] +
+                                           ["premise: p({x})".format(x=x) for x in constants] + ["premise: q(a,b)"]))
+        theory.construct_arguments()
+        index = ArgumentIndex(theory.arguments)
+
+        def scan(formula):
+            return [a for a in theory.arguments if a.conclusion.term == formula.term and
+                    len(a.conclusion.parameters) == len(formula.parameters) and
+                    all(p[0].isupper() or p == c for (p, c) in zip(formula.parameters, a.conclusion.parameters))]
+
+        for pattern in ["p(X,Y)", "p(a,Y)", "p(X,b)", "p(c,a)", "p(X)", "p(d)", "q(X,Y)", "r(X)"]:
+            formula = Formula(pattern)
+            self.assertEqual(sorted([a.label for a in index.matches(formula)]), sorted([a.label for a in scan(formula)]), pattern)
+
+        removed = index.matches(Formula("p(a,b)"))[0]
+        index.remove(removed)
+        self.assertEqual(index.matches(Formula("p(a,b)")), [])
+        self.assertNotIn(removed, index.matches(Formula("p(X,Y)")))
+
+    def test_grounder_join_streams(self):
+        grounder = RuleGrounder(Rule.from_string("[r1]", "p(X),q(Y),s(X)=>r(X,Y)"))
+        p = [(i, {"X": str(i % 10)}) for i in range(100)]
+        q = [(i, {"Y": str(i)}) for i in range(100)]
+        s = [(i, {"X": str(i)}) for i in range(5)]
+
+        combinations = list(grounder.join([p, q, s]))
+        self.assertEqual(len(combinations), 50 * 100)
+        self.assertTrue(all(binding["X"] == str(arguments[2]) and binding["X"] == str(arguments[0] % 10) for (arguments, binding) in combinations))
+
+        # the join is lazy, and stops when interrupted
+        calls = []
+        interrupted = lambda: calls.append(1) or len(calls) >= 2
+        self.assertLess(len(list(grounder.join([p, q, s], interrupted))), 2 * RuleGrounder.CHECK_INTERVAL)
+        self.assertEqual(next(grounder.join([p, q, s]))[1], {"X": "0", "Y": "0"})
+
+    def test_minimal_arguments_keep_the_extensions(self):
+        theory = ["axiom: p1", "axiom: p2", "assumption: p0", "[r6] p1->p4", "[r1] p4->p2", "contradictory: p2; p4"]
+
+        for semantics in ["grounded", "preferred"]:
+            self.assertEqual(conclusions(local_theory(*load_theory(theory), minimal=True), semantics),
+                             conclusions(local_theory(*load_theory(theory)), semantics), semantics)
+
+        for seed in range(100):
+            for ordering in ["weakest", "last"]:
+                full = local_theory(*random_theory(seed), ordering=ordering)
+                minimal = local_theory(*random_theory(seed), ordering=ordering, minimal=True)
+                semantics = "preferred" if seed % 4 == 0 else "grounded"
+
+                self.assertEqual(conclusions(minimal, semantics), conclusions(full, semantics), (seed, ordering))
+
+    def test_queries_match_evaluation(self):
+        for seed in range(60):
+            system, knowledge_base = random_theory(seed)
+            semantics = "preferred" if seed % 4 == 0 else "grounded"
+            expected = set([c for e in local_theory(system, knowledge_base).evaluate(semantics)[0]["acceptableConclusions"].values() for c in e])
+
+            for i in range(8):
+                for conclusion in ["a{i}".format(i=i), "~a{i}".format(i=i)]:
+                    # a fresh theory answers from the relevant part of the theory only
+                    system, knowledge_base = random_theory(seed)
+                    self.assertEqual(local_theory(system, knowledge_base).query(conclusion, semantics), conclusion in expected, (seed, conclusion))
+
+    def test_lazy_transposition_matches_closure(self):
+        for seed in range(60):
+            theories = []
+
+            for transposition in [True, ArgumentationSystem.LAZY_TRANSPOSITION]:
+                system, knowledge_base = random_theory(seed)
+
+                transposed = ArgumentationSystem(transposition=transposition)
+                for r in sorted(system.rules, key=lambda r: r.label):
+                    if "tp" not in r.label:
+                        transposed.add_rule(r)
+                for preference in system.rule_preferences:
+                    transposed.add_rule_preference(preference)
+                for (formula, contraries) in system.declared_contrariness.items():
+                    for c in contraries:
+                        transposed.add_contrary((str(c), formula), False)
+
+                theories.append(local_theory(transposed, knowledge_base))
+
+            self.assertEqual(conclusions(theories[1]), conclusions(theories[0]), seed)
+
+    def test_contrariness_matches_language(self):
+        lines = ["[r1] person(X)=>adult(X)", "[r2] person(X)=>young(X)", "[r3] adult(X),likes(X,Y)=>friends(X,Y)",
+                 "contrary: young(P); adult(P)", "contradictory: friends(P,Q); rivals(Q,P)", "contrary: adult(bob); friends(ann,bob)"]
+        people = ["ann", "bob", "cy"]
+        premises = ["premise: person({p})".format(p=p) for p in people] + ["premise: likes(ann,bob)", "premise: rivals(bob,ann)"]
+
+        for order in [lines + premises, premises + lines[::-1]]:
+            system, knowledge_base = load_theory(order)
+            theory = local_theory(system, knowledge_base)
+            theory.evaluate()
+
+            def unify(pattern, formula, binding):
+                if (pattern.term, len(pattern.parameters)) != (formula.term, len(formula.parameters)):
+                    return None
+                binding = dict(binding)
+                for (p, f) in zip(pattern.parameters, formula.parameters):
+                    if binding.setdefault(p, f) != f if p[0].isupper() else p != f:
+                        return None
+                return binding
+
+            for formula in system.language:
+                expected = set([str(formula)[1:] if str(formula)[0] == "~" else "~" + str(formula)])
+                for (declared, contraries) in system.declared_contrariness.items():
+                    binding = unify(Formula(declared), formula, {})
+                    if binding is not None:
+                        for c in contraries:
+                            expected.update([str(g) for g in system.language if unify(c, g, binding) is not None])
+                            if not c.has_variables():
+                                expected.add(str(c))
+
+                self.assertEqual(system.contraries_of(formula), expected, str(formula))
+
+            self.assertEqual(system.contraries_of("adult(ann)"), set(["~adult(ann)", "young(ann)"]))
+            self.assertEqual(system.contraries_of("rivals(bob,ann)"), set(["~rivals(bob, ann)", "friends(ann, bob)"]))
+
+    def test_first_order_rules(self):
+        theory = local_theory(*load_theory(["[r1] n(X),n(Y),X<Y=>sum([X+{Y*2}])", "[r2] sum(S),S>=8=>big(S)"] +
+                                           ["premise: n({i})".format(i=i) for i in range(1, 4)]))
+        response, _ = theory.evaluate()
+
+        self.assertEqual(sorted(set(response["acceptableConclusions"][0]) - set(["n(1)", "n(2)", "n(3)"])),
+                         ["big(8)", "sum(5)", "sum(7)", "sum(8)"])
+
+    def test_variable_names_sharing_a_prefix(self):
+        # X is a prefix of XY, and XY of the predicate XYs, which are parsed and bound separately
+        theory = local_theory(*load_theory(["[r1] n(X),n(XY),X<XY=>XYs([X*10+XY])", "[r2] XYs(X),X>XY0,n(XY0)=>big(X)",
+                                            "premise: n(1)", "premise: n(2)", "premise: n(13)"]))
+        response, _ = theory.evaluate()
+
+        self.assertEqual(sorted(set(response["acceptableConclusions"][0]) - set(["n(1)", "n(2)", "n(13)"])),
+                         ["XYs(12)", "XYs(23)", "XYs(33)", "big(12)", "big(23)", "big(33)"])
+
+    def test_stages_are_reused(self):
+        theory = local_theory(*random_theory(0))
+
+        theory.evaluate("grounded")
+        generation = theory.generation
+
+        theory.evaluate("preferred")
+        self.assertEqual(theory.generation, generation)
+
+        theory.add_premise(Formula("a7"))
+        theory.evaluate("preferred")
+        self.assertGreater(theory.generation, generation)
+
+    def test_stats(self):
+        theory = local_theory(*load_theory(["[r1] p(X,X)=>q(X)", "[r2] q(X),X>1=>r(X)"] +
+                                           ["premise: p({i},{j})".format(i=i, j=j) for i in range(1, 3) for j in range(1, 3)]),
+                              stats=True)
+        response, _ = theory.evaluate()
+        stats = response["stats"]
+
+        # p(1,2) and p(2,1) bind X to two values, and q(1) fails the comparison
+        self.assertEqual(stats["counts"]["rejected_bindings"], 2)
+        self.assertEqual(stats["counts"]["rejected_comparisons"], 1)
+        self.assertEqual(sum([p["arguments"] for p in stats["passes"]]), 3)
+        self.assertEqual(stats["sizes"]["arguments"], len(theory.arguments))
+
+        # without stats, nothing is recorded
+        response, _ = local_theory(*load_theory(["[r1] p(X,X)=>q(X)", "premise: p(1,1)"])).evaluate()
+        self.assertNotIn("stats", response)
+
+    def test_responses_can_be_changed(self):
+        theory = local_theory(*random_theory(0))
+
+        for semantics in ["grounded", "preferred"]:
+            response, _ = theory.evaluate(semantics)
+            expected = copy.deepcopy(response)
+
+            for extension in response["extensions"].values():
+                extension.append("X")
+            for conclusions in response["acceptableConclusions"].values():
+                conclusions.append("x")
+            for description in response["arguments"].values():
+                description["premises"].append("x")
+                description["conclusion"] = "x"
+
+            self.assertEqual(theory.evaluate(semantics)[0], expected, semantics)
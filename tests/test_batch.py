@@ -0,0 +1,60 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationTheory, BatchEvaluator, KnowledgeBase, Formula, load_theory
+import unittest
+
+SYSTEM = """
+transposition: lazy
+[r1] a,b->c
+[r2] c=>d
+[r3] e=>~c
+contradictory: d; f
+"""
+
+CASES = [["a", "b"], ["a", "b", "e"], ["a", "~c", "e"], ["b", "f"]]
+
+def knowledge_base(premises):
+    knowledge_base = KnowledgeBase()
+    for p in premises:
+        knowledge_base.add_premise(Formula(p))
+    return knowledge_base
+
+class BatchTest(unittest.TestCase):
+
+    def test_cases_do_not_change_the_system(self):
+        system, _ = load_theory(SYSTEM.splitlines())
+        rules = set([str(r) for r in system.rules])
+        version = system.version
+
+        results = list(BatchEvaluator(system, processes=1).evaluate([knowledge_base(c) for c in CASES], "preferred"))
+
+        self.assertEqual(set([str(r) for r in system.rules]), rules)
+        self.assertEqual(system.version, version)
+
+        for premises, result in zip(CASES, results):
+            fresh, _ = load_theory(SYSTEM.splitlines())
+            expected = ArgumentationTheory(fresh, knowledge_base(premises), engine=ArgumentationTheory.LOCAL_ENGINE).evaluate("preferred")
+            self.assertEqual(result[0]["acceptableConclusions"], expected[0]["acceptableConclusions"], premises)
+
+    def test_json_cases(self):
+        system, _ = load_theory(SYSTEM.splitlines())
+        lines = ['{{"id": {i}, "premises": {premises}}}'.format(i=i, premises=str(c).replace("'", '"')) for (i, c) in enumerate(CASES)]
+
+        results = list(BatchEvaluator(system, processes=2, chunksize=1).evaluate_json(lines))
+
+        self.assertEqual([r.split(",")[0] for r in results], ['{{"id": {i}'.format(i=i) for i in range(len(CASES))])
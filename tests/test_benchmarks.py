@@ -0,0 +1,61 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationTheory
+from benchmarks.generators import GENERATORS
+from benchmarks import runner
+import io
+import json
+import os
+import tempfile
+import unittest
+
+class BenchmarksTest(unittest.TestCase):
+
+    def test_quick_run(self):
+        log = io.StringIO()
+        results = runner.run(quick=True, repeat=1, log=log)
+
+        self.assertEqual(sorted(set([r["benchmark"] for r in results["results"]])), sorted(GENERATORS))
+        self.assertEqual(len(log.getvalue().splitlines()), len(results["results"]))
+
+        for result in results["results"]:
+            generator = GENERATORS[result["benchmark"]][0]
+            theory = ArgumentationTheory(*generator(**result["parameters"]), engine=ArgumentationTheory.LOCAL_ENGINE)
+            theory.evaluate()
+
+            self.assertEqual(result["sizes"], {"arguments": len(theory.arguments), "attacks": len(theory.attack),
+                                               "defeats": len(theory.defeat)}, result["benchmark"])
+            self.assertEqual(sorted(result["times"]), sorted(runner.STAGES + ["extensions"]))
+            self.assertGreater(result["peak_memory"], 0)
+
+    def test_compare(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "results.json")
+            runner.main(["chain", "--quick", "-r", "1", "-o", path])
+
+            with open(path) as f:
+                results = json.load(f)
+            self.assertEqual([r["benchmark"] for r in results["results"]], ["chain"])
+
+            out = io.StringIO()
+            runner.compare(results, results, out)
+            self.assertTrue(out.getvalue().startswith("chain "))
+            self.assertIn("total 1.00x", out.getvalue())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationTheory, CompiledFramework
+from .theories import random_theory
+import copy
+import os
+import tempfile
+import unittest
+
+class CompiledFrameworkTest(unittest.TestCase):
+
+    def setUp(self):
+        (descriptor, self.path) = tempfile.mkstemp(suffix=".bin")
+        os.close(descriptor)
+        self.addCleanup(os.remove, self.path)
+
+    def test_saved_frameworks_evaluate_as_theories(self):
+        for seed in range(40):
+            theory = ArgumentationTheory(*random_theory(seed), engine=ArgumentationTheory.LOCAL_ENGINE)
+            semantics = "preferred" if seed % 4 == 0 else "grounded"
+            expected = theory.evaluate(semantics, "a1")
+
+            CompiledFramework.save(theory, self.path)
+
+            with CompiledFramework(self.path) as framework:
+                self.assertEqual(framework.arguments(), [a.label for a in theory.arguments])
+                self.assertEqual(framework.attacks(), list(theory.attack))
+                self.assertEqual(framework.defeats(), list(theory.defeat))
+                self.assertEqual(framework.evaluate(semantics, "a1"), expected, seed)
+
+    def test_preferences(self):
+        theory = ArgumentationTheory(*random_theory(10), engine=ArgumentationTheory.LOCAL_ENGINE)
+        CompiledFramework.save(theory, self.path)
+
+        by_label = theory.arguments_by_label
+
+        with CompiledFramework(self.path) as framework:
+            self.assertTrue(framework.preferences())
+
+            for (x, y) in set(theory.attack):
+                self.assertEqual((x, y) in framework.preferences(), theory.argument_ordering.is_less_preferred(by_label[x], by_label[y]))
+
+    def test_responses_can_be_changed(self):
+        theory = ArgumentationTheory(*random_theory(0), engine=ArgumentationTheory.LOCAL_ENGINE)
+        CompiledFramework.save(theory, self.path)
+
+        with CompiledFramework(self.path) as framework:
+            response, _ = framework.evaluate()
+            expected = copy.deepcopy(response)
+
+            response["extensions"][0].append("X")
+            for description in response["arguments"].values():
+                description["premises"].append("x")
+
+            self.assertEqual(framework.evaluate()[0], expected)
+
+    def test_not_a_framework(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * CompiledFramework.HEADER.size)
+
+        with self.assertRaises(ValueError):
+            CompiledFramework(self.path)
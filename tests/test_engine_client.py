@@ -0,0 +1,169 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationFramework, ArgumentationTheory, EngineClient
+from .theories import random_framework, random_theory
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import json
+import threading
+import time
+import unittest
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+class Engine(BaseHTTPRequestHandler):
+    '''
+    A stand-in for a remote engine, solving frameworks with the local engine: the server counts the requests,
+    answers the first server.failures of them with 503 and records the most requests it had in flight at once
+    '''
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+
+        with server.lock:
+            server.requests = server.requests + 1
+            failed = server.requests <= server.failures
+            server.in_flight = server.in_flight + 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+        time.sleep(server.delay)
+
+        with server.lock:
+            server.in_flight = server.in_flight - 1
+
+        if failed:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        attacks = [tuple(a[1:-1].split(",")) for a in body["attacks"]]
+        data = json.dumps(ArgumentationFramework(body["arguments"], attacks).solve(body["semantics"])).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+@unittest.skipIf(requests is None, "the requests package is not installed")
+class EngineClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Engine)
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.failures = 0
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.delay = 0
+
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        self.url = "http://127.0.0.1:{port}/".format(port=self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def client(self, **options):
+        client = EngineClient(self.url, backoff=0.01, **options)
+        self.addCleanup(client.close)
+        return client
+
+    def test_retries(self):
+        self.server.failures = 2
+        arguments, attacks = random_framework(1)
+
+        response = self.client(retries=2).evaluate(arguments, attacks, "preferred")
+
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(response, ArgumentationFramework(arguments, attacks).solve("preferred"))
+
+    def test_gives_up_after_retries(self):
+        self.server.failures = 10
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client(retries=2).evaluate(["A"], [])
+
+        self.assertEqual(self.server.requests, 3)
+
+    def test_concurrency_is_bounded(self):
+        self.server.delay = 0.05
+        frameworks = [random_framework(seed) for seed in range(12)]
+
+        responses = self.client(max_concurrency=3).evaluate_many(frameworks)
+
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        self.assertEqual(self.server.requests, len(set([json.dumps(f) for f in frameworks])))
+        self.assertEqual(responses, [ArgumentationFramework(*f).solve("grounded") for f in frameworks])
+
+    def test_cache(self):
+        client = self.client(cache_size=2)
+        frameworks = [random_framework(seed) for seed in range(3)]
+
+        for f in [frameworks[0], frameworks[0], frameworks[1], frameworks[0]]:
+            client.evaluate(*f)
+        self.assertEqual(self.server.requests, 2)
+
+        # the third framework evicts the least recently used, the second
+        client.evaluate(*frameworks[2])
+        client.evaluate(*frameworks[0])
+        client.evaluate(*frameworks[1])
+        self.assertEqual(self.server.requests, 4)
+
+    def test_cached_responses_can_be_changed(self):
+        client = self.client()
+        framework = random_framework(0)
+        expected = ArgumentationFramework(*framework).solve("grounded")
+
+        client.evaluate(*framework)["grounded"].append("X")
+        client.evaluate(*framework)["grounded"].append("Y")
+
+        self.assertEqual(client.evaluate(*framework), expected)
+        self.assertEqual(self.server.requests, 1)
+
+    def test_evaluate_async(self):
+        client = self.client()
+        frameworks = [random_framework(seed) for seed in range(4)]
+
+        async def evaluate():
+            return await asyncio.gather(*[client.evaluate_async(*f, "preferred") for f in frameworks])
+
+        self.assertEqual(asyncio.run(evaluate()), [ArgumentationFramework(*f).solve("preferred") for f in frameworks])
+
+    def test_theory_with_remote_engine(self):
+        client = self.client()
+
+        for seed in range(10):
+            system, knowledge_base = random_theory(seed)
+            remote = ArgumentationTheory(system, knowledge_base, engine=client).evaluate("grounded", "a0")
+
+            system, knowledge_base = random_theory(seed)
+            local = ArgumentationTheory(system, knowledge_base, engine=ArgumentationTheory.LOCAL_ENGINE).evaluate("grounded", "a0")
+
+            self.assertEqual(remote, local, seed)
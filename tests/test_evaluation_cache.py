@@ -0,0 +1,85 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationTheory, EvaluationCache, load_theory
+import random
+import tempfile
+import unittest
+
+THEORY = ["[r1] a=>m", "[r2] b=>n", "[r3] m->h", "[r4] n->~h", "premise: a", "premise: b", "premise: c",
+          "contrary: a; c", "preference: c; a"]
+
+def theory(lines, cache):
+    return ArgumentationTheory(*load_theory(lines), engine=ArgumentationTheory.LOCAL_ENGINE, cache=cache)
+
+class EvaluationCacheTest(unittest.TestCase):
+
+    def test_violations_with_a_warm_cache(self):
+        expected = theory(THEORY, None).well_formedness_violations("grounded")
+        self.assertTrue(any("concludes h and its contrary ~h" in description for (principle, description) in expected))
+
+        cache = EvaluationCache()
+        theory(THEORY, cache).evaluate("grounded")
+
+        self.assertEqual(theory(THEORY, cache).well_formedness_violations("grounded"), expected)
+        self.assertEqual(cache.hits, 0)
+
+    def test_responses_are_copied(self):
+        cache = EvaluationCache()
+        response, _ = theory(THEORY, cache).evaluate("preferred")
+        expected = [list(e) for e in response["extensions"].values()]
+
+        response["extensions"][0].append("X")
+        response["acceptableConclusions"].clear()
+
+        for _ in range(2):
+            cached, query = theory(THEORY, cache).evaluate("preferred", "m")
+            self.assertEqual([list(e) for e in cached["extensions"].values()], expected)
+            self.assertTrue(query)
+            cached["extensions"][0].append("Y")
+
+        self.assertEqual(cache.hits, 2)
+
+    def test_fingerprint_does_not_depend_on_order(self):
+        cache = EvaluationCache()
+        fingerprint = theory(THEORY, cache).fingerprint("grounded")
+
+        rnd = random.Random(0)
+        for _ in range(5):
+            lines = list(THEORY)
+            rnd.shuffle(lines)
+            self.assertEqual(theory(lines, cache).fingerprint("grounded"), fingerprint)
+
+        self.assertNotEqual(theory(THEORY, cache).fingerprint("preferred"), fingerprint)
+        self.assertNotEqual(theory(THEORY + ["premise: d"], cache).fingerprint("grounded"), fingerprint)
+        self.assertNotEqual(theory(THEORY[:-1], cache).fingerprint("grounded"), fingerprint)
+
+    def test_directory(self):
+        with tempfile.TemporaryDirectory() as path:
+            expected, _ = theory(THEORY, EvaluationCache(path=path)).evaluate("preferred")
+            expected.pop("stats", None)
+
+            # a new cache (as in another process) finds the response in the directory
+            cache = EvaluationCache(path=path)
+            response, _ = theory(THEORY, cache).evaluate("preferred")
+
+            self.assertEqual(cache.disk_hits, 1)
+            self.assertEqual(response, expected)
+
+            cache = EvaluationCache(path=path, max_bytes=1)
+            theory(THEORY, cache).evaluate("grounded")
+            self.assertEqual(cache.files(), [])
@@ -0,0 +1,48 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import Formula
+import copy
+import pickle
+import unittest
+
+class FormulaTest(unittest.TestCase):
+
+    def test_formulas_are_interned(self):
+        self.assertIs(Formula("q(a,b)"), Formula("q(a, b)"))
+        self.assertIs(Formula("q(a,b)"), Formula("q(a,b)"))
+        self.assertIsNot(Formula("q(a,b)"), Formula("q(b,a)"))
+
+        formula = Formula("q(X,b)")
+        self.assertIs(copy.copy(formula), formula)
+        self.assertIs(copy.deepcopy(formula), formula)
+        self.assertIs(pickle.loads(pickle.dumps(formula)), formula)
+
+    def test_formulas_are_immutable(self):
+        formula = Formula("q(X,b)")
+
+        with self.assertRaises(AttributeError):
+            formula.term = "p"
+
+        instance = formula.instantiate({"X": "a"})
+        self.assertIs(instance, Formula("q(a,b)"))
+        self.assertEqual(formula.parameters, ("X", "b"))
+        self.assertEqual(formula.variables, ("X",))
+        self.assertFalse(instance.has_variables())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationFramework
+from .theories import random_framework
+from itertools import combinations
+import time
+import unittest
+
+def brute_force(arguments, defeats):
+    '''
+    Returns the complete, grounded, preferred and stable extensions of a framework (as sets of frozensets),
+    found from the definitions of Dung 1995 by trying every set of arguments
+    '''
+
+    attackers = {a: set([x for (x, y) in defeats if y == a]) for a in arguments}
+
+    def defended(s):
+        defeated = set([y for (x, y) in defeats if x in s])
+        return set([a for a in arguments if attackers[a] <= defeated])
+
+    subsets = [frozenset(c) for n in range(len(arguments) + 1) for c in combinations(arguments, n)]
+    conflict_free = [s for s in subsets if not any(x in s and y in s for (x, y) in defeats)]
+    admissible = [s for s in conflict_free if s <= defended(s)]
+    complete = set([s for s in admissible if defended(s) <= s])
+
+    grounded = set([s for s in complete if all(s <= c for c in complete)])
+    preferred = set([s for s in admissible if not any(s < t for t in admissible)])
+    stable = set([s for s in conflict_free if set([y for (x, y) in defeats if x in s]) | s == set(arguments)])
+
+    return {"complete": complete, "grounded": grounded, "preferred": preferred, "stable": stable}
+
+class SemanticsTest(unittest.TestCase):
+
+    def test_extensions_match_definitions(self):
+        for seed in range(150):
+            arguments, defeats = random_framework(seed, arguments=2 + seed % 7)
+            framework = ArgumentationFramework(arguments, defeats)
+            expected = brute_force(arguments, defeats)
+
+            self.assertEqual(set([frozenset(framework.grounded())]), expected["grounded"], seed)
+            for semantics in ["complete", "preferred", "stable"]:
+                extensions = framework.solve(semantics)[semantics]
+                self.assertEqual(len(extensions), len(expected[semantics]), (seed, semantics))
+                self.assertEqual(set([frozenset(e) for e in extensions]), expected[semantics], (seed, semantics))
+
+    def test_acceptance_matches_extensions(self):
+        for seed in range(150):
+            arguments, defeats = random_framework(seed, arguments=2 + seed % 7)
+            framework = ArgumentationFramework(arguments, defeats)
+            expected = brute_force(arguments, defeats)
+
+            for a in arguments:
+                self.assertEqual(framework.is_accepted(a), any(a in e for e in expected["grounded"]), (seed, a))
+                self.assertEqual(framework.is_accepted(a, "preferred"), any(a in e for e in expected["preferred"]), (seed, a))
+
+                admissible = framework.admissible_set(a)
+                if admissible is not None:
+                    self.assertTrue(a in admissible)
+                    self.assertTrue(any(admissible <= e for e in expected["preferred"]), (seed, a))
+
+    def test_incremental_grounded_labelling(self):
+        arguments, defeats = random_framework(3, arguments=40, density=0.05)
+        previous = ArgumentationFramework(arguments, defeats).grounded_labelling()
+
+        changed = defeats[:len(defeats) // 2] + [("A1", "A2"), ("A2", "A3")]
+        framework = ArgumentationFramework(arguments, changed)
+
+        self.assertEqual(framework.grounded_labelling(previous, ["A2", "A3"] + [b for (a, b) in defeats[len(defeats) // 2:]]),
+                         framework.grounded_labelling())
+
+    def test_long_argument_games(self):
+        # each argument is defeated by the next, so the game for A0 takes half as many moves as there are arguments
+        arguments = ["A{i}".format(i=i) for i in range(5001)]
+        framework = ArgumentationFramework(arguments, [(arguments[i + 1], arguments[i]) for i in range(5000)])
+
+        self.assertEqual(framework.admissible_set("A0"), set(arguments[0::2]))
+        self.assertTrue(framework.is_accepted("A0", "preferred"))
+        self.assertFalse(framework.is_accepted("A1", "preferred"))
+
+    def test_undecided_arguments_scale(self):
+        # an odd cycle leaves itself and every argument it defeats undecided, but there is only the empty extension
+        cycle = ["C0", "C1", "C2"]
+        pendants = ["P{i}".format(i=i) for i in range(200)]
+        defeats = [("C0", "C1"), ("C1", "C2"), ("C2", "C0")] + [(cycle[i % 3], p) for (i, p) in enumerate(pendants)]
+        framework = ArgumentationFramework(cycle + pendants, defeats)
+
+        start = time.perf_counter()
+        self.assertEqual(framework.solve("complete"), {"complete": [[]]})
+        self.assertEqual(framework.solve("preferred"), {"preferred": [[]]})
+        self.assertEqual(framework.solve("stable"), {"stable": []})
+        self.assertLess(time.perf_counter() - start, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationSystem, ArgumentationTheory, KnowledgeBase, Formula, Rule, TheoryLoader, load_theory
+import io
+import unittest
+
+THEORY = """
+# a theory file
+transposition: true
+[r1] a,b=>c
+[r2] c->d
+rule_preference: [r1]; [r3]
+[r3] e=>~c
+axiom: a
+premise: b
+premise: e
+assumption: f
+contrary: f; d
+contradictory: c; g
+preference: b; e
+preference: a; e
+"""
+
+def built():
+    '''
+    Returns the system and knowledge base of THEORY, built one element at a time
+    '''
+
+    system = ArgumentationSystem(transposition=True)
+    system.add_rule(Rule.from_string("[r1]", "a,b=>c"))
+    system.add_rule(Rule.from_string("[r2]", "c->d"))
+    system.add_rule(Rule.from_string("[r3]", "e=>~c"))
+    system.add_rule_preference(("[r1]", "[r3]"))
+    system.add_contrary(("f", "d"), False)
+    system.add_contrary(("c", "g"), True)
+
+    knowledge_base = KnowledgeBase()
+    knowledge_base.add_axiom(Formula("a"))
+    knowledge_base.add_premise(Formula("b"))
+    knowledge_base.add_premise(Formula("e"))
+    knowledge_base.add_assumption(Formula("f"))
+    knowledge_base.add_preference(("b", "e"))
+    knowledge_base.add_preference(("a", "e"))
+
+    return system, knowledge_base
+
+def evaluated(system, knowledge_base):
+    theory = ArgumentationTheory(system, knowledge_base, engine=ArgumentationTheory.LOCAL_ENGINE)
+    response, _ = theory.evaluate("preferred")
+    return theory.fingerprint("preferred"), response["acceptableConclusions"]
+
+class TheoryLoaderTest(unittest.TestCase):
+
+    def test_load_matches_building(self):
+        system, knowledge_base = load_theory(io.StringIO(THEORY))
+
+        # the preference on the axiom a is dropped, as add_preference drops it, though it was read before a
+        self.assertEqual(knowledge_base.preferences, [("b", "e")])
+        self.assertEqual(system.rule_preferences, built()[0].rule_preferences)
+        self.assertEqual(evaluated(system, knowledge_base), evaluated(*built()))
+
+    def test_read_dict(self):
+        loader = TheoryLoader().read_dict({
+            "rules": {"[r1]": "a,b=>c", "[r2]": "c->d", "[r3]": "e=>~c"}, "transposition": True,
+            "contraries": [["f", "d"]], "contradictories": [["c", "g"]], "rule_preferences": [["[r1]", "[r3]"]],
+            "axioms": ["a"], "premises": ["b", "e"], "assumptions": ["f"], "preferences": [["b", "e"], ["a", "e"]]})
+
+        self.assertEqual(evaluated(loader.system(), loader.knowledge_base()), evaluated(*built()))
+
+    def test_errors(self):
+        for (lines, number) in [(["[r1] a,b=>c", "", "[r2] c d"], 3), (["axiom: a", "preference: a"], 2), (["lemma: a"], 1)]:
+            with self.assertRaises(ValueError) as context:
+                load_theory(lines)
+            self.assertTrue(str(context.exception).startswith("line {number}:".format(number=number)), context.exception)
@@ -0,0 +1,60 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationTheory, WellFormednessChecker, load_theory
+import unittest
+
+def theory(lines):
+    return ArgumentationTheory(*load_theory(lines), engine=ArgumentationTheory.LOCAL_ENGINE)
+
+def principles(violations):
+    return sorted(set([principle for (principle, description) in violations]))
+
+class WellFormednessTest(unittest.TestCase):
+
+    def test_rule_consequents(self):
+        rules = ["[r1] p(X)->q(X)", "[r2] s(Y)=>r(Y)", "premise: p(a)", "premise: s(a)"]
+
+        self.assertEqual(theory(rules).check_well_formed(), (True, None))
+        self.assertEqual(theory(rules + ["contrary: t(a); q(a)"]).check_well_formed(), (True, None))
+        self.assertEqual(theory(rules + ["contrary: r(a); q(a)"]).check_well_formed(), (False, WellFormednessChecker.RULE_CONSEQUENTS))
+        self.assertEqual(theory(rules + ["contrary: r(X); q(X)"]).check_well_formed(), (False, WellFormednessChecker.RULE_CONSEQUENTS))
+
+    def test_assumptions(self):
+        elements = ["assumption: f", "premise: g", "axiom: h"]
+
+        self.assertEqual(theory(elements).check_well_formed(), (True, None))
+        for contrary in ["contrary: f; g", "contrary: f; h"]:
+            self.assertEqual(theory(elements + [contrary]).check_well_formed(), (False, WellFormednessChecker.ASSUMPTIONS))
+
+    def test_transpositions(self):
+        rules = ["[r1] a->b", "[r2] c=>d", "contrary: d; ~a"]
+
+        self.assertEqual(theory(rules).check_well_formed(), (True, None))
+        for transposition in ["true", "lazy"]:
+            violations = theory(rules + ["transposition: " + transposition]).well_formedness_violations()
+            self.assertEqual(principles(violations), [WellFormednessChecker.RULE_CONSEQUENTS], transposition)
+
+    def test_postulates(self):
+        rules = ["[r1] a=>m", "[r2] b=>n", "[r3] m->h", "[r4] n->~h", "premise: a", "premise: b"]
+
+        self.assertEqual(theory(rules).well_formedness_violations(), [])
+        self.assertEqual(principles(theory(rules).well_formedness_violations("grounded")),
+                         [WellFormednessChecker.DIRECT_CONSISTENCY])
+
+        # closed under transposition, the rules of the same theory satisfy the postulates
+        self.assertEqual(theory(rules + ["transposition: true"]).well_formedness_violations("grounded"), [])
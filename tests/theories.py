@@ -0,0 +1,91 @@
+"""
+Copyright (C) 2020  Centre for Argument Technology (http://arg.tech)
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Lesser General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Lesser General Public License for more details.
+
+You should have received a copy of the GNU Lesser General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+"""
+
+from pyaspic import ArgumentationSystem, KnowledgeBase, Formula, Rule
+import random
+
+def random_theory(seed, atoms=8, rules=12):
+    '''
+    Returns a random (argumentation system, knowledge base) over propositional atoms a0, a1, ...:
+    premises, axioms and assumptions among the first half of the atoms, strict and defeasible rules
+    (some of them undercutters), contraries and contradictories, and preferences
+    '''
+
+    rnd = random.Random(seed)
+
+    system = ArgumentationSystem(transposition=rnd.random() < 0.2)
+    knowledge_base = KnowledgeBase()
+
+    names = ["a{i}".format(i=i) for i in range(atoms)]
+
+    for a in names[:atoms // 2]:
+        r = rnd.random()
+        if r < 0.6:
+            knowledge_base.add_premise(Formula(a))
+        elif r < 0.8:
+            knowledge_base.add_axiom(Formula(a))
+        else:
+            knowledge_base.add_assumption(Formula(a))
+
+    labels = []
+    for i in range(rules):
+        antecedents = rnd.sample(names, rnd.randint(1, 2))
+        consequent = rnd.choice(names + ["~" + a for a in names])
+        if consequent in antecedents:
+            continue
+
+        type = Rule.DEFEASIBLE if rnd.random() < 0.7 else Rule.STRICT
+        if rnd.random() < 0.1 and labels:
+            consequent = "~" + rnd.choice(labels)
+            type = Rule.DEFEASIBLE
+
+        label = "[r{i}]".format(i=i)
+        system.add_rule(Rule.from_string(label, ",".join(antecedents) + type + consequent))
+        if type == Rule.DEFEASIBLE:
+            labels.append(label)
+
+    used = set()
+    for _ in range(rnd.randint(0, 6)):
+        x, y = rnd.sample(names, 2)
+        contradiction = rnd.random() < 0.5
+        if y in used or (contradiction and x in used):
+            continue
+        used.add(y)
+        if contradiction:
+            used.add(x)
+        system.add_contrary((x, y), contradiction)
+
+    for _ in range(rnd.randint(0, 4)):
+        if len(labels) >= 2:
+            system.add_rule_preference(tuple(rnd.sample(labels, 2)))
+
+    for _ in range(rnd.randint(0, 4)):
+        knowledge_base.add_preference(tuple(rnd.sample(names[:atoms // 2], 2)))
+
+    return system, knowledge_base
+
+def random_framework(seed, arguments=7, density=0.25):
+    '''
+    Returns random (arguments, defeats) of an abstract argumentation framework
+    '''
+
+    rnd = random.Random(seed)
+
+    labels = ["A{i}".format(i=i) for i in range(arguments)]
+    defeats = [(a, b) for a in labels for b in labels if rnd.random() < density]
+
+    return labels, defeats